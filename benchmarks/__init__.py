@@ -0,0 +1,15 @@
+"""
+Benchmarks for ethcompress codecs, auto selection and middleware.
+
+Run with `python -m benchmarks --help`. Results are written as JSON and can be
+compared against a saved baseline to catch throughput or latency regressions.
+"""
+
+from pathlib import Path
+import sys
+
+# Ensure `src/` is on sys.path without installing the package (as tests/conftest.py does)
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
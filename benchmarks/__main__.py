@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import argparse
+import platform
+import sys
+import time
+
+from . import batch, codecs, gas, middleware, network, provider, report, threads
+from .corpus import DEFAULT_KINDS, KINDS
+
+DEFAULT_SIZES = (256, 1024, 4096, 16384)
+
+
+def _ints(s: str) -> list[int]:
+    return [int(x) for x in s.split(",") if x]
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark ethcompress codecs, selection and middleware.",
+    )
+    p.add_argument("--sizes", type=_ints, default=list(DEFAULT_SIZES), help="comma separated bytes")
+    p.add_argument("--kinds", default=",".join(DEFAULT_KINDS), help=f"comma separated, of {KINDS}")
+    p.add_argument("--codecs", default="", help="comma separated subset of codec cases")
+    p.add_argument("--repeat", type=int, default=20, help="timed runs per case")
+    p.add_argument("--skip-codecs", action="store_true")
+    p.add_argument("--skip-middleware", action="store_true")
+    p.add_argument("--gas", action="store_true", help="decode gas of every codec on the corpus")
+    p.add_argument("--gas-samples", type=int, default=24, help="corpus samples for --gas")
+    p.add_argument("--evm", action="store_true", help="also run calls end to end in py-evm")
+    p.add_argument(
+        "--network",
+        default="",
+        help="comma separated ethcompress.testing.PROFILES to run over HTTP",
+    )
+    p.add_argument(
+        "--provider",
+        nargs="?",
+        const="local",
+        default="",
+        help="CompressingHTTPProvider vs HTTPProvider + middleware over comma separated PROFILES",
+    )
+    p.add_argument(
+        "--transport",
+        default="",
+        help="comma separated PROFILES: codecs vs HTTP gzip request bodies vs auto",
+    )
+    p.add_argument(
+        "--batch",
+        nargs="?",
+        const="auto",
+        default="",
+        help="compress_many scaling over comma separated worker counts (default 1,2,4..cpus)",
+    )
+    p.add_argument(
+        "--threads",
+        nargs="?",
+        const="auto",
+        default="",
+        help="thread scaling of compress_call_data (meaningful on free-threaded builds)",
+    )
+    p.add_argument("--out", default="bench_results.json", help="JSON results path")
+    p.add_argument("--baseline", help="baseline JSON to compare against")
+    p.add_argument("--max-throughput-drop", type=float, default=0.10)
+    p.add_argument("--max-latency-increase", type=float, default=0.20)
+    p.add_argument("--max-gas-increase", type=float, default=0.02)
+    args = p.parse_args(argv)
+
+    kinds = [k for k in args.kinds.split(",") if k]
+    only = {c for c in args.codecs.split(",") if c} or None
+    results: dict[str, dict[str, float]] = {}
+    if not args.skip_codecs:
+        results.update(codecs.run(args.sizes, kinds, repeat=args.repeat, only=only))
+    if not args.skip_middleware:
+        results.update(middleware.run(args.sizes, repeat=args.repeat))
+    if args.evm:
+        results.update(middleware.run_evm(args.sizes, repeat=args.repeat))
+    profiles = [n for n in args.network.split(",") if n]
+    if profiles:
+        results.update(network.run(profiles, args.sizes, repeat=args.repeat))
+    profiles = [n for n in args.provider.split(",") if n]
+    if profiles:
+        results.update(provider.run(profiles, args.sizes, repeat=args.repeat))
+    profiles = [n for n in args.transport.split(",") if n]
+    if profiles:
+        results.update(provider.run_transport(profiles, args.sizes, repeat=args.repeat))
+    if args.gas:
+        results.update(gas.run(count=args.gas_samples))
+    if args.batch:
+        counts = batch.default_workers() if args.batch == "auto" else _ints(args.batch)
+        results.update(batch.run(counts))
+    if args.threads:
+        counts = batch.default_workers() if args.threads == "auto" else _ints(args.threads)
+        if threads.gil_enabled():
+            print("note: the GIL is enabled, thread scaling is expected to stay near 1x")
+        results.update(threads.run(counts))
+
+    meta = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "free_threaded": threads.free_threaded_build(),
+        "gil": threads.gil_enabled(),
+        "timestamp": int(time.time()),
+        "repeat": args.repeat,
+    }
+    report.write(args.out, meta, results)
+    print(report.summary(results))
+    print(f"\nwrote {len(results)} results to {args.out}")
+
+    if args.baseline:
+        regressions = report.compare(
+            results,
+            report.load(args.baseline),
+            max_throughput_drop=args.max_throughput_drop,
+            max_latency_increase=args.max_latency_increase,
+            max_gas_increase=args.max_gas_increase,
+        )
+        for r in regressions:
+            print(f"REGRESSION {r}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from ethcompress.batch import compress_many
+from ethcompress.testing import corpus
+
+from .timing import measure
+
+
+def default_workers() -> list[int]:
+    """1, 2, 4, ... up to the CPU count (included)."""
+    n = os.cpu_count() or 1
+    out = [1]
+    while out[-1] * 2 < n:
+        out.append(out[-1] * 2)
+    return out if out[-1] == n else [*out, n]
+
+
+def run(
+    workers: Iterable[int],
+    *,
+    count: int = 256,
+    repeat: int = 3,
+    seed: int = 0,
+    min_size: int = 1024,
+    max_size: int = 8192,
+) -> dict[str, dict[str, float]]:
+    """Throughput of compress_many over the seeded corpus per worker count.
+
+    Pools are started and warmed before timing, so results reflect steady state. Keys are
+    `batch/<workers>`; `speedup` is relative to the first worker count (1 by default).
+    """
+    items = [(s.to, s.data) for s in corpus(count, seed=seed, min_size=min_size, max_size=max_size)]
+    size = sum((len(d) - 2) // 2 for _, d in items)
+    results: dict[str, dict[str, float]] = {}
+    base = 0.0
+    for n in workers:
+        if n <= 1:
+            r = measure(
+                lambda: list(compress_many(items, workers=1)), size=size, repeat=repeat, warmup=1
+            )
+        else:
+            with ProcessPoolExecutor(max_workers=n) as pool:
+                r = measure(
+                    lambda p=pool, w=n: list(compress_many(items, workers=w, executor=p)),
+                    size=size,
+                    repeat=repeat,
+                    warmup=1,
+                )
+        base = base or r["mb_s"]
+        r["calls_s"] = count / (r["p50_us"] / 1e6) if r["p50_us"] else 0.0
+        r["speedup"] = r["mb_s"] / base if base else 0.0
+        results[f"batch/{n}"] = r
+    return results
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from ethcompress import (
+    cd_compress,
+    cd_decompress,
+    compress_call_data,
+    flz_compress,
+    flz_decompress,
+    jit_bytecode,
+)
+
+from .corpus import payload
+from .timing import measure
+
+TARGET = "0x000000000000000000000000000000000000dEaD"
+
+
+def _cases(data: str) -> dict[str, Callable[[], Any]]:
+    flz = flz_compress(data)
+    cd = cd_compress(data)
+    return {
+        "flz_compress": lambda: flz_compress(data),
+        "flz_decompress": lambda: flz_decompress(flz),
+        "cd_compress": lambda: cd_compress(data),
+        "cd_decompress": lambda: cd_decompress(cd),
+        "jit_bytecode": lambda: jit_bytecode(data),
+        "compress_call_data": lambda: compress_call_data(data, TARGET, min_size=0),
+    }
+
+
+def run(
+    sizes: Iterable[int], kinds: Iterable[str], *, repeat: int, only: set[str] | None = None
+) -> dict[str, dict[str, float]]:
+    """Benchmarks every codec on every (kind, size) corpus payload.
+
+    Keys are `codec/<name>/<kind>/<size>`; throughput is computed from the input size.
+    """
+    results: dict[str, dict[str, float]] = {}
+    for kind in kinds:
+        for size in sizes:
+            data = payload(kind, size)
+            n = (len(data) - 2) // 2
+            for name, fn in _cases(data).items():
+                if only and name not in only:
+                    continue
+                results[f"codec/{name}/{kind}/{size}"] = measure(fn, size=n, repeat=repeat)
+    return results
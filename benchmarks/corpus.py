@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import random
+
+from ethcompress.testing import KINDS as CALL_KINDS, generate
+
+# Synthetic extremes next to the realistic call shapes of ethcompress.testing
+KINDS = ("random", "sparse", *CALL_KINDS)
+DEFAULT_KINDS = ("random", "aggregate", "transfer", "blobs")
+
+
+def _sparse(rng: random.Random, size: int) -> bytes:
+    # ABI-like words: mostly small integers and zero padding
+    words = [rng.randrange(1 << rng.choice((0, 8, 16, 64, 160))).to_bytes(32, "big")]
+    while 32 * len(words) < size:
+        words.append(rng.randrange(1 << rng.choice((0, 8, 16, 64, 160))).to_bytes(32, "big"))
+    return (bytes.fromhex("a9059cbb") + b"".join(words))[:size]
+
+
+def payload(kind: str, size: int, seed: int = 0) -> str:
+    """Deterministic 0x-hex payload of roughly `size` bytes."""
+    if kind in CALL_KINDS:
+        return generate(kind, size, seed)
+    rng = random.Random(f"{kind}:{size}:{seed}")
+    if kind == "random":
+        data = rng.randbytes(size)
+    elif kind == "sparse":
+        data = _sparse(rng, size)
+    else:
+        raise ValueError(f"unknown corpus kind: {kind}")
+    return "0x" + data.hex()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from ethcompress.compressor import ALGORITHMS, DECOMPRESSOR_ADDRESS, build_call_data
+from ethcompress.testing import ECHO_ADDRESS, EVMProvider, corpus
+
+from .timing import percentile
+
+# Upper bounds (bytes of original calldata) of the size buckets
+BUCKETS = (1024, 4096, 16384, 65536)
+
+
+def bucket(size: int) -> str:
+    lo = 0
+    for hi in BUCKETS:
+        if size <= hi:
+            return f"{lo}-{hi}"
+        lo = hi
+    return f"{lo}+"
+
+
+def _fit(points: list[tuple[int, int]]) -> tuple[float, float]:
+    """Least squares gas = intercept + per_byte * size."""
+    n = len(points)
+    mx = sum(x for x, _ in points) / n
+    my = sum(y for _, y in points) / n
+    var = sum((x - mx) ** 2 for x, _ in points)
+    slope = sum((x - mx) * (y - my) for x, y in points) / var if var else 0.0
+    return my - slope * mx, slope
+
+
+def run(
+    *,
+    count: int = 24,
+    seed: int = 0,
+    min_size: int = 256,
+    max_size: int = 16384,
+    algs: Iterable[str] = ALGORITHMS,
+) -> dict[str, dict[str, float]]:
+    """Decode gas of every codec on the seeded corpus, run through py-evm.
+
+    Decode gas is the gas of the compressed call minus the same call sent uncompressed, so
+    it isolates the forwarder (and the JIT's reconstruction). Per codec and size bucket the
+    results hold gas_p50/gas_p99 and gas_per_byte (p50 of decode gas / original bytes);
+    `gas/<codec>/fit` holds the least squares curve gas = intercept + per_byte * bytes.
+    """
+    backend = EVMProvider().backend
+    samples = corpus(count, seed=seed, min_size=min_size, max_size=max_size)
+    vanilla = {}
+    for s in samples:
+        ok, _, gas = backend.call({"to": ECHO_ADDRESS, "data": s.data})
+        if not ok:
+            raise RuntimeError(f"vanilla baseline failed for a {s.kind} sample")
+        vanilla[s.data] = gas
+
+    results: dict[str, dict[str, float]] = {}
+    for alg in algs:
+        points: list[tuple[int, int]] = []
+        for s in samples:
+            data, override = build_call_data(s.data, ECHO_ADDRESS, alg)
+            ok, out, gas = backend.call({"to": DECOMPRESSOR_ADDRESS, "data": data}, override)
+            if not ok or "0x" + out.hex() != s.data:
+                raise RuntimeError(f"{alg} failed to roundtrip a {s.kind} sample")
+            points.append(((len(s.data) - 2) // 2, gas - vanilla[s.data]))
+
+        buckets: dict[str, list[tuple[int, int]]] = {}
+        for size, gas in points:
+            buckets.setdefault(bucket(size), []).append((size, gas))
+        for name, group in sorted(
+            buckets.items(), key=lambda kv: int(kv[0].split("-")[0].rstrip("+"))
+        ):
+            gas_sorted = sorted(g for _, g in group)
+            per_byte = sorted(g / size for size, g in group)
+            results[f"gas/{alg}/{name}"] = {
+                "samples": len(group),
+                "gas_p50": percentile(gas_sorted, 50),
+                "gas_p99": percentile(gas_sorted, 99),
+                "gas_per_byte": per_byte[len(per_byte) // 2],
+            }
+        intercept, slope = _fit(points)
+        results[f"gas/{alg}/fit"] = {
+            "samples": len(points),
+            "intercept": intercept,
+            "per_byte": slope,
+        }
+    return results
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from ethcompress.middleware import CompressionMiddleware
+from ethcompress.testing import ECHO_ADDRESS, EVMProvider
+
+from .corpus import payload
+from .timing import measure
+
+TARGET = "0x000000000000000000000000000000000000dEaD"
+
+
+class FakeProvider:
+    """Answers every request immediately, so only middleware work is measured."""
+
+    def make_request(self, method: str, params: list) -> dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x"}
+
+
+class W3:
+    def __init__(self, provider: FakeProvider):
+        self.provider = provider
+
+
+def run(sizes: Iterable[int], *, repeat: int, alg: str = "auto") -> dict[str, dict[str, float]]:
+    """Per-request overhead of CompressionMiddleware over a direct provider call.
+
+    Keys are `middleware/<alg>/<size>`; `overhead_p50_us` is the p50 difference between
+    a request through the middleware and the same request sent straight to the provider.
+    """
+    provider = FakeProvider()
+    handler = CompressionMiddleware(alg=alg, min_size=0)(provider.make_request, W3(provider))
+    results: dict[str, dict[str, float]] = {}
+    for size in sizes:
+        data = payload("aggregate", size)
+        params = [{"to": TARGET, "data": data}, "latest"]
+        n = (len(data) - 2) // 2
+        direct = measure(
+            lambda p=params: provider.make_request("eth_call", p), size=n, repeat=repeat
+        )
+        wrapped = measure(lambda p=params: handler("eth_call", p), size=n, repeat=repeat)
+        wrapped["overhead_p50_us"] = wrapped["p50_us"] - direct["p50_us"]
+        results[f"middleware/{alg}/{size}"] = wrapped
+    return results
+
+
+def run_evm(sizes: Iterable[int], *, repeat: int, alg: str = "auto") -> dict[str, dict[str, float]]:
+    """End to end eth_call through CompressionMiddleware into an in-process py-evm chain.
+
+    Keys are `evm/<alg>/<size>`; `gas_p50` is the decode plus forward gas of the calls.
+    """
+    provider = EVMProvider()
+    handler = CompressionMiddleware(alg=alg, min_size=0)(provider.make_request, W3(provider))
+    results: dict[str, dict[str, float]] = {}
+    for size in sizes:
+        data = payload("aggregate", size)
+        params = [{"to": ECHO_ADDRESS, "data": data}, "latest"]
+        del provider.calls[:]
+        r = measure(
+            lambda p=params: handler("eth_call", p), size=(len(data) - 2) // 2, repeat=repeat
+        )
+        gas = sorted(provider.gas_used)
+        r["gas_p50"] = gas[len(gas) // 2]
+        results[f"evm/{alg}/{size}"] = r
+    return results
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from web3 import HTTPProvider, Web3
+
+from ethcompress.middleware import CompressionMiddleware
+from ethcompress.testing import ECHO_ADDRESS, RPCServer
+
+from .corpus import payload
+from .timing import measure
+
+ALGS = ("vanilla", "auto", "flz", "cd", "jit")
+
+
+def run(
+    profiles: Iterable[str],
+    sizes: Iterable[int],
+    *,
+    repeat: int,
+    algs: Iterable[str] = ALGS,
+    kind: str = "aggregate",
+) -> dict[str, dict[str, float]]:
+    """End to end eth_call latency through web3's HTTPProvider and a shaped local server.
+
+    Keys are `network/<profile>/<alg>/<size>`; `request_bytes` is the HTTP body sent per call.
+    """
+    results: dict[str, dict[str, float]] = {}
+    for profile in profiles:
+        with RPCServer(profile=profile) as srv:
+            for size in sizes:
+                data = payload(kind, size)
+                tx = {"to": ECHO_ADDRESS, "data": data}
+                n = (len(data) - 2) // 2
+                for alg in algs:
+                    # Cache eth_chainId, which web3 otherwise re-fetches around every call
+                    w3 = Web3(HTTPProvider(srv.url, cache_allowed_requests=True))
+                    if alg != "vanilla":
+                        w3.middleware_onion.add(
+                            CompressionMiddleware(alg=alg, min_size=0, allow_fallback=False)
+                        )
+                    sent = srv.bytes_in
+                    r = measure(lambda w=w3, t=tx: w.eth.call(t), size=n, repeat=repeat, warmup=1)
+                    r["request_bytes"] = (srv.bytes_in - sent) / (repeat + 1)
+                    results[f"network/{profile}/{alg}/{size}"] = r
+    return results
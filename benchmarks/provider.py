@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from web3 import HTTPProvider, Web3
+
+from ethcompress.middleware import CompressionMiddleware
+from ethcompress.provider import CompressingHTTPProvider
+from ethcompress.testing import ECHO_ADDRESS, PROFILES, RPCServer
+
+from .corpus import payload
+from .timing import measure
+
+ALGS = ("flz", "jit")
+
+
+def _clients(url: str, alg: str) -> dict[str, Web3]:
+    # Both with an empty onion and cached eth_chainId: only the request path differs
+    middleware = Web3(HTTPProvider(url, cache_allowed_requests=True))
+    direct = Web3(
+        CompressingHTTPProvider(
+            url, alg=alg, min_size=0, allow_fallback=False, cache_allowed_requests=True
+        )
+    )
+    for w3 in (middleware, direct):
+        w3.middleware_onion.clear()
+    middleware.middleware_onion.add(
+        CompressionMiddleware(alg=alg, min_size=0, allow_fallback=False)
+    )
+    return {"middleware": middleware, "provider": direct}
+
+
+def run(
+    profiles: Iterable[str],
+    sizes: Iterable[int],
+    *,
+    repeat: int,
+    algs: Iterable[str] = ALGS,
+    kind: str = "aggregate",
+) -> dict[str, dict[str, float]]:
+    """eth_call latency of HTTPProvider + CompressionMiddleware vs CompressingHTTPProvider.
+
+    Keys are `provider/<profile>/<client>/<alg>/<size>`; `speedup` is the middleware p50 over
+    the client's p50.
+    """
+    results: dict[str, dict[str, float]] = {}
+    for profile in profiles:
+        with RPCServer(profile=profile) as srv:
+            for size in sizes:
+                data = payload(kind, size)
+                tx = {"to": ECHO_ADDRESS, "data": data}
+                n = (len(data) - 2) // 2
+                for alg in algs:
+                    base = 0.0
+                    for client, w3 in _clients(srv.url, alg).items():
+                        r = measure(
+                            lambda w=w3, t=tx: w.eth.call(t), size=n, repeat=repeat, warmup=1
+                        )
+                        base = base or r["p50_us"]
+                        r["speedup"] = base / r["p50_us"] if r["p50_us"] else 0.0
+                        results[f"provider/{profile}/{client}/{alg}/{size}"] = r
+    return results
+
+
+# CompressingHTTPProvider options per strategy; "vanilla" is a plain HTTPProvider
+STRATEGIES: dict[str, dict[str, Any]] = {
+    "codecs": {"alg": "auto"},
+    "gzip": {"alg": "gzip"},
+    "auto": {"alg": "auto", "transport": "auto"},
+}
+
+
+def run_transport(
+    profiles: Iterable[str],
+    sizes: Iterable[int],
+    *,
+    repeat: int,
+    kind: str = "aggregate",
+) -> dict[str, dict[str, float]]:
+    """On-chain codecs vs HTTP gzip vs auto selection between both, per network profile.
+
+    The server accepts gzip and deflate request bodies. Keys are
+    `transport/<profile>/<strategy>/<size>`; `request_bytes` is the body sent per call.
+    """
+    results: dict[str, dict[str, float]] = {}
+    for profile in profiles:
+        with RPCServer(profile=profile, accept_encodings=("gzip", "deflate")) as srv:
+            link = PROFILES[profile].up_kbps or 1_000_000
+            clients = {"vanilla": Web3(HTTPProvider(srv.url, cache_allowed_requests=True))}
+            for name, options in STRATEGIES.items():
+                p = CompressingHTTPProvider(
+                    srv.url, min_size=0, bandwidth_kbps=link, cache_allowed_requests=True, **options
+                )
+                p.accepted_encodings()  # probe outside the timed runs
+                clients[name] = Web3(p)
+            for w3 in clients.values():
+                w3.middleware_onion.clear()
+            for size in sizes:
+                data = payload(kind, size)
+                tx = {"to": ECHO_ADDRESS, "data": data}
+                n = (len(data) - 2) // 2
+                for name, w3 in clients.items():
+                    sent = srv.bytes_in
+                    r = measure(lambda w=w3, t=tx: w.eth.call(t), size=n, repeat=repeat, warmup=1)
+                    r["request_bytes"] = (srv.bytes_in - sent) / (repeat + 1)
+                    results[f"transport/{profile}/{name}/{size}"] = r
+    return results
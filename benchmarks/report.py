@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+# Metrics where a larger value is a regression; throughput regresses when it drops
+LATENCY_METRICS = ("p50_us", "p99_us")
+THROUGHPUT_METRICS = ("mb_s",)
+GAS_METRICS = ("gas_p50", "gas_p99")
+
+
+def write(path: str | Path, meta: dict[str, Any], results: dict[str, dict[str, float]]) -> None:
+    Path(path).write_text(json.dumps({"meta": meta, "results": results}, indent=2) + "\n")
+
+
+def load(path: str | Path) -> dict[str, dict[str, float]]:
+    doc = json.loads(Path(path).read_text())
+    return dict(doc.get("results", {}))
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    *,
+    max_throughput_drop: float = 0.10,
+    max_latency_increase: float = 0.20,
+    max_gas_increase: float = 0.02,
+) -> list[str]:
+    """Returns one message per metric that regressed beyond its threshold.
+
+    Thresholds are fractions of the baseline value. Entries missing from either side
+    are ignored, so adding or removing cases does not fail a comparison.
+    """
+    regressions: list[str] = []
+    for key, cur in sorted(results.items()):
+        base = baseline.get(key)
+        if not base:
+            continue
+        for metric in THROUGHPUT_METRICS:
+            b, c = base.get(metric), cur.get(metric)
+            if b and c is not None and c < b * (1 - max_throughput_drop):
+                regressions.append(f"{key} {metric}: {c:.2f} < {b:.2f} (-{(1 - c / b) * 100:.1f}%)")
+        for metric in LATENCY_METRICS:
+            b, c = base.get(metric), cur.get(metric)
+            if b and c is not None and c > b * (1 + max_latency_increase):
+                regressions.append(f"{key} {metric}: {c:.1f} > {b:.1f} (+{(c / b - 1) * 100:.1f}%)")
+        for metric in GAS_METRICS:
+            b, c = base.get(metric), cur.get(metric)
+            if b and c is not None and c > b * (1 + max_gas_increase):
+                regressions.append(f"{key} {metric}: {c:.0f} > {b:.0f} (+{(c / b - 1) * 100:.1f}%)")
+    return regressions
+
+
+def summary(results: dict[str, dict[str, float]]) -> str:
+    lines = [f"{'case':<48} {'MB/s':>9} {'p50 us':>10} {'p99 us':>10}"]
+    gas_lines = [f"{'case':<48} {'gas p50':>9} {'gas p99':>10} {'gas/byte':>10}"]
+    for key, r in results.items():
+        if "mb_s" in r:
+            line = f"{key:<48} {r['mb_s']:>9.2f} {r['p50_us']:>10.1f} {r['p99_us']:>10.1f}"
+            if "speedup" in r:
+                line += f"  x{r['speedup']:.2f}"
+            lines.append(line)
+        elif "gas_p50" in r:
+            gas_lines.append(
+                f"{key:<48} {r['gas_p50']:>9.0f} {r['gas_p99']:>10.0f} {r['gas_per_byte']:>10.2f}"
+            )
+        elif "per_byte" in r:
+            gas_lines.append(
+                f"{key:<48} {'gas = ':>9}{r['intercept']:>10.0f} + {r['per_byte']:.2f}/byte"
+            )
+    sections = [block for block in (lines, gas_lines) if len(block) > 1]
+    return "\n\n".join("\n".join(block) for block in sections)
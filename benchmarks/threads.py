@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import sysconfig
+
+from ethcompress import compress_call_data
+from ethcompress.testing import corpus
+
+from .timing import measure
+
+
+def free_threaded_build() -> bool:
+    return bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+
+
+def gil_enabled() -> bool:
+    """False only on a free-threaded build running without the GIL (3.13t, PYTHON_GIL=0)."""
+    is_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_enabled is None else bool(is_enabled())
+
+
+def run(
+    threads: Iterable[int],
+    *,
+    count: int = 256,
+    repeat: int = 3,
+    seed: int = 0,
+    min_size: int = 1024,
+    max_size: int = 8192,
+) -> dict[str, dict[str, float]]:
+    """Throughput of compress_call_data on a thread pool per thread count.
+
+    Runs on any build. With the GIL, extra threads cannot speed up the pure Python codecs
+    and speedup stays near 1; on a free-threaded build it should track the core count.
+    Keys are `threads/<n>`; `speedup` is relative to the first count and `gil` records
+    whether the GIL was enabled.
+    """
+    items = [(s.to, s.data) for s in corpus(count, seed=seed, min_size=min_size, max_size=max_size)]
+    size = sum((len(d) - 2) // 2 for _, d in items)
+    gil = float(gil_enabled())
+    results: dict[str, dict[str, float]] = {}
+    base = 0.0
+    for n in threads:
+        with ThreadPoolExecutor(max_workers=n) as pool:
+
+            def job(p: ThreadPoolExecutor = pool) -> None:
+                list(p.map(lambda item: compress_call_data(item[1], item[0]), items, chunksize=8))
+
+            r = measure(job, size=size, repeat=repeat, warmup=1)
+        base = base or r["mb_s"]
+        r["calls_s"] = count / (r["p50_us"] / 1e6) if r["p50_us"] else 0.0
+        r["speedup"] = r["mb_s"] / base if base else 0.0
+        r["gil"] = gil
+        results[f"threads/{n}"] = r
+    return results
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+import time
+from typing import Any
+
+
+def percentile(sorted_values: list[int], pct: float) -> int:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0
+    k = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def measure(fn: Callable[[], Any], *, size: int, repeat: int, warmup: int = 2) -> dict[str, float]:
+    """Times fn() `repeat` times and returns latency percentiles (us) and throughput (MB/s)."""
+    for _ in range(warmup):
+        fn()
+    samples: list[int] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - t0)
+    samples.sort()
+    p50 = percentile(samples, 50)
+    return {
+        "bytes": size,
+        "runs": repeat,
+        "mb_s": size / (p50 / 1e9) / 1e6 if p50 else 0.0,
+        "p50_us": p50 / 1e3,
+        "p90_us": percentile(samples, 90) / 1e3,
+        "p99_us": percentile(samples, 99) / 1e3,
+    }
@@ -0,0 +1,132 @@
+from .utils import bytes_to_hex as _bytes_to_hex, hex_string as _hex_string, norm_hex
+
+"""
+ABI column transform, applied before FLZ or RLE.
+
+ABI calldata is a selector followed by 32-byte words whose values are padded
+with zero bytes: addresses and uints on the left, selectors and bytes tails on
+the right. The transform strips the padding from every word and regroups the
+remaining bytes into one column per word type, so that similar values (all
+address bodies, all small offsets, all inner selectors) sit next to each other
+and the entropy coder sees long repeats instead of short ones split by padding.
+
+Word types are detected automatically: the tag of a word is the number z of
+zero bytes stripped from it, with 0x80 set when the zeros are trailing.
+
+Stream layout:
+    - 3 bytes: original calldata length L (at least 4)
+    - 4 bytes: selector
+    - 1 byte:  number of columns K
+    - K entries: [tag][3 bytes: column length], in ascending tag order
+    - ceil((L - 4) / 32) tag bytes, one per word
+    - the columns, concatenated in header order
+
+The inverse runs on-chain (abi_fwd_bytecode): it is called with the restored
+stream by a FLZ or RLE forwarder and calls the target with the original calldata.
+"""
+
+MAX_SIZE = (1 << 24) - 1
+TRAILING = 0x80
+
+
+def _tag(word: bytes) -> int:
+    lead = len(word) - len(word.lstrip(b"\x00"))
+    trail = len(word) - len(word.rstrip(b"\x00"))
+    if trail > lead:
+        return TRAILING | trail
+    return lead
+
+
+def abi_transform(data: str) -> str:
+    """Reorders hex encoded ABI calldata into per word type columns.
+
+    Returns a lower-case hex string with 0x prefix.
+    Raises ValueError if the input is shorter than a selector or exceeds the format limits.
+    """
+    ib = bytes.fromhex(_hex_string(data))
+    n = len(ib)
+    if n < 4:
+        raise ValueError("Data too short for ABI transform.")
+    if n > MAX_SIZE:
+        raise ValueError("Data too large for ABI transform.")
+
+    body = ib[4:]
+    rem = len(body) % 32
+    if rem:
+        body += b"\x00" * (32 - rem)
+
+    tags = bytearray()
+    columns: dict[int, bytearray] = {}
+    for i in range(0, len(body), 32):
+        word = body[i : i + 32]
+        tag = _tag(word)
+        z = tag & 0x3F
+        tags.append(tag)
+        if z < 32:
+            columns.setdefault(tag, bytearray()).extend(
+                word[: 32 - z] if tag & TRAILING else word[z:]
+            )
+
+    order = sorted(columns)
+    out = bytearray(n.to_bytes(3, "big"))
+    out += ib[:4]
+    out.append(len(order))
+    for tag in order:
+        out.append(tag)
+        out += len(columns[tag]).to_bytes(3, "big")
+    out += tags
+    for tag in order:
+        out += columns[tag]
+    return _bytes_to_hex(bytes(out))
+
+
+def abi_restore(data: str) -> str:
+    """Restores the original calldata from an abi_transform stream.
+
+    Returns a lower-case hex string with 0x prefix.
+    """
+    ib = bytes.fromhex(_hex_string(data))
+    if len(ib) < 8:
+        raise ValueError("Unexpected end of data during ABI restore.")
+    n = int.from_bytes(ib[0:3], "big")
+    if n < 4:
+        raise ValueError("Invalid length during ABI restore.")
+    k = ib[7]
+    pos = 8
+    cursors: dict[int, int] = {}
+    start = 8 + 4 * k + (n + 27) // 32
+    for _ in range(k):
+        if pos + 4 > len(ib):
+            raise ValueError("Unexpected end of data during ABI restore.")
+        cursors[ib[pos]] = start
+        start += int.from_bytes(ib[pos + 1 : pos + 4], "big")
+        pos += 4
+    if start > len(ib):
+        raise ValueError("Unexpected end of data during ABI restore.")
+
+    out = bytearray(ib[3:7])
+    for tag in ib[pos : pos + (n + 27) // 32]:
+        z = tag & 0x3F
+        if z >= 32:
+            out += b"\x00" * 32
+            continue
+        if tag not in cursors:
+            raise ValueError("Invalid word tag during ABI restore.")
+        src = cursors[tag]
+        val = ib[src : src + 32 - z]
+        cursors[tag] = src + 32 - z
+        out += val + b"\x00" * z if tag & TRAILING else b"\x00" * z + val
+    if len(out) < n:
+        raise ValueError("Unexpected end of data during ABI restore.")
+    return _bytes_to_hex(bytes(out[:n]))
+
+
+def abi_fwd_bytecode(address: str) -> str:
+    return (
+        "0x5f3560e81c60033560e01c6114205260073560f81c60021b60080181601b0160051c81810160085b83811015604e5780358060e01c62ffffff169060f81c60051b839052820191506004016027565b50508101906114405b82821015609357813560f81c8060051b805182603f16806020038201835260031b9035811c908360071c021b8352505060200190600101906057565b5050505f809161143c3473"
+        + norm_hex(address)
+        + "5af1503d5f803e3d5ff3"
+    )
+
+
+__all__ = ["abi_fwd_bytecode", "abi_restore", "abi_transform"]
@@ -0,0 +1,110 @@
+from .utils import bytes_to_hex as _bytes_to_hex, hex_string as _hex_string, norm_hex
+
+"""
+Structure-aware encoding of Multicall3.aggregate((address,bytes)[]) calls.
+
+Instead of ABI encoding the batch and compressing the result, the stream stores what the
+ABI encoding is derived from: each distinct target and selector once, and per call the two
+table indices and the arguments. The forwarder rebuilds the ABI encoding in memory (head,
+offset table, per call address / bytes offset / length / padded data) and calls Multicall3.
+
+Stream layout:
+    - 2 bytes: call count N
+    - 1 byte:  target count T
+    - 1 byte:  selector count S
+    - T targets, 20 bytes each
+    - S selectors, 4 bytes each
+    - N calls: [target index][selector index][2 bytes: calldata length L][L - 4 argument bytes]
+
+Every call needs at least a selector (L >= 4); L is at most 0xffff.
+"""
+
+AGGREGATE = bytes.fromhex("252dba42")  # aggregate((address,bytes)[])
+MAX_CALLS = 0xFFFF
+MAX_TABLE = 0xFF
+MAX_CALL_SIZE = 0xFFFF
+
+
+def _word(n: int) -> bytes:
+    return n.to_bytes(32, "big")
+
+
+def aggregate_calldata(calls: list[tuple[bytes, bytes]]) -> bytes:
+    """ABI encodes aggregate((address,bytes)[]) directly, without a generic encoder."""
+    head = bytearray(AGGREGATE + _word(0x20) + _word(len(calls)))
+    tails = bytearray()
+    offset = 32 * len(calls)
+    for target, data in calls:
+        head += _word(offset)
+        pad = -len(data) % 32
+        tails += bytes(12) + target + _word(0x40) + _word(len(data)) + data + bytes(pad)
+        offset += 96 + len(data) + pad
+    return bytes(head + tails)
+
+
+def agg_compress(calls: list[tuple[bytes, bytes]]) -> str:
+    """Encodes (20-byte target, calldata) pairs as an aggregate stream.
+
+    Returns a lower-case hex string with 0x prefix.
+    Raises ValueError if a call has no selector or the batch exceeds the format limits.
+    """
+    if len(calls) > MAX_CALLS:
+        raise ValueError("Too many calls for aggregate encoding.")
+    targets: dict[bytes, int] = {}
+    selectors: dict[bytes, int] = {}
+    body = bytearray()
+    for target, data in calls:
+        if len(target) != 20:
+            raise ValueError("Targets must be 20 byte addresses.")
+        if not 4 <= len(data) <= MAX_CALL_SIZE:
+            raise ValueError("Calldata must hold a selector and fit in 64 KB.")
+        t = targets.setdefault(target, len(targets))
+        s = selectors.setdefault(data[:4], len(selectors))
+        if t >= MAX_TABLE or s >= MAX_TABLE:
+            raise ValueError("Too many distinct targets or selectors for aggregate encoding.")
+        body += bytes((t, s)) + len(data).to_bytes(2, "big") + data[4:]
+    out = bytearray(len(calls).to_bytes(2, "big") + bytes((len(targets), len(selectors))))
+    out += b"".join(targets)
+    out += b"".join(selectors)
+    out += body
+    return _bytes_to_hex(bytes(out))
+
+
+def agg_decompress(data: str) -> str:
+    """Restores the aggregate calldata from an agg_compress stream, as the forwarder does.
+
+    Returns a lower-case hex string with 0x prefix.
+    """
+    ib = bytes.fromhex(_hex_string(data))
+    if len(ib) < 4:
+        raise ValueError("Unexpected end of data during aggregate decoding.")
+    n = int.from_bytes(ib[0:2], "big")
+    t, s = ib[2], ib[3]
+    targets = [ib[4 + 20 * i : 24 + 20 * i] for i in range(t)]
+    base = 4 + 20 * t
+    selectors = [ib[base + 4 * i : base + 4 + 4 * i] for i in range(s)]
+    pos = base + 4 * s
+    calls: list[tuple[bytes, bytes]] = []
+    for _ in range(n):
+        if pos + 4 > len(ib):
+            raise ValueError("Unexpected end of data during aggregate decoding.")
+        ti, si, size = ib[pos], ib[pos + 1], int.from_bytes(ib[pos + 2 : pos + 4], "big")
+        if ti >= t or si >= s or size < 4:
+            raise ValueError("Invalid call header during aggregate decoding.")
+        end = pos + size
+        if end > len(ib):
+            raise ValueError("Unexpected end of data during aggregate decoding.")
+        calls.append((targets[ti], selectors[si] + ib[pos + 4 : end]))
+        pos = end
+    return _bytes_to_hex(aggregate_calldata(calls))
+
+
+def agg_fwd_bytecode(address: str) -> str:
+    return (
+        "0x5f358060e81c60ff166014026004018160f01c63252dba425f52602080528060405260051b606001808360e01c60ff1660021b830160605b8381101560af576060830381526020019080358060f81c6014026004013560601c8452604084602001528060e01c61ffff168085604001529060f01c60ff1660040286013560e01c60e01b8460600152600481038083600401866064013782016004019150601f01601f191683016060019250906037565b5050601c90035f5f82601c3473"
+        + norm_hex(address)
+        + "5af1503d5f803e3d5ff3"
+    )
+
+
+__all__ = ["agg_compress", "agg_decompress", "agg_fwd_bytecode", "aggregate_calldata"]
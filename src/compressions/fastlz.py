@@ -9,12 +9,26 @@ Reference:
 """
 
 
-def flz_compress(data: str) -> str:
+FLZ_WINDOW = 8192
+FLZ_MAX_MATCH = 264
+FLZ_LEVELS = (1, 2, 3)
+FLZ_NICE_MATCH = 64
+
+
+def flz_compress(data: str, level: int = 1) -> str:
     """Compresses hex encoded data with the FastLZ variant used by Solady.
 
-    Direct, literal port of solady.js LibZip.flzCompress for bit-exact behavior.
+    Level 1 is a direct, literal port of solady.js LibZip.flzCompress for bit-exact behavior.
+    Level 2 uses lazy matching and level 3 an optimal (shortest path) parse. Both emit the
+    same token format, so the output decodes with flz_decompress and flz_fwd_bytecode.
     """
+    if level not in FLZ_LEVELS:
+        raise ValueError(f"FLZ level must be one of {FLZ_LEVELS}.")
     hex_data = _hex_string(data)
+    if level == 2:
+        return _bytes_to_hex(_flz_lazy(bytes.fromhex(hex_data)))
+    if level == 3:
+        return _bytes_to_hex(_flz_optimal(bytes.fromhex(hex_data)))
     # Work with Python lists of ints for close parity with JS arrays
     ib = list(bytes.fromhex(hex_data))
     n = len(ib)
@@ -104,6 +118,154 @@ def flz_compress(data: str) -> str:
     return _bytes_to_hex(bytes(ob))
 
 
+def _flz_literals(ob: bytearray, ib: bytes, s: int, e: int) -> None:
+    while s < e:
+        r = min(32, e - s)
+        ob.append(r - 1)
+        ob.extend(ib[s : s + r])
+        s += r
+
+
+def _flz_match(ob: bytearray, match_len: int, dist: int) -> None:
+    d = dist - 1
+    while match_len > FLZ_MAX_MATCH:
+        ob.append(224 + (d >> 8))
+        ob.append(253)
+        ob.append(d & 255)
+        match_len -= 262
+    if match_len <= 8:
+        ob.append(((match_len - 2) << 5) + (d >> 8))
+        ob.append(d & 255)
+    else:
+        ob.append(224 + (d >> 8))
+        ob.append(match_len - 9)
+        ob.append(d & 255)
+
+
+class _MatchFinder:
+    """Hash chains over 3-byte prefixes within the 8 KB window."""
+
+    __slots__ = ("depth", "head", "ib", "n", "prev")
+
+    def __init__(self, ib: bytes, depth: int):
+        self.ib = ib
+        self.n = len(ib)
+        self.depth = depth
+        self.head: dict[bytes, int] = {}
+        self.prev = [-1] * self.n
+
+    def insert(self, i: int) -> None:
+        if i + 3 <= self.n:
+            key = self.ib[i : i + 3]
+            self.prev[i] = self.head.get(key, -1)
+            self.head[key] = i
+
+    def longest(self, i: int) -> tuple[int, int]:
+        """Returns (length, distance) of the longest match at i, (0, 0) if none."""
+        ib = self.ib
+        if i + 3 > self.n:
+            return 0, 0
+        limit = self.n - i
+        best_len = 0
+        best_dist = 0
+        r = self.head.get(ib[i : i + 3], -1)
+        depth = self.depth
+        while r >= 0 and i - r <= FLZ_WINDOW and depth:
+            if ib[r + best_len] == ib[i + best_len] if best_len < limit else False:
+                k = 3
+                while k + 32 <= limit and ib[r + k : r + k + 32] == ib[i + k : i + k + 32]:
+                    k += 32
+                while k < limit and ib[r + k] == ib[i + k]:
+                    k += 1
+                if k > best_len:
+                    best_len = k
+                    best_dist = i - r
+                    if k == limit:
+                        break
+            r = self.prev[r]
+            depth -= 1
+        return best_len, best_dist
+
+
+def _flz_lazy(ib: bytes) -> bytes:
+    n = len(ib)
+    ob = bytearray()
+    mf = _MatchFinder(ib, 16)
+    a = 0
+    i = 0
+    while i < n:
+        match_len, dist = mf.longest(i)
+        mf.insert(i)
+        if match_len < 3:
+            i += 1
+            continue
+        # Defer by one byte if the next position has a strictly longer match
+        next_len, _ = mf.longest(i + 1)
+        if next_len > match_len + 1:
+            i += 1
+            continue
+        _flz_literals(ob, ib, a, i)
+        _flz_match(ob, match_len, dist)
+        for j in range(i + 1, i + match_len):
+            mf.insert(j)
+        i += match_len
+        a = i
+    _flz_literals(ob, ib, a, n)
+    return bytes(ob)
+
+
+def _flz_optimal(ib: bytes) -> bytes:
+    n = len(ib)
+    inf = 1 << 62
+    cost = [inf] * (n + 1)
+    cost[0] = 0
+    # step[i] = (start, dist): bytes start..i are literals when dist == 0, else one match
+    step: list[tuple[int, int]] = [(0, 0)] * (n + 1)
+    mf = _MatchFinder(ib, 64)
+    skip = 0
+    for i in range(n):
+        if i < skip:
+            mf.insert(i)
+            continue
+        c = cost[i]
+        for r in range(1, min(32, n - i) + 1):
+            if c + r + 1 < cost[i + r]:
+                cost[i + r] = c + r + 1
+                step[i + r] = (i, 0)
+        match_len, dist = mf.longest(i)
+        mf.insert(i)
+        # Long enough matches are taken outright and the positions they cover skipped;
+        # anything past FLZ_MAX_MATCH is continued by the search at the match end.
+        if match_len >= FLZ_NICE_MATCH:
+            m = min(match_len, FLZ_MAX_MATCH)
+            if c + 3 < cost[i + m]:
+                cost[i + m] = c + 3
+                step[i + m] = (i, dist)
+            skip = i + m
+            continue
+        for m in range(3, match_len + 1):
+            mc = c + (2 if m <= 8 else 3)
+            if mc < cost[i + m]:
+                cost[i + m] = mc
+                step[i + m] = (i, dist)
+
+    path: list[tuple[int, int, int]] = []
+    i = n
+    while i > 0:
+        start, dist = step[i]
+        path.append((start, i, dist))
+        i = start
+    ob = bytearray()
+    a = 0
+    for start, end, dist in reversed(path):
+        if dist:
+            _flz_literals(ob, ib, a, start)
+            _flz_match(ob, end - start, dist)
+            a = end
+    _flz_literals(ob, ib, a, n)
+    return bytes(ob)
+
+
 def flz_decompress(data: str) -> str:
     """Decompresses hex encoded data with the FastLZ variant used by Solady.
 
@@ -153,4 +315,127 @@ def flz_fwd_bytecode(address: str) -> str:
     )
 
 
-__all__ = ["flz_compress", "flz_decompress", "flz_fwd_bytecode"]
+# FLZ64K: same literal runs as FLZ, but matches carry a 16-bit distance and lengths
+# up to 227 + 0xffff, so repetition across 100 KB+ aggregates stays reachable.
+#   t < 0x20                      (t + 1) literal bytes follow
+#   0x20 <= t < 0xff, dh, dl      match of t - 0x1c bytes (4..226) at distance (dh << 8 | dl) + 1
+#   0xff, lh, ll, dh, dl          match of (lh << 8 | ll) + 227 bytes at distance (dh << 8 | dl) + 1
+FLZ64K_WINDOW = 1 << 16
+FLZ64K_MAX_MATCH = 227 + 0xFFFF
+
+
+def flz64k_compress(data: str) -> str:
+    """Compresses hex encoded data with the 64 KB window FastLZ variant.
+
+    Greedy LZ77 parse over a 16-bit hash of 4-byte sequences.
+    Returns a lower-case hex string with 0x prefix.
+    """
+    hex_data = _hex_string(data)
+    ib = bytes.fromhex(hex_data)
+    n = len(ib)
+    ob = bytearray()
+    ht = [-1] * 65536
+
+    def literals(s: int, e: int) -> None:
+        while s < e:
+            r = min(32, e - s)
+            ob.append(r - 1)
+            ob.extend(ib[s : s + r])
+            s += r
+
+    a = 0
+    i = 0
+    last = n - 4
+    while i <= last:
+        x = ib[i] | (ib[i + 1] << 8) | (ib[i + 2] << 16) | (ib[i + 3] << 24)
+        h = ((2654435769 * x) & 0xFFFFFFFF) >> 16
+        r = ht[h]
+        ht[h] = i
+        if r < 0 or i - r > FLZ64K_WINDOW or ib[r : r + 4] != ib[i : i + 4]:
+            i += 1
+            continue
+        # Extend in 32-byte chunks first, then byte by byte
+        max_len = min(n - i, FLZ64K_MAX_MATCH)
+        match_len = 4
+        while (
+            match_len + 32 <= max_len
+            and ib[r + match_len : r + match_len + 32] == ib[i + match_len : i + match_len + 32]
+        ):
+            match_len += 32
+        while match_len < max_len and ib[r + match_len] == ib[i + match_len]:
+            match_len += 1
+        literals(a, i)
+        d = i - r - 1
+        if match_len <= 226:
+            ob.append(match_len + 0x1C)
+        else:
+            ob.append(0xFF)
+            ob.extend((match_len - 227).to_bytes(2, "big"))
+        ob.extend(d.to_bytes(2, "big"))
+        i += match_len
+        a = i
+        # Seed the table with the tail of the match so the next search can chain on it
+        for j in (i - 2, i - 1):
+            if j + 4 <= n:
+                y = ib[j] | (ib[j + 1] << 8) | (ib[j + 2] << 16) | (ib[j + 3] << 24)
+                ht[((2654435769 * y) & 0xFFFFFFFF) >> 16] = j
+    literals(a, n)
+
+    return _bytes_to_hex(bytes(ob))
+
+
+def flz64k_decompress(data: str) -> str:
+    """Decompresses hex encoded data produced by flz64k_compress.
+
+    Returns a lower-case hex string with 0x prefix.
+    """
+    hex_data = _hex_string(data)
+    ib = bytes.fromhex(hex_data)
+    ob = bytearray()
+    i = 0
+    n = len(ib)
+    while i < n:
+        t = ib[i]
+        if t < 0x20:
+            ob.extend(ib[i + 1 : i + 2 + t])
+            i += 2 + t
+            continue
+        if t < 0xFF:
+            match_len = t - 0x1C
+            f = (ib[i + 1] << 8) | ib[i + 2]
+            i += 3
+        else:
+            match_len = ((ib[i + 1] << 8) | ib[i + 2]) + 227
+            f = (ib[i + 3] << 8) | ib[i + 4]
+            i += 5
+        if i > n:
+            raise ValueError("Unexpected end of data during decompression.")
+        r = len(ob) - f - 1
+        if r < 0:
+            raise ValueError("Invalid back-reference during decompression.")
+        if f + 1 >= match_len:
+            ob.extend(ob[r : r + match_len])
+        else:
+            for _ in range(match_len):
+                ob.append(ob[r])
+                r += 1
+
+    return _bytes_to_hex(bytes(ob))
+
+
+def flz64k_fwd_bytecode(address: str) -> str:
+    return (
+        "0x5f5f5b36811015609f5780358060f81c806020116087578060ff14603557601c90039060e81c61ffff1660010191600301916052565b508060e81c61ffff1660e3019060d81c61ffff1660010191600501915b80840351845260208110602082030260200182811015607d57808501945082039150602081101b6052565b5050909101906002565b90506001018082600101843780920191600101016002565b505f80915f3473"
+        + norm_hex(address)
+        + "5af1503d5f803e3d5ff3"
+    )
+
+
+__all__ = [
+    "flz64k_compress",
+    "flz64k_decompress",
+    "flz64k_fwd_bytecode",
+    "flz_compress",
+    "flz_decompress",
+    "flz_fwd_bytecode",
+]
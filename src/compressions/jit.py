@@ -5,6 +5,14 @@ from .utils import hex_to_bytes as _hex_to_bytes, norm_hex
 MAX_128_BIT = (1 << 128) - 1
 MASK32 = (1 << 256) - 1
 
+# Data section (CODECOPY) variant: runs of at least DATA_MIN_WORDS consecutive, first-seen
+# words with at most DATA_MAX_ZEROS leading plus trailing zero bytes are appended raw after
+# the epilogue and copied with one CODECOPY instead of a PUSH32/MSTORE per word.
+DATA_MAX_ZEROS = 2
+DATA_MIN_WORDS = 3
+# Stack model placeholder for code offsets (outside the 256-bit range, never deduplicated)
+CODE_OFFSET = 1 << 257
+
 
 def _bytes_to_hex(data: bytes) -> str:
     return data.hex()
@@ -14,22 +22,48 @@ def _uint8_to_hex(arr: list[int]) -> str:
     return "".join(f"{b:02x}" for b in arr)
 
 
-def jit_bytecode(calldata: str) -> str:
-    return _jit_decompressor("0x" + norm_hex(calldata))
+def jit_bytecode(calldata: str, data_section: bool = False) -> str:
+    return _jit_decompressor("0x" + norm_hex(calldata), data_section)
+
+
+def jit_data_spans(calldata: str) -> list[tuple[int, int]]:
+    """Word-aligned (start, end) offsets the data section variant would CODECOPY."""
+    return _dense_spans(_aligned(_hex_to_bytes(norm_hex(calldata)))[0])
+
+
+def _aligned(original: bytes) -> tuple[bytes, int]:
+    # Right-align the 4-byte selector in the first 32-byte slot to improve alignment.
+    if len(original) >= 4:
+        padding = 32 - 4
+        return bytes([0] * padding) + original[:4] + original[4:], padding
+    return original, 0
+
 
+def _dense_spans(buf: bytes) -> list[tuple[int, int]]:
+    spans: list[tuple[int, int]] = []
+    seen: set[bytes] = set()
+    start = -1
+    n = len(buf)
+    # One extra iteration past the end flushes the last run
+    for base in range(0, n + 32, 32):
+        word = buf[base : base + 32].ljust(32, b"\x00") if base < n else b""
+        if word and word not in seen and len(word.strip(b"\x00")) >= 32 - DATA_MAX_ZEROS:
+            if start < 0:
+                start = base
+        else:
+            if start >= 0 and base - start >= DATA_MIN_WORDS * 32:
+                spans.append((start, base))
+            start = -1
+        seen.add(word)
+    return spans
 
-def _jit_decompressor(calldata: str) -> str:
+
+def _jit_decompressor(calldata: str, data_section: bool = False) -> str:
     hex_data = norm_hex(calldata)
     original = _hex_to_bytes(hex_data)
     original_len = len(original)
 
-    # Right-align the 4-byte selector in the first 32-byte slot to improve alignment.
-    if original_len >= 4:
-        padding = 32 - 4
-        buf_bytes = bytes([0] * padding) + original[:4] + original[4:]
-    else:
-        padding = 0
-        buf_bytes = original
+    buf_bytes, padding = _aligned(original)
     buf = list(buf_bytes)
     n = len(buf)
 
@@ -38,6 +72,8 @@ def _jit_decompressor(calldata: str) -> str:
     stack: list[int] = []
     tracked_mem_size = 0
     mem: dict[int, int] = {}
+    fixups: list[tuple[int, int]] = []
+    offset_width = 2 if 3 * n + 1024 < (1 << 16) else 3
 
     def get_stack_idx(val: int) -> int:
         try:
@@ -154,6 +190,10 @@ def _jit_decompressor(calldata: str) -> str:
         elif op == 0x53:  # MSTORE8
             offset, _value = pop2()
             track_mem(int(offset), 1)
+        elif op == 0x39:  # CODECOPY
+            offset, _src = pop2()
+            size = stack.pop()
+            track_mem(int(offset), int(size))
         elif op == 0xF3:  # RETURN
             _ = pop2()
         push_op(op)
@@ -182,6 +222,21 @@ def _jit_decompressor(calldata: str) -> str:
     def push_b(b: bytes) -> None:
         add_op(0x5F + len(b), list(b))
 
+    def push_code_offset(rel: int) -> None:
+        # Patched with the absolute data section offset once the code length is known
+        push_s(CODE_OFFSET + rel)
+        push_op(0x5F + offset_width)
+        push_d([0] * offset_width)
+        fixups.append((len(ops) - 1, rel))
+
+    def code_copy(rel: int, dest: int, size: int) -> None:
+        push_n(size)
+        push_code_offset(rel)
+        push_n(dest)
+        op(0x39)  # CODECOPY
+        for wb in range(dest & ~31, dest + size, 32):
+            mem[wb] = int.from_bytes(bytes(buf[wb : wb + 32]).ljust(32, b"\x00"), "big")
+
     def cnt_words(big_hex: str, word_hex: str) -> int:
         # Count occurrences (non-overlapping is fine for 64-char words)
         return big_hex.count(word_hex)
@@ -228,6 +283,19 @@ def _jit_decompressor(calldata: str) -> str:
         plan.append(PlanStep("op", o=o))
         op(o)
 
+    section = bytearray()
+
+    def emit_code_copy(start: int, end: int) -> None:
+        chunk = bytes(buf[start:end])
+        lo = start + len(chunk) - len(chunk.lstrip(b"\x00"))
+        hi = start + len(chunk.rstrip(b"\x00"))
+        plan.append(PlanStep("copy", v=len(section), b=bytes(buf[lo:hi]), o=lo))
+        code_copy(len(section), lo, hi - lo)
+        section.extend(buf[lo:hi])
+
+    spans = dict(_dense_spans(buf_bytes)) if data_section else {}
+    span_end = 0
+
     push_n(1)
     for base in range(0, n, 32):
         word = bytearray(32)
@@ -268,6 +336,11 @@ def _jit_decompressor(calldata: str) -> str:
                 freq = cnt_words(hex_data, word_hex)
                 word_cache_cost[word_hex] = reuse_cost if (freq * 32) > (freq * reuse_cost) else -1
                 word_cache[word_hex] = base
+        if base in spans:
+            emit_code_copy(base, spans[base])
+            span_end = spans[base]
+        if base < span_end:
+            continue
         byte8s = all(s == e for s, e in seg)
         if is_in_stack(literal):
             emit_push_b(literal)
@@ -298,6 +371,7 @@ def _jit_decompressor(calldata: str) -> str:
     stack = []
     tracked_mem_size = 0
     mem = {}
+    fixups = []
 
     # Pre 2nd pass: push most frequent literals into stack
     pre_candidates = [
@@ -327,6 +401,9 @@ def _jit_decompressor(calldata: str) -> str:
         elif step.t == "op":
             assert step.o is not None
             op(int(step.o))
+        elif step.t == "copy":
+            assert step.v is not None and step.b is not None and step.o is not None
+            code_copy(int(step.v), int(step.o), len(step.b))
 
     # CALL trampoline stack: [retSize, retOffset, argsSize, argsOffset, value, address, gas]
     op(0x5F)  # PUSH0 (retSize)
@@ -335,12 +412,21 @@ def _jit_decompressor(calldata: str) -> str:
     push_n(padding)  # argsOffset = leading padding bytes
 
     # Flatten ops + immediates
+    fixup_at = dict(fixups)
+    patches: list[tuple[int, int]] = []
     out: list[int] = []
     for i, opcode in enumerate(ops):
         out.append(opcode)
+        if i in fixup_at:
+            patches.append((len(out), fixup_at[i]))
         if 0x60 <= opcode <= 0x7F and data[i]:
             out.extend(data[i] or [])
 
     # Epilogue: CALLVALUE; PUSH0 CALLDATALOAD; GAS; CALL; POP; RETURNDATACOPY/RETURN
     suffix = bytes.fromhex("345f355af13d5f5f3e3d5ff3")
-    return "0x" + _uint8_to_hex(out) + suffix.hex()
+
+    # Data section follows the epilogue, never reached by execution
+    section_start = len(out) + len(suffix)
+    for pos, rel in patches:
+        out[pos : pos + offset_width] = list((section_start + rel).to_bytes(offset_width, "big"))
+    return "0x" + _uint8_to_hex(out) + suffix.hex() + section.hex()
@@ -32,3 +32,40 @@ def to_hex(data: str | bytes) -> str:
         s = data.strip()
         return s if s.startswith("0x") or s.startswith("0X") else ("0x" + s)
     raise TypeError("expected hex string or bytes")
+
+
+# GAS CALL POP, then RETURNDATACOPY the output to memory 0 and RETURN it
+_FORWARD_EPILOGUE = bytes.fromhex("5af1503d5f803e3d5ff3")
+
+
+def revert_on_failure(code_hex: str) -> str:
+    """Forwarder bytecode that REVERTs with the target's output when its call fails.
+
+    The forwarders pop the CALL success flag and always RETURN the output. Here that epilogue
+    jumps to a tail appended to the code, which copies the output and JUMPIs to RETURN on
+    success or falls through to REVERT. The code keeps its length up to the tail, so the
+    absolute jump targets of the decoder stay valid.
+    """
+    code = bytearray(hex_to_bytes(code_hex))
+    starts = []
+    i = 0
+    while i < len(code):
+        if code.startswith(_FORWARD_EPILOGUE, i):
+            starts.append(i)
+        op = code[i]
+        i += 1 + (op - 0x5F if 0x60 <= op <= 0x7F else 0)
+    if len(starts) != 1:
+        raise ValueError("expected exactly one forwarding epilogue")
+    tail = len(code)
+    if tail + 15 > 0xFFFF:
+        raise ValueError("forwarder too large")
+    # GAS CALL PUSH2 tail JUMP, padded with INVALID to the epilogue's length
+    jump = bytes([0x5A, 0xF1, 0x61]) + tail.to_bytes(2, "big") + bytes([0x56])
+    code[starts[0] : starts[0] + len(_FORWARD_EPILOGUE)] = jump.ljust(
+        len(_FORWARD_EPILOGUE), b"\xfe"
+    )
+    # JUMPDEST, copy the output to memory 0, then with (0, size) on the stack JUMPI to RETURN
+    # on success, else REVERT: RETURNDATASIZE PUSH0 DUP3 PUSH2 ok JUMPI REVERT ok: JUMPDEST RETURN
+    code += bytes.fromhex("5b3d5f803e3d5f8261") + (tail + 13).to_bytes(2, "big")
+    code += bytes.fromhex("57fd5bf3")
+    return bytes_to_hex(bytes(code))
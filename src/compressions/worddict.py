@@ -0,0 +1,168 @@
+from .utils import bytes_to_hex as _bytes_to_hex, hex_string as _hex_string, norm_hex
+
+"""
+Word-dictionary codec for ABI encoded calldata.
+
+ABI payloads (Multicall3 aggregates in particular) repeat whole 32-byte words:
+addresses, padded selectors, common amounts. The stream stores every unique
+non-zero word once and rebuilds the calldata from a compact index stream.
+
+Words are taken after right-aligning the 4-byte selector in the first 32-byte
+slot (28 zero bytes of padding, as the JIT does), so ABI words stay aligned.
+
+Stream layout:
+    - 3 bytes: original calldata length (big-endian)
+    - 2 bytes: dictionary entry count
+    - dictionary entries: [tag][32 - z value bytes]
+        tag & 0x3f = z, the number of zero bytes stripped from the word
+        tag & 0x80 = zeros are trailing (left-aligned value) instead of leading
+    - tokens, one per output word:
+        0x00-0x7f          dictionary index t
+        0x80-0xbf, b       dictionary index ((t & 0x3f) << 8) | b
+        0xc0-0xdf          (t & 0x1f) + 1 zero words
+        0xe0-0xff          repeat the previous word (t & 0x1f) + 1 times
+
+Trailing zero words are implicit: the forwarder calls the target with the
+original length from offset 28 and memory past the last token is already zero.
+"""
+
+MAX_WORDS = 1 << 14
+MAX_SIZE = (1 << 24) - 1
+PADDING = 28
+
+
+def _strip_word(word: bytes) -> bytes:
+    lead = len(word) - len(word.lstrip(b"\x00"))
+    trail = len(word) - len(word.rstrip(b"\x00"))
+    if trail > lead:
+        return bytes([0x80 | trail]) + word[: 32 - trail]
+    return bytes([lead]) + word[lead:]
+
+
+def wd_compress(data: str) -> str:
+    """Compresses hex encoded calldata into a word dictionary plus index stream.
+
+    Returns a lower-case hex string with 0x prefix.
+    Raises ValueError if the input exceeds the format limits.
+    """
+    hex_data = _hex_string(data)
+    ib = bytes.fromhex(hex_data)
+    n = len(ib)
+    if n > MAX_SIZE:
+        raise ValueError("Data too large for word dictionary encoding.")
+
+    ib = b"\x00" * PADDING + ib
+    rem = len(ib) % 32
+    if rem:
+        ib += b"\x00" * (32 - rem)
+    words = [ib[i : i + 32] for i in range(0, len(ib), 32)]
+
+    zero = b"\x00" * 32
+    freq: dict[bytes, int] = {}
+    for w in words:
+        if w != zero:
+            freq[w] = freq.get(w, 0) + 1
+    if len(freq) > MAX_WORDS:
+        raise ValueError("Too many unique words for word dictionary encoding.")
+
+    # Most frequent words first so they get single byte indices (ties keep first occurrence).
+    order = sorted(freq, key=freq.__getitem__, reverse=True)
+    index = {w: i for i, w in enumerate(order)}
+
+    out = bytearray(n.to_bytes(3, "big"))
+    out += len(order).to_bytes(2, "big")
+    for w in order:
+        out += _strip_word(w)
+
+    # Drop trailing zero words, the decoder never needs to write them.
+    end = len(words)
+    while end and words[end - 1] == zero:
+        end -= 1
+
+    i = 0
+    prev: bytes | None = None
+    while i < end:
+        w = words[i]
+        j = i + 1
+        if w in (zero, prev):
+            while j < end and j - i < 32 and words[j] == w:
+                j += 1
+            out.append((0xC0 if w == zero else 0xE0) + (j - i - 1))
+        else:
+            idx = index[w]
+            if idx < 0x80:
+                out.append(idx)
+            else:
+                out.append(0x80 | (idx >> 8))
+                out.append(idx & 0xFF)
+        prev = w
+        i = j
+
+    return _bytes_to_hex(bytes(out))
+
+
+def wd_decompress(data: str) -> str:
+    """Decompresses a word dictionary stream produced by wd_compress.
+
+    Returns a lower-case hex string with 0x prefix.
+    """
+    hex_data = _hex_string(data)
+    ib = bytes.fromhex(hex_data)
+    if len(ib) < 5:
+        raise ValueError("Unexpected end of data during decompression.")
+    n = int.from_bytes(ib[0:3], "big")
+    count = int.from_bytes(ib[3:5], "big")
+
+    pos = 5
+    table: list[bytes] = []
+    for _ in range(count):
+        if pos >= len(ib):
+            raise ValueError("Unexpected end of data during decompression.")
+        tag = ib[pos]
+        z = tag & 0x3F
+        val = ib[pos + 1 : pos + 33 - z]
+        if len(val) != 32 - z:
+            raise ValueError("Unexpected end of data during decompression.")
+        table.append(val + b"\x00" * z if tag & 0x80 else b"\x00" * z + val)
+        pos += 33 - z
+
+    zero = b"\x00" * 32
+    out = bytearray()
+    while pos < len(ib):
+        t = ib[pos]
+        pos += 1
+        if t < 0x80:
+            idx = t
+        elif t < 0xC0:
+            if pos >= len(ib):
+                raise ValueError("Unexpected end of data during decompression.")
+            idx = ((t & 0x3F) << 8) | ib[pos]
+            pos += 1
+        else:
+            run = (t & 0x1F) + 1
+            if t < 0xE0:
+                out += zero * run
+            else:
+                if len(out) < 32:
+                    raise ValueError("Invalid repeat during decompression.")
+                out += out[-32:] * run
+            continue
+        if idx >= len(table):
+            raise ValueError("Invalid dictionary index during decompression.")
+        out += table[idx]
+
+    end = PADDING + n
+    if len(out) < end:
+        out += b"\x00" * (end - len(out))
+    return _bytes_to_hex(bytes(out[PADDING:end]))
+
+
+def wd_fwd_bytecode(address: str) -> str:
+    return (
+        "0x5f358060e81c9060d81c61ffff1681603b01601f19169060051b81016005825b82811015605557813560f81c80603f1660031b8360010135811c8260071c82021b8352905060031c60210382019150602001601f565b5090505f5b3682101560d55781358060f81c92600101928060801160c3578060c01160b25780601f1660010160051b9060e01160ab579050602082035191809101905b828152602001818110609857915050605a565b905001605a565b5060f01c613fff16916001019160c6565b90505b60051b8301518152602001605a565b5050505f8091601c3473"
+        + norm_hex(address)
+        + "5af1503d5f803e3d5ff3"
+    )
+
+
+__all__ = ["wd_compress", "wd_decompress", "wd_fwd_bytecode"]
@@ -1,22 +1,60 @@
+from .batch import compress_many
 from .compressor import (
     CompressedCall,
+    build_call_data,
     compress_call_data,
     compress_call_fn,
     compress_eth_call,
+    execute_many,
+    execute_many_async,
+)
+from .instrument import Event, HistogramSink
+from .jit import (
+    abi_fwd_bytecode,
+    flz64k_fwd_bytecode,
+    flz_fwd_bytecode,
+    jit_bytecode,
+    rle_fwd_bytecode,
+    wd_fwd_bytecode,
+)
+from .libzip import (
+    abi_restore,
+    abi_transform,
+    cd_compress,
+    cd_decompress,
+    flz64k_compress,
+    flz64k_decompress,
+    flz_compress,
+    flz_decompress,
+    wd_compress,
+    wd_decompress,
 )
-from .jit import flz_fwd_bytecode, jit_bytecode, rle_fwd_bytecode
-from .libzip import cd_compress, cd_decompress, flz_compress, flz_decompress
 
 __all__ = [
     "CompressedCall",
+    "Event",
+    "HistogramSink",
+    "abi_fwd_bytecode",
+    "abi_restore",
+    "abi_transform",
+    "build_call_data",
     "cd_compress",
     "cd_decompress",
     "compress_call_data",
     "compress_call_fn",
     "compress_eth_call",
+    "compress_many",
+    "execute_many",
+    "execute_many_async",
+    "flz64k_compress",
+    "flz64k_decompress",
+    "flz64k_fwd_bytecode",
     "flz_compress",
     "flz_decompress",
     "flz_fwd_bytecode",
     "jit_bytecode",
     "rle_fwd_bytecode",
+    "wd_compress",
+    "wd_decompress",
+    "wd_fwd_bytecode",
 ]
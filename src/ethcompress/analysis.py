@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+from typing import Any, TextIO
+
+from compressions.utils import hex_to_bytes as _hex_to_bytes
+
+from .compressor import ALGORITHMS, _build, _size_bytes, compress_call_data
+
+# Decode gas as intercept + per_byte * original bytes, fitted with `python -m benchmarks --gas`
+# on the seeded corpus (256 B - 12 KB). Excludes the 21k base cost and calldata gas.
+GAS_MODEL: dict[str, tuple[float, float]] = {
+    "flz": (41628, 59.88),
+    "cd": (14489, 56.75),
+    "jit": (2710, 0.48),
+    "jitcc": (2684, 0.43),
+    "wd": (4975, 6.82),
+    "flz64k": (9003, 7.43),
+    "abi-flz": (37295, 59.65),
+    "abi-cd": (21462, 61.56),
+    # Multicall3 aggregate codecs (ethcompress.multicall), per byte of the ABI encoding,
+    # fitted on batches of 10 - 640 short calls
+    "agg": (2200, 1.92),
+    "agg-flz": (4500, 25.2),
+}
+
+
+def estimate_decode_gas(alg: str, size: int) -> int:
+    """Estimated gas the decompressor of alg spends on `size` bytes of original calldata."""
+    if alg == "vanilla":
+        return 0
+    intercept, per_byte = GAS_MODEL[alg]
+    return max(0, round(intercept + per_byte * size))
+
+
+def analyze_call(
+    to: str,
+    data: str,
+    *,
+    algs: Iterable[str] = ALGORITHMS,
+    min_size: int = 800,
+    level: int = 1,
+) -> dict[str, Any]:
+    """Runs every codec and the auto selection on one call.
+
+    Returns sizes (calldata + code) per codec with build time in ms and estimated decode gas,
+    plus the algorithm auto selection picks and the bytes it saves.
+    Raises ValueError if data is not valid hex.
+    """
+    _hex_to_bytes(data)
+    original = _size_bytes(data)
+    codecs: dict[str, dict[str, Any]] = {}
+    for alg in algs:
+        t0 = time.perf_counter_ns()
+        try:
+            calldata, codes = _build(alg, data, to, {}, level)
+        except Exception:
+            codecs[alg] = {"error": True}
+            continue
+        elapsed = time.perf_counter_ns() - t0
+        code = sum(_size_bytes(c) for c in codes.values())
+        codecs[alg] = {
+            "calldata": _size_bytes(calldata),
+            "code": code,
+            "total": _size_bytes(calldata) + code,
+            "build_ms": elapsed / 1e6,
+            "gas": estimate_decode_gas(alg, original),
+        }
+    t0 = time.perf_counter_ns()
+    _, _, _, meta = compress_call_data(data, to, min_size=min_size, level=level)
+    elapsed = time.perf_counter_ns() - t0
+    return {
+        "original": original,
+        "codecs": codecs,
+        "auto": {
+            "algo": meta["algo"],
+            "bytes_saved": meta["benefit"]["bytes_saved"],
+            "build_ms": elapsed / 1e6,
+            "gas": estimate_decode_gas(meta["algo"], original),
+        },
+    }
+
+
+class Summary:
+    """Running totals over analyze_call results; memory does not grow with the input."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.skipped = 0
+        self.original = 0
+        self.codecs: dict[str, dict[str, float]] = {}
+        self.chosen: dict[str, int] = {}
+        self.bytes_saved = 0
+        self.auto_build_ms = 0.0
+        self.auto_gas = 0
+
+    def skip(self) -> None:
+        """Counts an input row that could not be read or analyzed."""
+        self.skipped += 1
+
+    def add(self, result: dict[str, Any]) -> None:
+        if result.get("skipped"):
+            self.skip()
+            return
+        self.calls += 1
+        self.original += result["original"]
+        for alg, r in result["codecs"].items():
+            acc = self.codecs.setdefault(
+                alg, {"calls": 0, "errors": 0, "original": 0, "total": 0, "build_ms": 0.0, "gas": 0}
+            )
+            if r.get("error"):
+                acc["errors"] += 1
+                continue
+            acc["calls"] += 1
+            acc["original"] += result["original"]
+            acc["total"] += r["total"]
+            acc["build_ms"] += r["build_ms"]
+            acc["gas"] += r["gas"]
+        auto = result["auto"]
+        self.chosen[auto["algo"]] = self.chosen.get(auto["algo"], 0) + 1
+        self.bytes_saved += auto["bytes_saved"]
+        self.auto_build_ms += auto["build_ms"]
+        self.auto_gas += auto["gas"]
+
+    def to_dict(self) -> dict[str, Any]:
+        codecs = {}
+        for alg, acc in self.codecs.items():
+            n = acc["calls"] or 1
+            codecs[alg] = {
+                "calls": acc["calls"],
+                "errors": acc["errors"],
+                "ratio": acc["total"] / acc["original"] if acc["original"] else 0.0,
+                "bytes_saved": acc["original"] - acc["total"],
+                "build_ms_avg": acc["build_ms"] / n,
+                "gas_avg": acc["gas"] / n,
+            }
+        n = self.calls or 1
+        return {
+            "calls": self.calls,
+            "skipped": self.skipped,
+            "original_bytes": self.original,
+            "codecs": codecs,
+            "auto": {
+                "chosen": dict(sorted(self.chosen.items(), key=lambda kv: -kv[1])),
+                "bytes_saved": self.bytes_saved,
+                "ratio": 1 - self.bytes_saved / self.original if self.original else 0.0,
+                "build_ms_avg": self.auto_build_ms / n,
+                "gas_avg": self.auto_gas / n,
+            },
+        }
+
+    def render(self) -> str:
+        d = self.to_dict()
+        skipped = f", {d['skipped']} bad rows skipped" if d["skipped"] else ""
+        lines = [
+            f"{d['calls']} calls, {d['original_bytes']} bytes of calldata{skipped}",
+            "",
+            f"{'codec':<10} {'calls':>8} {'ratio':>8} {'saved':>12} {'build ms':>10} {'gas':>10}",
+        ]
+        for alg, r in d["codecs"].items():
+            lines.append(
+                f"{alg:<10} {r['calls']:>8} {r['ratio'] * 100:>7.1f}% {r['bytes_saved']:>12}"
+                f" {r['build_ms_avg']:>10.3f} {r['gas_avg']:>10.0f}"
+            )
+        auto = d["auto"]
+        chosen = ", ".join(f"{k}={v}" for k, v in auto["chosen"].items())
+        lines += [
+            "",
+            f"auto: {auto['ratio'] * 100:.1f}% of original, {auto['bytes_saved']} bytes saved,"
+            f" build {auto['build_ms_avg']:.3f} ms, gas {auto['gas_avg']:.0f} avg",
+            f"auto chose: {chosen}",
+        ]
+        return "\n".join(lines)
+
+
+def _open(path: str) -> TextIO:
+    if path == "-":
+        return sys.stdin
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def _json_rows(f: TextIO, on_skip: Callable[[], None] | None) -> Iterator[Any]:
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            if on_skip is not None:
+                on_skip()
+
+
+def read_calls(
+    path: str, fmt: str | None = None, *, on_skip: Callable[[], None] | None = None
+) -> Iterator[tuple[str, str]]:
+    """Streams (to, data) pairs from a JSONL or CSV dump ("-" reads stdin, .gz is inflated).
+
+    Rows without a destination or calldata are skipped. `input` is accepted for `data`.
+    Malformed rows (bad JSON, not an object) are skipped too, and reported to on_skip.
+    """
+    if fmt is None:
+        fmt = "csv" if path.removesuffix(".gz").endswith(".csv") else "jsonl"
+    f = _open(path)
+    try:
+        rows: Iterable[Any] = csv.DictReader(f) if fmt == "csv" else _json_rows(f, on_skip)
+        for row in rows:
+            if not isinstance(row, dict):
+                if on_skip is not None:
+                    on_skip()
+                continue
+            to = row.get("to")
+            data = row.get("data") or row.get("input")
+            if to and data and data != "0x":
+                yield str(to), str(data)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+__all__ = ["GAS_MODEL", "Summary", "analyze_call", "estimate_decode_gas", "read_calls"]
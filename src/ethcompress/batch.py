@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import CancelledError, Executor, Future, ProcessPoolExecutor
+import contextlib
+import itertools
+from multiprocessing import shared_memory
+import os
+
+from compressions.utils import hex_to_bytes as _hex_to_bytes
+
+from .compressor import CompressResult, HexLike, compress_call_data
+
+"""
+Batch compression of many calls over a process pool.
+
+The codecs are pure Python and hold the GIL, so throughput scales with processes, not
+threads. Calls are sent to the workers in chunks; a chunk whose calldata exceeds
+`shm_threshold` bytes is copied once into a SharedMemory block that the worker reads in
+place, instead of pickling the payloads. Results stream back in input order with at most
+2 * workers chunks in flight, so memory stays bounded for any input length.
+"""
+
+# Below this, pickling raw bytes is cheaper than creating a shared memory block
+SHM_THRESHOLD = 256 * 1024
+
+
+def _raw(data: HexLike) -> bytes:
+    return bytes(data) if isinstance(data, (bytes, bytearray)) else _hex_to_bytes(data)
+
+
+def _view(shm: shared_memory.SharedMemory) -> memoryview:
+    buf = shm.buf
+    if buf is None:
+        raise RuntimeError(f"shared memory block {shm.name} is closed")
+    return buf
+
+
+def _compress_chunk(
+    targets: list[str],
+    payload: list[bytes] | tuple[str, list[int]],
+    alg: str,
+    min_size: int,
+    level: int,
+) -> list[CompressResult]:
+    if isinstance(payload, list):
+        return [
+            compress_call_data(d, t, alg=alg, min_size=min_size, level=level)
+            for t, d in zip(targets, payload, strict=True)
+        ]
+    name, offsets = payload
+    shm = shared_memory.SharedMemory(name=name)
+    buf = _view(shm)
+    try:
+        return [
+            compress_call_data(
+                bytes(buf[offsets[i] : offsets[i + 1]]), t, alg=alg, min_size=min_size, level=level
+            )
+            for i, t in enumerate(targets)
+        ]
+    finally:
+        del buf
+        shm.close()
+
+
+_Pending = tuple[Future[list[CompressResult]], shared_memory.SharedMemory | None]
+
+
+def _submit(
+    pool: Executor,
+    chunk: list[tuple[str, HexLike]],
+    alg: str,
+    min_size: int,
+    level: int,
+    shm_threshold: int,
+) -> _Pending:
+    targets = [t for t, _ in chunk]
+    datas = [_raw(d) for _, d in chunk]
+    offsets = [0, *itertools.accumulate(len(d) for d in datas)]
+    if offsets[-1] < shm_threshold:
+        return pool.submit(_compress_chunk, targets, datas, alg, min_size, level), None
+    shm = shared_memory.SharedMemory(create=True, size=offsets[-1])
+    buf = _view(shm)
+    for d, start in zip(datas, offsets, strict=False):
+        buf[start : start + len(d)] = d
+    del buf
+    payload = (shm.name, offsets)
+    return pool.submit(_compress_chunk, targets, payload, alg, min_size, level), shm
+
+
+def _release(shm: shared_memory.SharedMemory | None) -> None:
+    if shm is not None:
+        shm.close()
+        shm.unlink()
+
+
+def compress_many(
+    items: Iterable[tuple[str, HexLike]],
+    *,
+    alg: str = "auto",
+    min_size: int = 800,
+    level: int = 1,
+    workers: int | None = None,
+    chunk_size: int = 64,
+    shm_threshold: int = SHM_THRESHOLD,
+    executor: Executor | None = None,
+) -> Iterator[CompressResult]:
+    """Compresses (target, data) pairs in parallel, yielding compress_call_data results in order.
+
+    workers defaults to the CPU count; 1 runs in process. Pass `executor` to reuse a process
+    pool across jobs; `workers` then only sizes the in-flight window.
+    """
+    workers = workers or os.cpu_count() or 1
+    it = iter(items)
+    chunks = iter(lambda: list(itertools.islice(it, chunk_size)), [])
+    if workers <= 1 and executor is None:
+        for target, data in it:
+            yield compress_call_data(data, target, alg=alg, min_size=min_size, level=level)
+        return
+
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    pending: deque[_Pending] = deque()
+    try:
+        for chunk in chunks:
+            pending.append(_submit(pool, chunk, alg, min_size, level, shm_threshold))
+            if len(pending) >= 2 * workers:
+                yield from _collect(pending)
+        while pending:
+            yield from _collect(pending)
+    finally:
+        # Consumer stopped early or a chunk failed: blocks are only unlinked once no worker
+        # can still be reading them
+        for future, _ in pending:
+            future.cancel()
+        while pending:
+            with contextlib.suppress(Exception, CancelledError):
+                _collect(pending)
+        if executor is None:
+            pool.shutdown()
+
+
+def _collect(pending: deque[_Pending]) -> list[CompressResult]:
+    future, shm = pending.popleft()
+    try:
+        return future.result()
+    finally:
+        _release(shm)
+
+
+__all__ = ["SHM_THRESHOLD", "compress_many"]
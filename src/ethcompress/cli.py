@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import argparse
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+import contextlib
+import itertools
+import json
+import os
+import sys
+from typing import Any
+
+from .analysis import Summary, analyze_call, read_calls
+from .compressor import ALGORITHMS, compress_call_data
+from .libzip import abi_restore, cd_decompress, flz64k_decompress, flz_decompress, wd_decompress
+
+DECODERS = {
+    "flz": flz_decompress,
+    "cd": cd_decompress,
+    "wd": wd_decompress,
+    "flz64k": flz64k_decompress,
+    "abi-flz": lambda d: abi_restore(flz_decompress(d)),
+    "abi-cd": lambda d: abi_restore(cd_decompress(d)),
+}
+
+
+def _read_data(arg: str) -> str:
+    return (sys.stdin.read() if arg == "-" else arg).strip()
+
+
+def _analyze_batch(
+    batch: list[tuple[str, str]], algs: tuple[str, ...], min_size: int, level: int
+) -> list[dict[str, Any]]:
+    results = []
+    for to, data in batch:
+        try:
+            results.append(analyze_call(to, data, algs=algs, min_size=min_size, level=level))
+        except ValueError:
+            results.append({"skipped": True})
+    return results
+
+
+def analyze_stream(
+    calls: Iterable[tuple[str, str]],
+    *,
+    workers: int = 1,
+    batch_size: int = 64,
+    algs: tuple[str, ...] = ALGORITHMS,
+    min_size: int = 800,
+    level: int = 1,
+) -> Iterator[dict[str, Any]]:
+    """Yields analyze_call results in input order; calls it rejects yield {"skipped": True}.
+
+    With workers > 1 batches run in a process pool, and at most 2 * workers batches are in
+    flight, so memory stays bounded however long the input is.
+    """
+    it = iter(calls)
+    batches = iter(lambda: list(itertools.islice(it, batch_size)), [])
+    if workers <= 1:
+        for batch in batches:
+            yield from _analyze_batch(batch, algs, min_size, level)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future[list[dict[str, Any]]]] = deque()
+        for batch in batches:
+            pending.append(pool.submit(_analyze_batch, batch, algs, min_size, level))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _cmd_compress(args: argparse.Namespace) -> int:
+    to, data, override, meta = compress_call_data(
+        _read_data(args.data), args.to, alg=args.alg, min_size=args.min_size, level=args.level
+    )
+    print(json.dumps({"to": to, "data": data, "override": override, "meta": meta}))
+    return 0
+
+
+def _cmd_decompress(args: argparse.Namespace) -> int:
+    print(DECODERS[args.alg](_read_data(args.data)))
+    return 0
+
+
+def _cmd_analyze(args: argparse.Namespace) -> int:
+    algs = tuple(a for a in args.algs.split(",") if a) if args.algs else ALGORITHMS
+    unknown = set(algs) - set(ALGORITHMS)
+    if unknown:
+        raise SystemExit(f"unknown algorithms: {', '.join(sorted(unknown))}")
+    summary = Summary()
+    calls: Iterable[tuple[str, str]] = read_calls(args.path, args.format, on_skip=summary.skip)
+    if args.limit:
+        calls = itertools.islice(calls, args.limit)
+
+    with contextlib.ExitStack() as stack:
+        emit = stack.enter_context(open(args.emit, "w", encoding="utf-8")) if args.emit else None
+        results = analyze_stream(
+            calls,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            algs=algs,
+            min_size=args.min_size,
+            level=args.level,
+        )
+        for result in results:
+            summary.add(result)
+            if emit and not result.get("skipped"):
+                emit.write(json.dumps(result) + "\n")
+
+    print(json.dumps(summary.to_dict(), indent=2) if args.json else summary.render())
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m ethcompress", description="eth_call compression")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    c = sub.add_parser("compress", help="compress one call, print {to, data, override, meta}")
+    c.add_argument("data", help="0x-hex calldata, or - for stdin")
+    c.add_argument("--to", required=True, help="target contract address")
+    c.add_argument("--alg", default="auto", choices=("auto", *ALGORITHMS))
+    c.add_argument("--min-size", type=int, default=800)
+    c.add_argument("--level", type=int, default=1, help="FLZ encoder level (1-3)")
+    c.set_defaults(func=_cmd_compress)
+
+    d = sub.add_parser("decompress", help="decode a compressed stream back to calldata")
+    d.add_argument("data", help="0x-hex compressed stream, or - for stdin")
+    d.add_argument("--alg", required=True, choices=tuple(DECODERS))
+    d.set_defaults(func=_cmd_decompress)
+
+    a = sub.add_parser("analyze", help="run all codecs over a JSONL/CSV dump of {to, data}")
+    a.add_argument("path", help="JSONL or CSV file (.gz ok), or - for stdin")
+    a.add_argument("--format", choices=("jsonl", "csv"), help="default: from the file name")
+    a.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    a.add_argument("--batch-size", type=int, default=64, help="calls per pool task")
+    a.add_argument("--algs", default="", help="comma separated codecs (default: all)")
+    a.add_argument("--min-size", type=int, default=800, help="auto selection threshold")
+    a.add_argument("--level", type=int, default=1)
+    a.add_argument("--limit", type=int, default=0, help="stop after N calls")
+    a.add_argument("--emit", help="write per-call results as JSONL to this path")
+    a.add_argument("--json", action="store_true", help="print the summary as JSON")
+    a.set_defaults(func=_cmd_analyze)
+    return p
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return int(args.func(args))
+
+
+__all__ = ["analyze_stream", "build_parser", "main"]
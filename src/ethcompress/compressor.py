@@ -1,17 +1,38 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
-
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+import itertools
+from typing import TYPE_CHECKING, Any
+
+from compressions.jit import jit_data_spans as _jit_data_spans
 from compressions.utils import to_hex as _to_hex
 
-from .jit import flz_fwd_bytecode, jit_bytecode, rle_fwd_bytecode
-from .libzip import cd_compress, flz_compress
+from .instrument import Sink, Trace, vanilla_reason
+from .jit import (
+    abi_fwd_bytecode,
+    flz64k_fwd_bytecode,
+    flz_fwd_bytecode,
+    jit_bytecode,
+    rle_fwd_bytecode,
+    wd_fwd_bytecode,
+)
+from .libzip import abi_transform, cd_compress, flz64k_compress, flz_compress, wd_compress
+
+if TYPE_CHECKING:
+    from .prepared import PreparedCall
 
 HexLike = str | bytes
 
 
 DECOMPRESSOR_ADDRESS = "0x00000000000000000000000000000000000000e0"
+# Second override slot, used by the ABI transform inverse behind the decompressor
+ABI_ADDRESS = "0x00000000000000000000000000000000000000e1"
+
+ALGORITHMS = ("flz", "cd", "jit", "jitcc", "wd", "flz64k", "abi-flz", "abi-cd")
 
 
 def _norm_hex(s: str) -> str:
@@ -46,28 +67,276 @@ class CompressedCall:
     benefit: dict[str, float] | None = None
     allow_fallback: bool = True
     _vanilla: tuple[str, str] | None = None
-
-    def execute(self, w3: Any, block: str | int = "latest") -> str:
-        tx = {"to": self.to, "data": self.data}
-        override_payload = self.override if self.override else None
-
-        if override_payload is not None:
+    sink: Sink | None = field(default=None, repr=False, compare=False)
+
+    def execute(self, w3: Any, block: str | int = "latest", *, sink: Sink | None = None) -> str:
+        return self._execute(w3, block, sink, *self._request_parts())
+
+    def _request_parts(self) -> tuple[dict[str, str], dict[str, str] | None]:
+        """The block-independent tx and vanilla fallback tx."""
+        tx0 = {"to": self._vanilla[0], "data": self._vanilla[1]} if self._vanilla else None
+        return {"to": self.to, "data": self.data}, tx0
+
+    def _execute(
+        self,
+        w3: Any,
+        block: str | int,
+        sink: Sink | None,
+        tx: dict[str, str],
+        tx0: dict[str, str] | None,
+    ) -> str:
+        trace = self._trace(sink)
+        if self.override:
             try:
-                res = w3.provider.make_request("eth_call", [tx, block, override_payload])
-                if isinstance(res, dict) and "result" in res:
-                    return str(res["result"])
+                res = w3.provider.make_request("eth_call", [tx, block, self.override])
+                result = self._compressed_result(trace, res)
+                if result is not None:
+                    return result
             except Exception:
                 pass
-
-        if not self.allow_fallback or not self._vanilla:
+        res = w3.provider.make_request("eth_call", [self._fallback_tx(trace, tx0), block])
+        return self._fallback_result(trace, res)
+
+    def _trace(self, sink: Sink | None) -> Trace | None:
+        sink = sink or self.sink
+        if sink is None:
+            return None
+        return Trace("execute", sink, self._vanilla[0] if self._vanilla else self.to)
+
+    def _compressed_result(self, trace: Trace | None, res: Any) -> str | None:
+        """The result of a compressed eth_call response, or None when it failed."""
+        if not (isinstance(res, dict) and "result" in res):
+            return None
+        if trace is not None:
+            trace.mark("rpc")
+            trace.emit(algo=self.algo, sizes=self.sizes)
+        return str(res["result"])
+
+    def _fallback_tx(self, trace: Trace | None, tx0: dict[str, str] | None) -> dict[str, str]:
+        """The vanilla tx to send after a failed or skipped compressed call, if allowed."""
+        if trace is not None and self.override:
+            trace.mark("rpc")
+        if not self.allow_fallback or tx0 is None:
+            if trace is not None:
+                trace.emit(algo=self.algo, sizes=self.sizes, fallback="disabled")
             raise RuntimeError("compressed call failed and fallback disabled")
+        return tx0
 
-        to0, data0 = self._vanilla
-        res = w3.provider.make_request("eth_call", [{"to": to0, "data": data0}, block])
+    def _fallback_result(self, trace: Trace | None, res: Any) -> str:
+        if trace is not None:
+            trace.mark("fallback_rpc")
+            reason = "rpc_error" if self.override else None
+            trace.emit(algo=self.algo, sizes=self.sizes, fallback=reason)
         if "result" in res:
             return str(res["result"])
         raise RuntimeError(f"fallback eth_call failed: {res}")
 
+    def prepare(self) -> PreparedCall:
+        """Serializes the request once for repeated sends (see ethcompress.prepared)."""
+        from .prepared import PreparedCall
+
+        return PreparedCall.from_call(self)
+
+    def execute_range(
+        self,
+        w3: Any,
+        blocks: Iterable[int | str],
+        *,
+        concurrency: int = 8,
+        batch_size: int = 0,
+        retries: int = 1,
+        return_exceptions: bool = False,
+    ) -> dict[int | str, str | Exception]:
+        """Runs this call at every block in `blocks`, returning {block: result} in input order.
+
+        The request parts that do not depend on the block (tx, override, fallback tx) are
+        built once and shared by every request. With batch_size > 0 and a provider exposing
+        make_batch_request, blocks go out as JSON-RPC batches of that size, otherwise as
+        single requests; either way `concurrency` requests run at once. Blocks whose call
+        failed, after the usual fallback, are retried up to `retries` times. Remaining
+        failures raise RuntimeError, or are returned as exceptions with return_exceptions.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        order = list(dict.fromkeys(blocks))
+        tags = {b: hex(b) if isinstance(b, int) else b for b in order}
+        batched = batch_size > 0 and hasattr(w3.provider, "make_batch_request")
+        tx, tx0 = self._request_parts()
+        results: dict[int | str, str | Exception] = {}
+        todo = order
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(retries + 1):
+                if batched:
+                    chunks = [todo[i : i + batch_size] for i in range(0, len(todo), batch_size)]
+                    batches = pool.map(lambda c: self._execute_batch(w3, c, tags, tx, tx0), chunks)
+                    results.update(itertools.chain.from_iterable(batches))
+                else:
+                    outcomes = pool.map(
+                        lambda b: _attempt(self._execute, w3, tags[b], None, tx, tx0), todo
+                    )
+                    results.update(zip(todo, outcomes, strict=True))
+                todo = [b for b in todo if isinstance(results[b], Exception)]
+                if not todo:
+                    break
+        if todo and not return_exceptions:
+            first = results[todo[0]]
+            raise RuntimeError(f"eth_call failed at {len(todo)} of {len(order)} blocks: {first}")
+        return {b: results[b] for b in order}
+
+    def _execute_batch(
+        self,
+        w3: Any,
+        blocks: list[int | str],
+        tags: dict[int | str, str],
+        tx: dict[str, str],
+        tx0: dict[str, str] | None,
+    ) -> list[tuple[int | str, str | Exception]]:
+        """One batch of compressed calls, then one batch of vanilla calls for the failures."""
+        out: dict[int | str, str | Exception] = {}
+        todo = blocks
+        if self.override:
+            requests = [("eth_call", [tx, tags[b], self.override]) for b in blocks]
+            out.update(zip(blocks, _batch(w3, requests), strict=True))
+            todo = [b for b in blocks if isinstance(out[b], Exception)]
+        if todo:
+            if not self.allow_fallback or tx0 is None:
+                error = RuntimeError("compressed call failed and fallback disabled")
+                out.update((b, error) for b in todo)
+            else:
+                requests = [("eth_call", [tx0, tags[b]]) for b in todo]
+                out.update(zip(todo, _batch(w3, requests), strict=True))
+        return [(b, out[b]) for b in blocks]
+
+    async def execute_async(
+        self, w3: Any, block: str | int = "latest", *, sink: Sink | None = None
+    ) -> str:
+        """execute() for AsyncWeb3: same request, override and fallback semantics."""
+        tx, tx0 = self._request_parts()
+        trace = self._trace(sink)
+        if self.override:
+            try:
+                res = await w3.provider.make_request("eth_call", [tx, block, self.override])
+                result = self._compressed_result(trace, res)
+                if result is not None:
+                    return result
+            except Exception:
+                pass
+        res = await w3.provider.make_request("eth_call", [self._fallback_tx(trace, tx0), block])
+        return self._fallback_result(trace, res)
+
+
+def _attempt(fn: Any, *args: Any) -> str | Exception:
+    try:
+        return str(fn(*args))
+    except Exception as e:
+        return e
+
+
+def _batch(w3: Any, requests: list[tuple[str, list[Any]]]) -> list[str | Exception]:
+    """Sends a JSON-RPC batch; returns results or exceptions aligned with requests."""
+    try:
+        responses = w3.provider.make_batch_request(requests)
+    except Exception as e:
+        return [e] * len(requests)
+    if not isinstance(responses, list) or len(responses) != len(requests):
+        # A batch-level error comes back as a single response object
+        return [RuntimeError(f"batch eth_call failed: {responses}")] * len(requests)
+    return [
+        str(r["result"])
+        if isinstance(r, dict) and "result" in r
+        else RuntimeError(f"eth_call failed: {r}")
+        for r in responses
+    ]
+
+
+def merge_override(override: dict[str, Any] | None, existing: Any) -> dict[str, Any] | None:
+    """Merges a forwarder override into the caller's state override map; per-address dicts
+    are merged and the caller's fields win."""
+    if not existing or not override:
+        return existing or override
+    merged = {**override}
+    for k, v in existing.items():
+        if k in merged and isinstance(merged[k], dict) and isinstance(v, dict):
+            merged[k] = {**merged[k], **v}
+        else:
+            merged[k] = v
+    return merged
+
+
+def _vanilla_meta(original_size: int) -> dict[str, Any]:
+    return {
+        "algo": "vanilla",
+        "sizes": {"original": original_size, "compressed": original_size, "code": 0},
+        "benefit": {"bytes_saved": 0, "pct": 0.0},
+    }
+
+
+def _try(fn: Any, *args: Any) -> str | None:
+    try:
+        return str(fn(*args))
+    except Exception:
+        return None
+
+
+def _abi_stream(data_hex: str, encode: Any, *args: Any) -> str:
+    return str(encode(abi_transform(data_hex), *args))
+
+
+def _build(
+    selected: str, data_hex: str, target: str, streams: dict[str, str | None], level: int = 1
+) -> tuple[str, dict[str, str]]:
+    """Returns (calldata, code per override address) for a codec.
+
+    Streams computed during selection are reused. The ABI transform variants chain two
+    contracts: the FLZ/RLE forwarder calls the inverse transform, which calls the target.
+    """
+    if selected == "abi-flz":
+        calldata = streams.get(selected) or _abi_stream(data_hex, flz_compress, level)
+        code = flz_fwd_bytecode(ABI_ADDRESS)
+        return calldata, {DECOMPRESSOR_ADDRESS: code, ABI_ADDRESS: abi_fwd_bytecode(target)}
+    if selected == "abi-cd":
+        calldata = streams.get(selected) or _abi_stream(data_hex, cd_compress)
+        code = rle_fwd_bytecode(ABI_ADDRESS)
+        return calldata, {DECOMPRESSOR_ADDRESS: code, ABI_ADDRESS: abi_fwd_bytecode(target)}
+    if selected == "jit":
+        calldata, code = _address_word(target), jit_bytecode(data_hex)
+    elif selected == "jitcc":
+        calldata, code = _address_word(target), jit_bytecode(data_hex, data_section=True)
+    elif selected == "flz":
+        calldata = streams.get("flz") or flz_compress(data_hex, level)
+        code = flz_fwd_bytecode(target)
+    elif selected == "cd":
+        calldata, code = streams.get("cd") or cd_compress(data_hex), rle_fwd_bytecode(target)
+    elif selected == "wd":
+        calldata, code = streams.get("wd") or wd_compress(data_hex), wd_fwd_bytecode(target)
+    elif selected == "flz64k":
+        calldata = streams.get("flz64k") or flz64k_compress(data_hex)
+        code = flz64k_fwd_bytecode(target)
+    else:
+        raise ValueError(f"unknown compression algorithm: {selected}")
+    return calldata, {DECOMPRESSOR_ADDRESS: code}
+
+
+def build_call_data(
+    data: HexLike, target: str, alg: str, *, level: int = 1
+) -> tuple[str, dict[str, dict[str, str]]]:
+    """Encodes calldata with one codec, skipping selection, min_size and the benefit check.
+
+    Returns (calldata for DECOMPRESSOR_ADDRESS, state override) even when the result is
+    larger than the original, which is what gas and size measurements of a codec need.
+    """
+    if alg not in ALGORITHMS:
+        raise ValueError(f"unknown algorithm: {alg}")
+    calldata, codes = _build(alg, _to_hex(data), target, {}, level)
+    return calldata, {addr.lower(): {"code": code} for addr, code in codes.items()}
+
+
+def _total(calldata: str, codes: dict[str, str]) -> int:
+    return _size_bytes(calldata) + sum(_size_bytes(c) for c in codes.values())
+
+
+CompressResult = tuple[str, str, dict[str, dict[str, str]] | None, dict[str, Any]]
+
 
 def compress_call_data(
     data: HexLike,
@@ -75,49 +344,72 @@ def compress_call_data(
     *,
     alg: str = "auto",
     min_size: int = 800,
-) -> tuple[str, str, dict[str, dict[str, str]] | None, dict[str, Any]]:
+    level: int = 1,
+    sink: Sink | None = None,
+) -> CompressResult:
+    """Compresses calldata for an eth_call to target.
+
+    level selects the FLZ encoder effort (1 greedy, 2 lazy, 3 optimal parse); all levels
+    decode with the same forwarder. With a sink, one "compress" Event with stage timings
+    is reported per call (see ethcompress.instrument).
+    """
+    if sink is None:
+        return _compress(data, target, alg, min_size, level, None)
+    trace = Trace("compress", sink, target)
+    try:
+        result = _compress(data, target, alg, min_size, level, trace)
+    except Exception:
+        trace.emit(fallback="error")
+        raise
+    meta = result[3]
+    fallback = vanilla_reason(meta, min_size) if meta["algo"] == "vanilla" else None
+    trace.emit(algo=meta["algo"], sizes=meta["sizes"], fallback=fallback)
+    return result
+
+
+def _compress(
+    data: HexLike, target: str, alg: str, min_size: int, level: int, trace: Trace | None
+) -> CompressResult:
     data_hex = _to_hex(data)
     original_size = _size_bytes(data_hex)
+    if trace is not None:
+        trace.mark("parse")
     if original_size < min_size:
-        meta = {
-            "algo": "vanilla",
-            "sizes": {"original": original_size, "compressed": original_size, "code": 0},
-            "benefit": {"bytes_saved": 0, "pct": 0.0},
-        }
-        return target, data_hex, None, meta
-
-    # Heuristics matching the TS original:
+        return target, data_hex, None, _vanilla_meta(original_size)
+
+    # Heuristics extending the TS original:
     # - If alg is specified, use it directly.
     # - If auto and original_size >= 2096 -> choose JIT without trying FLZ/CD.
     # - If auto and original_size < 4096 -> compute FLZ and CD, pick the one with smaller compressed data length.
+    # The word dictionary codec is cheap to compute, so auto also weighs it against the
+    # pick above by total size (code + calldata). Large calls additionally try FLZ64K,
+    # whose 64 KB window reaches repetition that FLZ and the JIT word cache miss, and,
+    # when the calldata has runs of incompressible words, the JIT data section variant;
+    # both JIT variants are built and the smaller total is kept. FLZ over the ABI column
+    # transform is weighed the same way for every size.
     selected: str | None = None
-    flz_hex: str | None = None
-    cd_hex: str | None = None
+    streams: dict[str, str | None] = {}
+    # Alternatives built from the calldata alone, with no stream computed during selection
+    unstreamed: tuple[str, ...] = ()
 
-    if alg in ("flz", "cd", "jit"):
+    if alg in ALGORITHMS:
         selected = alg
     else:
+        streams["wd"] = _try(wd_compress, data_hex)
+        streams["abi-flz"] = _try(_abi_stream, data_hex, flz_compress, level)
         if original_size >= 2096:
             selected = "jit"
+            if _jit_data_spans(data_hex):
+                unstreamed = ("jitcc",)
+            streams["flz64k"] = _try(flz64k_compress, data_hex)
         else:
-            try:
-                flz_hex = flz_compress(data_hex)
-            except Exception:
-                flz_hex = None
-            try:
-                cd_hex = cd_compress(data_hex)
-            except Exception:
-                cd_hex = None
+            streams["flz"] = _try(flz_compress, data_hex, level)
+            streams["cd"] = _try(cd_compress, data_hex)
+            flz_hex, cd_hex = streams["flz"], streams["cd"]
 
             if flz_hex is None and cd_hex is None:
-                meta = {
-                    "algo": "vanilla",
-                    "sizes": {"original": original_size, "compressed": original_size, "code": 0},
-                    "benefit": {"bytes_saved": 0, "pct": 0.0},
-                }
-                return target, data_hex, None, meta
-
-            if cd_hex is None:
+                selected = "wd" if streams["wd"] is not None else None
+            elif cd_hex is None:
                 selected = "flz"
             elif flz_hex is None:
                 selected = "cd"
@@ -125,34 +417,31 @@ def compress_call_data(
                 # Compare hex lengths (as in TS), not total size including code.
                 selected = "flz" if len(flz_hex) < len(cd_hex) else "cd"
 
+    if trace is not None:
+        trace.mark("select")
+    if selected is None:
+        return target, data_hex, None, _vanilla_meta(original_size)
+
     # Build according to selection and validate benefit by total size (code + calldata)
-    if selected == "jit":
-        code_sel = jit_bytecode(data_hex)
-        calldata_sel = _address_word(target)
-    elif selected == "flz":
-        calldata_sel = flz_hex if flz_hex is not None else flz_compress(data_hex)
-        code_sel = flz_fwd_bytecode(target)
-    elif selected == "cd":
-        calldata_sel = cd_hex if cd_hex is not None else cd_compress(data_hex)
-        code_sel = rle_fwd_bytecode(target)
-    else:
-        meta = {
-            "algo": "vanilla",
-            "sizes": {"original": original_size, "compressed": original_size, "code": 0},
-            "benefit": {"bytes_saved": 0, "pct": 0.0},
-        }
-        return target, data_hex, None, meta
-
-    total_sel = _size_bytes(calldata_sel) + _size_bytes(code_sel)
+    calldata_sel, codes_sel = _build(selected, data_hex, target, streams, level)
+    total_sel = _total(calldata_sel, codes_sel)
+    if trace is not None:
+        trace.mark("build")
+
+    for name in (*unstreamed, "wd", "flz64k", "abi-flz"):
+        if name == selected or (name not in unstreamed and streams.get(name) is None):
+            continue
+        calldata_alt, codes_alt = _build(name, data_hex, target, streams, level)
+        total_alt = _total(calldata_alt, codes_alt)
+        if total_alt < total_sel:
+            selected, calldata_sel, codes_sel, total_sel = name, calldata_alt, codes_alt, total_alt
+    if trace is not None:
+        trace.mark("alternatives")
+
     if total_sel >= original_size:
-        meta = {
-            "algo": "vanilla",
-            "sizes": {"original": original_size, "compressed": original_size, "code": 0},
-            "benefit": {"bytes_saved": 0, "pct": 0.0},
-        }
-        return target, data_hex, None, meta
-
-    override = {DECOMPRESSOR_ADDRESS.lower(): {"code": code_sel}}
+        return target, data_hex, None, _vanilla_meta(original_size)
+
+    override = {addr.lower(): {"code": code} for addr, code in codes_sel.items()}
     benefit_bytes = original_size - total_sel
     benefit_pct = (benefit_bytes / original_size) * 100 if original_size else 0.0
     meta = {
@@ -160,10 +449,12 @@ def compress_call_data(
         "sizes": {
             "original": original_size,
             "compressed": _size_bytes(calldata_sel),
-            "code": _size_bytes(code_sel),
+            "code": total_sel - _size_bytes(calldata_sel),
         },
         "benefit": {"bytes_saved": benefit_bytes, "pct": benefit_pct},
     }
+    if trace is not None:
+        trace.mark("override")
     return DECOMPRESSOR_ADDRESS, calldata_sel, override, meta
 
 
@@ -174,8 +465,12 @@ def compress_eth_call(
     alg: str = "auto",
     min_size: int = 800,
     allow_fallback: bool = True,
+    level: int = 1,
+    sink: Sink | None = None,
 ) -> CompressedCall:
-    new_to, new_data, override, meta = compress_call_data(data, to, alg=alg, min_size=min_size)
+    new_to, new_data, override, meta = compress_call_data(
+        data, to, alg=alg, min_size=min_size, level=level, sink=sink
+    )
     algo = meta["algo"]
     if algo == "vanilla":
         sizes = meta["sizes"]
@@ -189,6 +484,7 @@ def compress_eth_call(
             benefit=meta.get("benefit"),
             allow_fallback=allow_fallback,
             _vanilla=(to, _to_hex(data)),
+            sink=sink,
         )
 
     tx_to = new_to
@@ -204,6 +500,7 @@ def compress_eth_call(
         benefit=meta.get("benefit"),
         allow_fallback=allow_fallback,
         _vanilla=(to, _to_hex(data)),
+        sink=sink,
     )
     return cc
 
@@ -214,6 +511,8 @@ def compress_call_fn(
     alg: str = "auto",
     min_size: int = 800,
     allow_fallback: bool = True,
+    level: int = 1,
+    sink: Sink | None = None,
 ) -> CompressedCall:
     try:
         to = fn.address  # ContractFunction
@@ -226,14 +525,108 @@ def compress_call_fn(
         if callable(data_hex):
             data_hex = data_hex()
     return compress_eth_call(
-        to, data_hex, alg=alg, min_size=min_size, allow_fallback=allow_fallback
+        to,
+        data_hex,
+        alg=alg,
+        min_size=min_size,
+        allow_fallback=allow_fallback,
+        level=level,
+        sink=sink,
     )
 
 
+def execute_many(
+    calls: Iterable[CompressedCall],
+    w3: Any,
+    *,
+    block: str | int = "latest",
+    concurrency: int = 8,
+    return_exceptions: bool = False,
+    sink: Sink | None = None,
+) -> Iterator[str | Exception]:
+    """Executes calls on a pool of `concurrency` threads, yielding results in input order.
+
+    Each result is yielded as soon as it and all earlier ones are done; at most
+    4 * concurrency calls are queued, so `calls` may be a long lazy iterable. A failing call
+    raises and cancels the queued ones, unless return_exceptions, which yields the exception
+    in its place.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending: deque[Future[str]] = deque()
+        try:
+            for cc in calls:
+                pending.append(pool.submit(cc.execute, w3, block, sink=sink))
+                if len(pending) >= 4 * concurrency:
+                    yield _outcome(pending.popleft(), return_exceptions)
+            while pending:
+                yield _outcome(pending.popleft(), return_exceptions)
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _outcome(future: Future[str], return_exceptions: bool) -> str | Exception:
+    if not return_exceptions:
+        return future.result()
+    try:
+        return future.result()
+    except Exception as e:
+        return e
+
+
+async def execute_many_async(
+    calls: Iterable[CompressedCall],
+    w3: Any,
+    *,
+    block: str | int = "latest",
+    concurrency: int = 32,
+    return_exceptions: bool = False,
+    sink: Sink | None = None,
+) -> AsyncIterator[str | Exception]:
+    """Async execute_many for AsyncWeb3: at most `concurrency` requests in flight (semaphore),
+    results yielded in input order as they become available."""
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(cc: CompressedCall) -> str:
+        async with semaphore:
+            return await cc.execute_async(w3, block, sink=sink)
+
+    pending: deque[asyncio.Task[str]] = deque()
+    try:
+        for cc in calls:
+            pending.append(asyncio.ensure_future(run(cc)))
+            if len(pending) >= 4 * concurrency:
+                yield await _outcome_async(pending.popleft(), return_exceptions)
+        while pending:
+            yield await _outcome_async(pending.popleft(), return_exceptions)
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _outcome_async(task: asyncio.Task[str], return_exceptions: bool) -> str | Exception:
+    if not return_exceptions:
+        return await task
+    try:
+        return await task
+    except Exception as e:
+        return e
+
+
 __all__ = [
+    "ABI_ADDRESS",
+    "ALGORITHMS",
     "DECOMPRESSOR_ADDRESS",
     "CompressedCall",
+    "build_call_data",
     "compress_call_data",
     "compress_call_fn",
     "compress_eth_call",
+    "execute_many",
+    "execute_many_async",
+    "merge_override",
 ]
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Any, TypeVar
+
+"""
+Optional stage timing for compress_call_data, CompressedCall.execute and the middlewares.
+
+Pass `sink=` (any callable taking an Event) to enable it, e.g. HistogramSink or
+ethcompress.metrics.PrometheusMetrics. Without a sink the pipeline only
+pays a `None` check per call: no clock reads and no allocations. Each instrumented call emits
+one Event with the nanoseconds spent per stage (perf_counter_ns), the chosen algorithm, sizes,
+the target and, when the call did not go out compressed, the reason.
+
+Stages by event kind:
+  compress:   parse, select (codec trial streams, JIT data span scan), build (forwarder or JIT
+              code generation for the pick), alternatives, override
+  execute:    rpc, fallback_rpc
+  middleware: compress, merge, rpc, fallback_rpc
+  provider:   compress, rpc, fallback_rpc (CompressingHTTPProvider)
+
+Fallback reasons: below_min_size, no_gain, error (compression raised), no_params,
+rpc_error (compressed call failed, vanilla retried), disabled (failed, fallback off),
+no_transport (transport encoding requested but not accepted by the endpoint), split_error
+(splitting a Multicall3.aggregate call over budget failed, the call was sent whole),
+validation (eth_simulateV1 with sender validation, sent uncompressed).
+"""
+
+
+@dataclass
+class Event:
+    kind: str
+    stages: dict[str, int]
+    algo: str | None = None
+    sizes: dict[str, int] | None = None
+    fallback: str | None = None
+    target: str | None = None
+
+    @property
+    def total_ns(self) -> int:
+        return sum(self.stages.values())
+
+
+Sink = Callable[[Event], None]
+_R = TypeVar("_R")
+
+
+class Trace:
+    """Accumulates stage durations; `mark(stage)` charges the time since the previous mark."""
+
+    __slots__ = ("_t", "kind", "sink", "stages", "target")
+
+    def __init__(self, kind: str, sink: Sink, target: str | None = None) -> None:
+        self.kind = kind
+        self.sink = sink
+        self.target = target
+        self.stages: dict[str, int] = {}
+        self._t = time.perf_counter_ns()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter_ns()
+        self.stages[stage] = self.stages.get(stage, 0) + now - self._t
+        self._t = now
+
+    def emit(
+        self,
+        *,
+        algo: str | None = None,
+        sizes: dict[str, int] | None = None,
+        fallback: str | None = None,
+    ) -> None:
+        self.sink(Event(self.kind, self.stages, algo, sizes, fallback, self.target))
+
+
+def vanilla_reason(meta: dict[str, Any], min_size: int) -> str:
+    """Why compress_call_data returned the call uncompressed."""
+    return "below_min_size" if meta["sizes"]["original"] < min_size else "no_gain"
+
+
+def finish_trace(
+    trace: Trace | None,
+    stage: str,
+    res: _R,
+    fallback: str | None,
+    meta: dict[str, Any] | None = None,
+) -> _R:
+    """Marks the last stage and emits the event of a request handler; returns res."""
+    if trace is not None:
+        trace.mark(stage)
+        algo, sizes = (meta["algo"], meta["sizes"]) if meta else (None, None)
+        trace.emit(algo=algo, sizes=sizes, fallback=fallback)
+    return res
+
+
+# Upper bounds in nanoseconds: 1 us .. 10 s in 1-2-5 steps
+BUCKETS_NS: tuple[int, ...] = (*(m * 10**e for e in range(3, 10) for m in (1, 2, 5)), 10**10)
+
+
+@dataclass
+class Histogram:
+    bounds: tuple[float, ...] = BUCKETS_NS
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    sum: float = 0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            # One slot per bound plus the overflow (+Inf) slot
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other: Histogram) -> None:
+        if other.bounds != self.bounds:
+            raise ValueError("cannot merge histograms with different buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts, strict=True)]
+        self.count += other.count
+        self.sum += other.sum
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """(upper bound, count <= bound) pairs ending with (inf, count), Prometheus style."""
+        out, running = [], 0
+        for bound, n in zip((*self.bounds, float("inf")), self.counts, strict=True):
+            running += n
+            out.append((float(bound), running))
+        return out
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th value (0 when empty)."""
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        for bound, running in self.cumulative():
+            if running >= rank:
+                return bound
+        return float("inf")  # pragma: no cover - the last bucket always reaches count
+
+
+class Tally:
+    """Counters and histograms keyed by (metric name, label values)."""
+
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self) -> None:
+        self.counters: dict[tuple[str, tuple[str, ...]], float] = {}
+        self.histograms: dict[tuple[str, tuple[str, ...]], Histogram] = {}
+
+    def inc(self, name: str, labels: tuple[str, ...], value: float = 1) -> None:
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def histogram(self, name: str, labels: tuple[str, ...], bounds: tuple[float, ...]) -> Histogram:
+        h = self.histograms.get((name, labels))
+        if h is None:
+            h = self.histograms[(name, labels)] = Histogram(bounds)
+        return h
+
+
+def _fold(out: Tally, shard: Tally) -> None:
+    # list() copies under the dict's own lock; values may lag a concurrent writer
+    for key, value in list(shard.counters.items()):
+        out.counters[key] = out.counters.get(key, 0) + value
+    for (name, labels), h in list(shard.histograms.items()):
+        out.histogram(name, labels, h.bounds).merge(h)
+
+
+class ShardedTally:
+    """One Tally per live thread, merged on read.
+
+    Writers only touch their own thread's shard, so recording never takes a lock and threads
+    do not contend, with or without the GIL. The lock only guards the shard list. Shards of
+    threads that have exited are folded into a base tally (on read, and whenever the list has
+    doubled since the last sweep), so thread-per-request servers do not grow it without bound.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._local = threading.local()
+            self._base = Tally()
+            self._shards: list[tuple[threading.Thread, Tally]] = []
+            self._sweep_at = 64
+
+    def local(self) -> Tally:
+        try:
+            return self._local.tally  # type: ignore[no-any-return]
+        except AttributeError:
+            tally = self._local.tally = Tally()
+            with self._lock:
+                self._shards.append((threading.current_thread(), tally))
+                if len(self._shards) >= self._sweep_at:
+                    self._sweep()
+                    self._sweep_at = max(64, 2 * len(self._shards))
+            return tally
+
+    def _sweep(self) -> None:
+        # Caller holds the lock; a dead thread's shard has no writer left
+        live = []
+        for thread, tally in self._shards:
+            if thread.is_alive():
+                live.append((thread, tally))
+            else:
+                _fold(self._base, tally)
+        self._shards = live
+
+    def merged(self) -> Tally:
+        out = Tally()
+        with self._lock:
+            self._sweep()
+            _fold(out, self._base)
+            shards = [tally for _, tally in self._shards]
+        for shard in shards:
+            _fold(out, shard)
+        return out
+
+
+class HistogramSink:
+    """Thread-safe aggregator: a latency histogram per (kind, stage) plus a "total" per kind,
+    counters of chosen algorithms and fallback reasons, and summed sizes. Events are recorded
+    into per-thread shards without locking."""
+
+    def __init__(self, bounds: tuple[float, ...] = BUCKETS_NS) -> None:
+        self.bounds = bounds
+        self._tally = ShardedTally()
+
+    def reset(self) -> None:
+        self._tally.reset()
+
+    def __call__(self, event: Event) -> None:
+        t = self._tally.local()
+        kind = event.kind
+        t.inc("events", ())
+        for stage, ns in event.stages.items():
+            t.histogram("stage", (kind, stage), self.bounds).observe(ns)
+        t.histogram("stage", (kind, "total"), self.bounds).observe(event.total_ns)
+        if event.algo is not None:
+            t.inc("algo", (kind, event.algo))
+        if event.fallback is not None:
+            t.inc("fallback", (kind, event.fallback))
+        for name, n in (event.sizes or {}).items():
+            t.inc("size", (kind, name), n)
+
+    def _view(self, tally: Tally, name: str) -> dict[tuple[str, ...], float]:
+        return {labels: v for (n, labels), v in tally.counters.items() if n == name}
+
+    @property
+    def events(self) -> int:
+        return int(self._tally.merged().counters.get(("events", ()), 0))
+
+    def histogram(self, kind: str, stage: str = "total") -> Histogram:
+        h = self._tally.merged().histograms.get(("stage", (kind, stage)))
+        return h if h is not None else Histogram(self.bounds)
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-friendly view: count, mean and p50/p90/p99 (us) per kind and stage."""
+        tally = self._tally.merged()
+        stages: dict[str, dict[str, Any]] = {}
+        for (_, (kind, stage)), h in sorted(tally.histograms.items()):
+            stages.setdefault(kind, {})[stage] = {
+                "count": h.count,
+                "mean_us": h.sum / h.count / 1e3 if h.count else 0.0,
+                **{f"p{p}_us": h.percentile(p) / 1e3 for p in (50, 90, 99)},
+            }
+        out: dict[str, Any] = {
+            "events": int(tally.counters.get(("events", ()), 0)),
+            "stages": stages,
+        }
+        for name, key in (("algo", "algos"), ("fallback", "fallbacks"), ("size", "sizes")):
+            view = self._view(tally, name)
+            out[key] = {f"{k}/{v}": int(n) for (k, v), n in sorted(view.items())}
+        return out
+
+
+__all__ = [
+    "BUCKETS_NS",
+    "Event",
+    "Histogram",
+    "HistogramSink",
+    "ShardedTally",
+    "Sink",
+    "Tally",
+    "Trace",
+    "finish_trace",
+    "vanilla_reason",
+]
@@ -1,21 +1,45 @@
+from compressions.abi import abi_fwd_bytecode as _abi_fwd_bytecode
 from compressions.calldata import rle_fwd_bytecode as _rle_fwd_bytecode
-from compressions.fastlz import flz_fwd_bytecode as _flz_fwd_bytecode
+from compressions.fastlz import (
+    flz64k_fwd_bytecode as _flz64k_fwd_bytecode,
+    flz_fwd_bytecode as _flz_fwd_bytecode,
+)
 from compressions.jit import jit_bytecode as _jit_bytecode
 from compressions.utils import to_hex as _to_hex
+from compressions.worddict import wd_fwd_bytecode as _wd_fwd_bytecode
 
 HexLike = str | bytes
 
 
-def jit_bytecode(data: HexLike) -> str:
-    return _jit_bytecode(_to_hex(data))
+def jit_bytecode(data: HexLike, data_section: bool = False) -> str:
+    return _jit_bytecode(_to_hex(data), data_section)
+
+
+def abi_fwd_bytecode(address: str) -> str:
+    return _abi_fwd_bytecode(address)
 
 
 def flz_fwd_bytecode(address: str) -> str:
     return _flz_fwd_bytecode(address)
 
 
+def flz64k_fwd_bytecode(address: str) -> str:
+    return _flz64k_fwd_bytecode(address)
+
+
 def rle_fwd_bytecode(address: str) -> str:
     return _rle_fwd_bytecode(address)
 
 
-__all__ = ["flz_fwd_bytecode", "jit_bytecode", "rle_fwd_bytecode"]
+def wd_fwd_bytecode(address: str) -> str:
+    return _wd_fwd_bytecode(address)
+
+
+__all__ = [
+    "abi_fwd_bytecode",
+    "flz64k_fwd_bytecode",
+    "flz_fwd_bytecode",
+    "jit_bytecode",
+    "rle_fwd_bytecode",
+    "wd_fwd_bytecode",
+]
@@ -1,16 +1,34 @@
+from compressions.abi import (
+    abi_restore as _abi_restore,
+    abi_transform as _abi_transform,
+)
 from compressions.calldata import (
     cd_compress as _cd_compress,
     cd_decompress as _cd_decompress,
 )
 from compressions.fastlz import (
+    flz64k_compress as _flz64k_compress,
+    flz64k_decompress as _flz64k_decompress,
     flz_compress as _flz_compress,
     flz_decompress as _flz_decompress,
 )
 from compressions.utils import to_hex as _to_hex
+from compressions.worddict import (
+    wd_compress as _wd_compress,
+    wd_decompress as _wd_decompress,
+)
 
 HexLike = str | bytes
 
 
+def abi_transform(data: HexLike) -> str:
+    return _abi_transform(_to_hex(data))
+
+
+def abi_restore(data: HexLike) -> str:
+    return _abi_restore(_to_hex(data))
+
+
 def cd_compress(data: HexLike) -> str:
     return _cd_compress(_to_hex(data))
 
@@ -19,17 +37,39 @@ def cd_decompress(data: HexLike) -> str:
     return _cd_decompress(_to_hex(data))
 
 
-def flz_compress(data: HexLike) -> str:
-    return _flz_compress(_to_hex(data))
+def flz_compress(data: HexLike, level: int = 1) -> str:
+    return _flz_compress(_to_hex(data), level)
 
 
 def flz_decompress(data: HexLike) -> str:
     return _flz_decompress(_to_hex(data))
 
 
+def flz64k_compress(data: HexLike) -> str:
+    return _flz64k_compress(_to_hex(data))
+
+
+def flz64k_decompress(data: HexLike) -> str:
+    return _flz64k_decompress(_to_hex(data))
+
+
+def wd_compress(data: HexLike) -> str:
+    return _wd_compress(_to_hex(data))
+
+
+def wd_decompress(data: HexLike) -> str:
+    return _wd_decompress(_to_hex(data))
+
+
 __all__ = [
+    "abi_restore",
+    "abi_transform",
     "cd_compress",
     "cd_decompress",
+    "flz64k_compress",
+    "flz64k_decompress",
     "flz_compress",
     "flz_decompress",
+    "wd_compress",
+    "wd_decompress",
 ]
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+import os
+import tempfile
+import threading
+from typing import Any
+
+from .instrument import BUCKETS_NS, Event, ShardedTally
+
+"""
+Prometheus text exposition of middleware activity, without a Prometheus dependency.
+
+PrometheusMetrics is an instrumentation sink: attach it with
+`CompressionMiddleware(sink=metrics)` (or AsyncCompressionMiddleware, or
+`compress_eth_call(..., sink=metrics)`). It counts requests, bytes and fallbacks per
+algorithm and target and keeps fixed-bucket histograms of compression time, RPC time and
+compression ratio. Events are recorded into per-thread shards without locking.
+`render()` produces the text format for a file (`write`, atomic, e.g. for the node_exporter
+textfile collector) or for an HTTP handler you mount (`wsgi`, or serve `render()` with
+CONTENT_TYPE).
+"""
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Wire size over original size
+RATIO_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+# Override failed: compressed call errored, then the vanilla call was sent (or not)
+OVERRIDE_FAILURES = ("rpc_error", "disabled")
+
+_AT = ("algo", "target")
+# name, type, help, label names, divisor applied to histogram bounds and sums (ns -> s)
+_METRICS: tuple[tuple[str, str, str, tuple[str, ...], float], ...] = (
+    ("requests_total", "counter", "eth_call requests seen", _AT, 1),
+    ("original_bytes_total", "counter", "Calldata bytes before compression", _AT, 1),
+    ("sent_bytes_total", "counter", "Calldata, override code and retry bytes sent", _AT, 1),
+    ("saved_bytes_total", "counter", "Bytes saved by successful compressed calls", _AT, 1),
+    (
+        "fallbacks_total",
+        "counter",
+        "Requests not served compressed, by reason",
+        ("reason", "target"),
+        1,
+    ),
+    ("override_failures_total", "counter", "Compressed calls rejected by the node", _AT, 1),
+    ("compress_cpu_seconds_total", "counter", "Time spent compressing", _AT, 1),
+    ("compress_seconds", "histogram", "Compression time per request", _AT, 1e9),
+    ("rpc_seconds", "histogram", "eth_call round trip time incl. fallback", _AT, 1e9),
+    ("compression_ratio", "histogram", "Sent bytes over original bytes", _AT, 1),
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class PrometheusMetrics:
+    """Counters and histograms fed by middleware / execute events.
+
+    max_targets caps the `target` label cardinality; further targets are reported as "other".
+    Metric names start with `namespace`.
+    """
+
+    def __init__(self, *, namespace: str = "ethcompress", max_targets: int = 100) -> None:
+        self.namespace = namespace
+        self.max_targets = max_targets
+        self._lock = threading.Lock()
+        self._targets: frozenset[str] = frozenset()
+        self._tally = ShardedTally()
+
+    def _target(self, target: str | None) -> str:
+        if not target:
+            return ""
+        t = target.lower()
+        if t in self._targets:
+            return t
+        with self._lock:
+            if t not in self._targets:
+                if len(self._targets) >= self.max_targets:
+                    return "other"
+                # Replaced, never mutated: readers outside the lock see a consistent set
+                self._targets = self._targets | {t}
+        return t
+
+    def __call__(self, event: Event) -> None:
+        # "compress" events are covered by the compress stage of the enclosing request
+        if event.kind == "compress":
+            return
+        algo = event.algo or "vanilla"
+        sizes = event.sizes or {}
+        original = sizes.get("original", 0)
+        sent = original
+        if algo != "vanilla":
+            sent = sizes.get("compressed", 0) + sizes.get("code", 0)
+            if event.fallback == "rpc_error":
+                sent += original  # the vanilla retry went out as well
+        target = self._target(event.target)
+        t = self._tally.local()
+        at = (algo, target)
+        t.inc("requests_total", at)
+        if original:
+            t.inc("original_bytes_total", at, original)
+            t.inc("sent_bytes_total", at, sent)
+            if algo != "vanilla" and event.fallback is None:
+                t.inc("saved_bytes_total", at, original - sent)
+        if event.fallback is not None:
+            t.inc("fallbacks_total", (event.fallback, target))
+            if event.fallback in OVERRIDE_FAILURES:
+                t.inc("override_failures_total", at)
+        stages = event.stages
+        if "compress" in stages:
+            t.histogram("compress_seconds", at, BUCKETS_NS).observe(stages["compress"])
+            t.inc("compress_cpu_seconds_total", at, stages["compress"] / 1e9)
+        rpc = stages.get("rpc", 0) + stages.get("fallback_rpc", 0)
+        if rpc:
+            t.histogram("rpc_seconds", at, BUCKETS_NS).observe(rpc)
+        if original and algo != "vanilla" and event.fallback is None:
+            t.histogram("compression_ratio", at, RATIO_BUCKETS).observe(sent / original)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        tally = self._tally.merged()
+        counters = tally.counters
+        histograms = {k: (h.cumulative(), h.count, h.sum) for k, h in tally.histograms.items()}
+        lines: list[str] = []
+        for name, kind, help_, label_names, scale in _METRICS:
+            full = f"{self.namespace}_{name}"
+            lines += [f"# HELP {full} {help_}", f"# TYPE {full} {kind}"]
+            if kind == "counter":
+                for (n, values), v in sorted(counters.items()):
+                    if n == name:
+                        lines.append(f"{full}{_labels(label_names, values)} {_number(v)}")
+                continue
+            for (n, values), (cumulative, count, total) in sorted(histograms.items()):
+                if n != name:
+                    continue
+                for bound, running in cumulative:
+                    le = 'le="' + _number(bound / scale) + '"'
+                    lines.append(f"{full}_bucket{_labels(label_names, values, le)} {running}")
+                lines.append(f"{full}_sum{_labels(label_names, values)} {_number(total / scale)}")
+                lines.append(f"{full}_count{_labels(label_names, values)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str | os.PathLike[str]) -> None:
+        """Writes render() to path atomically (temp file + rename)."""
+        directory = os.path.dirname(os.fspath(path)) or "."
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".ethcompress-metrics")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def wsgi(self, environ: dict[str, Any], start_response: Callable[..., Any]) -> Iterable[bytes]:
+        """Minimal WSGI app serving render(), e.g. `wsgiref.simple_server.make_server(..., m.wsgi)`."""
+        body = self.render().encode()
+        start_response(
+            "200 OK", [("Content-Type", CONTENT_TYPE), ("Content-Length", str(len(body)))]
+        )
+        return [body]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._targets = frozenset()
+        self._tally.reset()
+
+
+__all__ = ["CONTENT_TYPE", "RATIO_BUCKETS", "PrometheusMetrics"]
@@ -1,29 +1,379 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+import threading
 from typing import Any
 
-from .compressor import DECOMPRESSOR_ADDRESS, compress_call_data
-
-
-class CompressionMiddleware:
+from compressions.utils import hex_to_bytes as _hex_to_bytes, revert_on_failure
+
+from .compressor import (
+    DECOMPRESSOR_ADDRESS,
+    CompressedCall,
+    CompressResult,
+    _size_bytes,
+    _vanilla_meta,
+    compress_call_data,
+    merge_override,
+)
+from .instrument import Sink, Trace, finish_trace, vanilla_reason
+from .multicall import (
+    GAS_PER_CALL,
+    _aggregate_calls,
+    _split_aggregate,
+    aggregate_result,
+    decode_aggregate,
+)
+from .stream import async_stream_eth_call, stream_eth_call
+
+# Codecs whose forwarder runs from any address (the JIT reads its own ADDRESS), so that the
+# forwarders of one eth_simulateV1 block can be installed side by side
+SIMULATE_ALGORITHMS = ("flz", "cd", "wd", "flz64k")
+
+
+def _simulate_address(i: int) -> str:
+    """Address of the i-th forwarder of a block: 0x..e0, 0x..01e0, 0x..02e0, ..."""
+    return "0x" + (0xE0 + (i << 8)).to_bytes(20, "big").hex()
+
+
+def _compress_relocatable(
+    data: Any, to: str, alg: str, min_size: int, level: int, sink: Sink | None
+) -> CompressResult:
+    """compress_call_data restricted to SIMULATE_ALGORITHMS: the auto pick if it is one,
+    else the smallest of them."""
+    if alg in SIMULATE_ALGORITHMS:
+        return compress_call_data(data, to, alg=alg, min_size=min_size, level=level, sink=sink)
+    first = compress_call_data(data, to, alg="auto", min_size=min_size, level=level, sink=sink)
+    if first[3]["algo"] in (*SIMULATE_ALGORITHMS, "vanilla"):
+        return first
+    best: CompressResult | None = None
+    for name in SIMULATE_ALGORITHMS:
+        try:
+            res = compress_call_data(data, to, alg=name, min_size=min_size, level=level)
+        except Exception:
+            continue
+        sizes = res[3]["sizes"]
+        if res[3]["algo"] != "vanilla" and (
+            best is None
+            or sizes["compressed"] + sizes["code"]
+            < best[3]["sizes"]["compressed"] + best[3]["sizes"]["code"]
+        ):
+            best = res
+    original = first[3]["sizes"]["original"]
+    return best or (to, data, None, _vanilla_meta(original))
+
+
+def _relocatable_call(call: dict[str, Any]) -> bool:
+    """Whether a simulated call behaves the same behind a forwarder: it must not rely on its
+    sender (the target sees the forwarder as msg.sender) or send value (the forwarder
+    forwards none)."""
+    if call.get("from"):
+        return False
+    value = call.get("value") or 0
+    return (int(value, 16) if isinstance(value, str) else int(value)) == 0
+
+
+def _compress_simulate(
+    params: Any, alg: str, min_size: int, level: int, sink: Sink | None
+) -> tuple[list[Any] | None, dict[str, Any], str | None, set[tuple[int, int]]]:
+    """Compresses the calls of eth_simulateV1 params; the forwarders a block needs are
+    installed once in its stateOverrides, one address per distinct forwarder. Forwarders
+    revert with the target's output when it fails, so call status is kept. Calls setting
+    from or value are sent as is, and so are payloads with validation (nonce and balance
+    checks of the senders).
+
+    Returns (new params or None when no call got smaller, meta summed over the calls,
+    fallback reason, (block, call) positions of the compressed calls).
+    """
+    payload = params[0] if params else None
+    if not isinstance(payload, dict) or not isinstance(payload.get("blockStateCalls"), list):
+        return None, _vanilla_meta(0), "no_params", set()
+    if payload.get("validation"):
+        return None, _vanilla_meta(0), "validation", set()
+    sizes = {"original": 0, "compressed": 0, "code": 0}
+    algo, below = None, True
+    positions: set[tuple[int, int]] = set()
+    blocks = []
+    for b, block in enumerate(payload["blockStateCalls"]):
+        slots: dict[str, str] = {}  # forwarder code -> address
+        calls = []
+        for c, call in enumerate(block.get("calls") or []):
+            to, data = call.get("to"), call.get("data") or call.get("input")
+            if not to or not data or not _relocatable_call(call):
+                calls.append(call)
+                continue
+            _, new_data, override, meta = _compress_relocatable(
+                data, to, alg, min_size, level, sink
+            )
+            sizes["original"] += meta["sizes"]["original"]
+            below = below and meta["sizes"]["original"] < min_size
+            if not override or len(override) != 1:
+                sizes["compressed"] += meta["sizes"]["original"]
+                calls.append(call)
+                continue
+            ((code,),) = ((revert_on_failure(v["code"]),) for v in override.values())
+            if code not in slots:
+                slots[code] = _simulate_address(len(slots))
+                sizes["code"] += _size_bytes(code)
+            sizes["compressed"] += meta["sizes"]["compressed"]
+            algo = algo or meta["algo"]
+            positions.add((b, c))
+            fields = {k: v for k, v in call.items() if k != "input"}
+            calls.append({**fields, "to": slots[code], "data": new_data})
+        new_block = {**block, "calls": calls}
+        if slots:
+            installed = {addr: {"code": code} for code, addr in slots.items()}
+            new_block["stateOverrides"] = merge_override(installed, block.get("stateOverrides"))
+        blocks.append(new_block)
+    if not positions:
+        meta = {"algo": "vanilla", "sizes": sizes}
+        return None, meta, "below_min_size" if below else "no_gain", positions
+    new_params = [{**payload, "blockStateCalls": blocks}, *params[1:]]
+    return new_params, {"algo": algo, "sizes": sizes}, None, positions
+
+
+def _simulate_failed(res: Any, positions: set[tuple[int, int]]) -> bool:
+    """Whether the response is an error or a compressed call failed. A failed status may be
+    the target's own revert or the forwarder running out of gas, so either is retried."""
+    blocks = res.get("result") if isinstance(res, dict) else None
+    if not isinstance(blocks, list):
+        return True
+    for b, c in positions:
+        try:
+            status = blocks[b]["calls"][c]["status"]
+        except (IndexError, KeyError, TypeError):
+            return True
+        if status in ("0x0", 0):
+            return True
+    return False
+
+
+def _split_alg(alg: str) -> str:
+    """Aggregate codec for the chunks of a split Multicall3.aggregate call, per middleware alg.
+
+    "auto" stays: it weighs agg, agg-flz and (beyond their 255 target/selector limit) the
+    calldata codecs. flz becomes its aggregate form agg-flz. Every other codec has no
+    aggregate form and compresses the plain ABI encoding of each chunk itself.
+    """
+    return "agg-flz" if alg == "flz" else alg
+
+
+def _plan_split(
+    to: str,
+    data_hex: Any,
+    max_request_bytes: int | None,
+    max_gas: int | None,
+    gas_per_call: int,
+    alg: str,
+    min_size: int,
+    allow_fallback: bool,
+    level: int,
+    sink: Sink | None,
+) -> list[tuple[int, CompressedCall]] | None:
+    """Chunks of a Multicall3.aggregate call that fit the budgets (one when it fits whole);
+    None when the call is not an aggregate of several calls. alg is the middleware's, see
+    _split_alg."""
+    calls = _aggregate_calls(data_hex if isinstance(data_hex, bytes) else _hex_to_bytes(data_hex))
+    if calls is None or len(calls) < 2:
+        return None
+    return _split_aggregate(
+        calls,
+        max_request_bytes,
+        max_gas,
+        gas_per_call,
+        to,
+        _split_alg(alg),
+        min_size,
+        allow_fallback,
+        level,
+        sink,
+    )
+
+
+def _chunks_meta(chunks: list[tuple[int, CompressedCall]]) -> dict[str, Any]:
+    sizes = {k: sum(cc.sizes[k] for _, cc in chunks) for k in ("original", "compressed", "code")}
+    return {"algo": chunks[0][1].algo, "sizes": sizes}
+
+
+def _chunk_params(
+    cc: CompressedCall, block: Any, existing: Any, allow_fallback: bool
+) -> tuple[list[Any], list[Any] | None]:
+    """eth_call params of a chunk, and of its vanilla retry (None without one)."""
+    override = merge_override(cc.override, existing)
+    params: list[Any] = [{"to": cc.to, "data": cc.data}, block]
+    vanilla: list[Any] | None = None
+    if cc.override and allow_fallback and cc._vanilla:
+        vanilla = [{"to": cc._vanilla[0], "data": cc._vanilla[1]}, block]
+        if existing:
+            vanilla.append(existing)
+    return [*params, override] if override else params, vanilla
+
+
+def _stitch(responses: list[dict[str, Any]]) -> dict[str, Any]:
+    """One aggregate response from the chunk responses, or the first error."""
+    results: list[memoryview] = []
+    number = 0
+    for res in responses:
+        if "result" not in res:
+            return res
+        number, returned = decode_aggregate(res["result"])
+        results.extend(returned)
+    stitched = aggregate_result(number, results)
+    # Streamed responses carry bytes, others hex
+    raw = isinstance(responses[0]["result"], bytes)
+    return {**responses[0], "result": stitched if raw else "0x" + stitched.hex()}
+
+
+class _Splitting:
+    """Budget checks of Multicall3.aggregate calls, shared by both middlewares."""
+
+    alg: str
+    max_request_bytes: int | None
+    max_gas: int | None
+    gas_per_call: int
+    min_size: int
+    allow_fallback: bool
+    level: int
+    sink: Sink | None
+
+    def _plan_split(
+        self, to: str, data_hex: Any
+    ) -> tuple[list[tuple[int, CompressedCall]] | None, str | None]:
+        """The split plan of an eth_call, and "split_error" when planning raised (the call
+        is then sent whole)."""
+        if self.max_request_bytes is None and self.max_gas is None:
+            return None, None
+        try:
+            chunks = _plan_split(
+                to,
+                data_hex,
+                self.max_request_bytes,
+                self.max_gas,
+                self.gas_per_call,
+                self.alg,
+                self.min_size,
+                self.allow_fallback,
+                self.level,
+                self.sink,
+            )
+        except ValueError:
+            return None, "split_error"
+        return chunks, None
+
+
+class CompressionMiddleware(_Splitting):
     def __init__(
         self,
         *,
         alg: str = "auto",
         min_size: int = 800,
         allow_fallback: bool = True,
+        level: int = 1,
+        sink: Sink | None = None,
+        stream_results: bool = False,
+        max_request_bytes: int | None = None,
+        max_gas: int | None = None,
+        gas_per_call: int = GAS_PER_CALL,
+        concurrency: int = 8,
+        compress_simulate: bool = False,
     ) -> None:
         self.alg = alg
         self.min_size = min_size
         self.allow_fallback = allow_fallback
+        self.level = level
+        self.sink = sink
+        self.stream_results = stream_results
+        # Budgets above which Multicall3.aggregate calls are split (see ethcompress.multicall)
+        self.max_request_bytes = max_request_bytes
+        self.max_gas = max_gas
+        self.gas_per_call = gas_per_call
+        self.concurrency = concurrency
+        # eth_simulateV1 calls go through forwarders only on request (see _compress_simulate)
+        self.compress_simulate = compress_simulate
+        self._pool: ThreadPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        # One pool per middleware, shared by every split request
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.concurrency, thread_name_prefix="ethcompress-split"
+                )
+            return self._pool
+
+    def close(self) -> None:
+        """Shuts down the thread pool used to send split chunks."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def _send_chunks(
+        self,
+        make_request: Callable[[str, Any], Any],
+        chunks: list[tuple[int, CompressedCall]],
+        block: Any,
+        existing: Any,
+    ) -> dict[str, Any]:
+        """Sends the chunks of a split aggregate concurrently and stitches the results."""
+        if block == "latest":
+            # Every chunk reads the same state
+            block = make_request("eth_blockNumber", [])["result"]
+
+        def send(cc: CompressedCall) -> dict[str, Any]:
+            params, vanilla = _chunk_params(cc, block, existing, self.allow_fallback)
+            res = make_request("eth_call", params)
+            if "result" not in res and vanilla is not None:
+                res = make_request("eth_call", vanilla)
+            return dict(res)
+
+        return _stitch(list(self._executor().map(send, (cc for _, cc in chunks))))
 
     def _build(self, make_request, w3):
+        def simulate(params: list) -> dict[str, Any]:
+            method = "eth_simulateV1"
+            trace = Trace("middleware", self.sink) if self.sink is not None else None
+            try:
+                new_params, meta, reason, positions = _compress_simulate(
+                    params, self.alg, self.min_size, self.level, self.sink
+                )
+            except Exception:
+                if trace is not None:
+                    trace.mark("compress")
+                return finish_trace(trace, "rpc", dict(make_request(method, params)), "error")
+            if trace is not None:
+                trace.mark("compress")
+            if new_params is None:
+                return finish_trace(trace, "rpc", dict(make_request(method, params)), reason, meta)
+
+            res = make_request(method, new_params)
+            if not _simulate_failed(res, positions):
+                return finish_trace(trace, "rpc", dict(res), None, meta)
+            if trace is not None:
+                trace.mark("rpc")
+            if self.allow_fallback:
+                res = make_request(method, params)
+                return finish_trace(trace, "fallback_rpc", dict(res), "rpc_error", meta)
+            return finish_trace(trace, "rpc", dict(res), "disabled", meta)
+
+        if self.stream_results:
+            # eth_call skips the rest of the onion and reads the response incrementally
+            make_request = stream_eth_call(make_request, w3.provider)
+
         def middleware(method: str, params: list) -> dict[str, Any]:
+            if method == "eth_simulateV1" and self.compress_simulate:
+                return simulate(params)
             if method != "eth_call":
                 return dict(make_request(method, params))
 
+            trace = None
+            if self.sink is not None:
+                to = params[0].get("to") if params and isinstance(params[0], dict) else None
+                trace = Trace("middleware", self.sink, to)
             if not params:
-                return dict(make_request(method, params))
+                return finish_trace(trace, "rpc", dict(make_request(method, params)), "no_params")
 
             # Parse eth_call params: [tx, block/tag?, override?]
             tx = params[0] if len(params) >= 1 else {}
@@ -33,32 +383,46 @@ class CompressionMiddleware:
             to = tx.get("to")
             data_hex = tx.get("data")
             if not to or not data_hex:
-                return dict(make_request(method, params))
+                res = dict(make_request(method, params))
+                return finish_trace(trace, "rpc", res, "no_params")
+
+            chunks, split_error = self._plan_split(to, data_hex)
+            if chunks is not None and len(chunks) > 1:
+                try:
+                    res = self._send_chunks(make_request, chunks, block, existing_override)
+                    return finish_trace(trace, "rpc", res, None, _chunks_meta(chunks))
+                except Exception:
+                    split_error = "split_error"  # sent whole below
 
             try:
-                new_to, new_data, override, meta = compress_call_data(
-                    data_hex, to, alg=self.alg, min_size=self.min_size
-                )
+                if chunks is not None and len(chunks) == 1:
+                    # Send the encoding the budgets were checked against
+                    cc = chunks[0][1]
+                    new_to, new_data, override = cc.to, cc.data, cc.override
+                    meta = {"algo": cc.algo, "sizes": cc.sizes}
+                else:
+                    new_to, new_data, override, meta = compress_call_data(
+                        data_hex,
+                        to,
+                        alg=self.alg,
+                        min_size=self.min_size,
+                        level=self.level,
+                        sink=self.sink,
+                    )
             except Exception:
-                return dict(make_request(method, params))
+                if trace is not None:
+                    trace.mark("compress")
+                return finish_trace(trace, "rpc", dict(make_request(method, params)), "error")
+            if trace is not None:
+                trace.mark("compress")
 
             if meta.get("algo") == "vanilla":
-                return dict(make_request(method, params))
+                res = dict(make_request(method, params))
+                return finish_trace(trace, "rpc", res, vanilla_reason(meta, self.min_size), meta)
 
-            # Merge overrides if possible (simple merge; if conflicts, skip compression)
-            merged_override = None
+            # The caller's override fields win, e.g. their own code at the decompressor address
             try:
-                if existing_override and override:
-                    # best effort: if both set code for decompressor address, prefer existing
-                    merged = {**override}
-                    for k, v in existing_override.items():
-                        if k in merged and isinstance(merged[k], dict) and isinstance(v, dict):
-                            merged[k] = {**merged[k], **v}
-                        else:
-                            merged[k] = v
-                    merged_override = merged
-                else:
-                    merged_override = existing_override or override
+                merged_override = merge_override(override, existing_override)
             except Exception:
                 merged_override = existing_override or override
 
@@ -67,13 +431,19 @@ class CompressionMiddleware:
             if merged_override:
                 payload.append(merged_override)
 
+            if trace is not None:
+                trace.mark("merge")
+
             res = make_request("eth_call", payload)
             if "result" in res:
-                return dict(res)
+                return finish_trace(trace, "rpc", dict(res), split_error, meta)
+            if trace is not None:
+                trace.mark("rpc")
 
             if self.allow_fallback:
-                return dict(make_request(method, params))
-            return dict(res)
+                res = make_request(method, params)
+                return finish_trace(trace, "fallback_rpc", dict(res), "rpc_error", meta)
+            return finish_trace(trace, "rpc", dict(res), "disabled", meta)
 
         return middleware
 
@@ -99,23 +469,105 @@ class CompressionMiddleware:
         raise TypeError("CompressionMiddleware: expected (make_request, w3) or (w3)")
 
 
-class AsyncCompressionMiddleware:
+class AsyncCompressionMiddleware(_Splitting):
     def __init__(
         self,
         *,
         alg: str = "auto",
         min_size: int = 800,
         allow_fallback: bool = True,
+        level: int = 1,
+        sink: Sink | None = None,
+        stream_results: bool = False,
+        max_request_bytes: int | None = None,
+        max_gas: int | None = None,
+        gas_per_call: int = GAS_PER_CALL,
+        concurrency: int = 8,
+        compress_simulate: bool = False,
     ) -> None:
         self.alg = alg
         self.min_size = min_size
         self.allow_fallback = allow_fallback
+        self.level = level
+        self.sink = sink
+        self.stream_results = stream_results
+        # Budgets above which Multicall3.aggregate calls are split (see ethcompress.multicall)
+        self.max_request_bytes = max_request_bytes
+        self.max_gas = max_gas
+        self.gas_per_call = gas_per_call
+        self.concurrency = concurrency
+        # eth_simulateV1 calls go through forwarders only on request (see _compress_simulate)
+        self.compress_simulate = compress_simulate
+
+    async def _send_chunks(
+        self,
+        make_request: Callable[[str, Any], Awaitable[Any]],
+        chunks: list[tuple[int, CompressedCall]],
+        block: Any,
+        existing: Any,
+    ) -> dict[str, Any]:
+        """Sends the chunks of a split aggregate concurrently and stitches the results."""
+        if block == "latest":
+            # Every chunk reads the same state
+            block = (await make_request("eth_blockNumber", []))["result"]
+        limit = asyncio.Semaphore(self.concurrency)
+
+        async def send(cc: CompressedCall) -> dict[str, Any]:
+            params, vanilla = _chunk_params(cc, block, existing, self.allow_fallback)
+            async with limit:
+                res = await make_request("eth_call", params)
+                if "result" not in res and vanilla is not None:
+                    res = await make_request("eth_call", vanilla)
+            return dict(res)
+
+        return _stitch(list(await asyncio.gather(*(send(cc) for _, cc in chunks))))
 
     def _build(self, make_request, w3):
+        if self.stream_results:
+            # eth_call skips the rest of the onion and reads the response incrementally
+            make_request = async_stream_eth_call(make_request, w3.provider)
+
+        async def simulate(params: list) -> dict[str, Any]:
+            method = "eth_simulateV1"
+            trace = Trace("middleware", self.sink) if self.sink is not None else None
+            try:
+                new_params, meta, reason, positions = _compress_simulate(
+                    params, self.alg, self.min_size, self.level, self.sink
+                )
+            except Exception:
+                if trace is not None:
+                    trace.mark("compress")
+                return finish_trace(trace, "rpc", dict(await make_request(method, params)), "error")
+            if trace is not None:
+                trace.mark("compress")
+            if new_params is None:
+                res = dict(await make_request(method, params))
+                return finish_trace(trace, "rpc", res, reason, meta)
+
+            res = await make_request(method, new_params)
+            if not _simulate_failed(res, positions):
+                return finish_trace(trace, "rpc", dict(res), None, meta)
+            if trace is not None:
+                trace.mark("rpc")
+            if self.allow_fallback:
+                res = await make_request(method, params)
+                return finish_trace(trace, "fallback_rpc", dict(res), "rpc_error", meta)
+            return finish_trace(trace, "rpc", dict(res), "disabled", meta)
+
         async def middleware(method: str, params: list) -> dict:
-            if method != "eth_call" or not params:
+            if method == "eth_simulateV1" and self.compress_simulate:
+                return await simulate(params)
+            if method != "eth_call":
                 return dict(await make_request(method, params))
 
+            trace = None
+            if self.sink is not None:
+                to = params[0].get("to") if params and isinstance(params[0], dict) else None
+                trace = Trace("middleware", self.sink, to)
+            if not params:
+                res = dict(await make_request(method, params))
+                return finish_trace(trace, "rpc", res, "no_params")
+
             tx = params[0] if len(params) >= 1 else {}
             block = params[1] if len(params) >= 2 else "latest"
             existing_override = params[2] if len(params) >= 3 else None
@@ -123,31 +575,46 @@ class AsyncCompressionMiddleware:
             to = tx.get("to")
             data_hex = tx.get("data")
             if not to or not data_hex:
-                return dict(await make_request(method, params))
+                res = dict(await make_request(method, params))
+                return finish_trace(trace, "rpc", res, "no_params")
+
+            chunks, split_error = self._plan_split(to, data_hex)
+            if chunks is not None and len(chunks) > 1:
+                try:
+                    res = await self._send_chunks(make_request, chunks, block, existing_override)
+                    return finish_trace(trace, "rpc", res, None, _chunks_meta(chunks))
+                except Exception:
+                    split_error = "split_error"  # sent whole below
 
             try:
-                new_to, new_data, override, meta = compress_call_data(
-                    data_hex, to, alg=self.alg, min_size=self.min_size
-                )
+                if chunks is not None and len(chunks) == 1:
+                    # Send the encoding the budgets were checked against
+                    cc = chunks[0][1]
+                    new_to, new_data, override = cc.to, cc.data, cc.override
+                    meta = {"algo": cc.algo, "sizes": cc.sizes}
+                else:
+                    new_to, new_data, override, meta = compress_call_data(
+                        data_hex,
+                        to,
+                        alg=self.alg,
+                        min_size=self.min_size,
+                        level=self.level,
+                        sink=self.sink,
+                    )
             except Exception:
-                return dict(await make_request(method, params))
+                if trace is not None:
+                    trace.mark("compress")
+                return finish_trace(trace, "rpc", dict(await make_request(method, params)), "error")
+            if trace is not None:
+                trace.mark("compress")
 
             if meta.get("algo") == "vanilla":
-                return dict(await make_request(method, params))
+                res = dict(await make_request(method, params))
+                return finish_trace(trace, "rpc", res, vanilla_reason(meta, self.min_size), meta)
 
-            # Merge overrides if possible
-            merged_override = None
+            # The caller's override fields win, e.g. their own code at the decompressor address
             try:
-                if existing_override and override:
-                    merged = {**override}
-                    for k, v in existing_override.items():
-                        if k in merged and isinstance(merged[k], dict) and isinstance(v, dict):
-                            merged[k] = {**merged[k], **v}
-                        else:
-                            merged[k] = v
-                    merged_override = merged
-                else:
-                    merged_override = existing_override or override
+                merged_override = merge_override(override, existing_override)
             except Exception:
                 merged_override = existing_override or override
 
@@ -156,13 +623,19 @@ class AsyncCompressionMiddleware:
             if merged_override:
                 payload.append(merged_override)
 
+            if trace is not None:
+                trace.mark("merge")
+
             res = await make_request("eth_call", payload)
             if isinstance(res, dict) and "result" in res:
-                return dict(res)
+                return finish_trace(trace, "rpc", dict(res), split_error, meta)
+            if trace is not None:
+                trace.mark("rpc")
 
             if self.allow_fallback:
-                return dict(await make_request(method, params))
-            return dict(res)
+                res = await make_request(method, params)
+                return finish_trace(trace, "fallback_rpc", dict(res), "rpc_error", meta)
+            return finish_trace(trace, "rpc", dict(res), "disabled", meta)
 
         return middleware
 
@@ -182,8 +655,17 @@ class AsyncCompressionMiddleware:
                 def wrap_make_request(self, make_request):
                     return parent._build(make_request, self.w3)
 
+                # AsyncWeb3 awaits this hook when combining the middleware onion
+                async def async_wrap_make_request(self, make_request):
+                    return parent._build(make_request, self.w3)
+
             return V7AsyncAdapter(w3)
         raise TypeError("AsyncCompressionMiddleware: expected (make_request, w3) or (w3)")
 
 
-__all__ = ["DECOMPRESSOR_ADDRESS", "AsyncCompressionMiddleware", "CompressionMiddleware"]
+__all__ = [
+    "DECOMPRESSOR_ADDRESS",
+    "SIMULATE_ALGORITHMS",
+    "AsyncCompressionMiddleware",
+    "CompressionMiddleware",
+]
@@ -0,0 +1,553 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator, Sequence
+import itertools
+import math
+import struct
+from typing import Any, cast, overload
+
+from eth_abi import decode as _abi_decode
+
+from compressions.aggregate import (
+    agg_compress as _agg_compress,
+    agg_fwd_bytecode as _agg_fwd_bytecode,
+    aggregate_calldata as _aggregate_calldata,
+)
+from compressions.utils import hex_to_bytes as _hex_to_bytes
+
+from .analysis import estimate_decode_gas
+from .compressor import (
+    ABI_ADDRESS,
+    ALGORITHMS,
+    DECOMPRESSOR_ADDRESS,
+    CompressedCall,
+    HexLike,
+    compress_eth_call,
+    execute_many,
+)
+from .instrument import Sink, Trace, vanilla_reason
+from .jit import flz_fwd_bytecode
+from .libzip import flz_compress
+
+"""
+Multicall3 batches: structure-aware compression of aggregate calls and zero-copy decoding
+of their results.
+
+compress_aggregate(calls) never ABI encodes the batch for the compressed call: the stream
+holds every distinct target and selector once plus each call's arguments, and a forwarder
+rebuilds the ABI encoding (offsets included) on-chain before calling Multicall3 (see
+compressions.aggregate). With alg="agg-flz" the stream is FLZ compressed on top, behind the
+FLZ forwarder; "auto" keeps the smaller of the two by total size.
+
+Batches too big for one request (a provider's body limit, its eth_call gas cap) are cut by
+split_aggregate into chunks of about equal ABI size that each fit the budgets, judged by the
+request size from the compressed sizes and a gas estimate (decoder model plus an allowance
+per call). execute_aggregate runs the chunks concurrently against one block and stitches
+the results back in call order.
+
+On the way back, w3.codec.decode(["uint256", "bytes[]"], raw) copies every return blob into its own bytes
+object. The decoders here check the ABI head once and return a ReturnData: a lazy sequence
+whose items are memoryview slices of the one response buffer, located from their offset
+words only when accessed. Fed with bytes from CompressingHTTPProvider(stream_results=True)
+or ethcompress.stream.read_result, nothing is copied between the socket and the caller.
+
+ReturnData.uint256() decodes fixed-width results (balances, allowances, supplies) in bulk:
+when every call succeeded with exactly one word, the layout is fully regular and the words
+are pulled out with struct.iter_unpack, without per-element offset arithmetic.
+"""
+
+_WORD = 32
+_ZERO_HIGH = bytes(24)
+_ONE = (1).to_bytes(_WORD, "big")
+_LEN_WORD = _WORD.to_bytes(_WORD, "big")
+_WORD_64 = (2 * _WORD).to_bytes(_WORD, "big")
+_TUPLE_HEAD = _WORD_64  # (bool, bytes): offset of the bytes field
+_AGGREGATE = bytes.fromhex("252dba42")
+
+# Regular layouts of one-word results: offset table entries then, per element,
+# bytes[]: length, word; (bool,bytes)[]: success, offset, length, word
+_PLAIN = struct.Struct(">32s32s")
+_TUPLED = struct.Struct(">32s32s32s32s")
+_OFFSET = struct.Struct(">24sQ")
+
+RawLike = str | bytes | bytearray | memoryview
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+AGGREGATE_ALGORITHMS = ("agg", "agg-flz")
+
+# JSON-RPC framing, method, block and override keys around the hex fields of an eth_call
+REQUEST_OVERHEAD = 256
+# Execution gas allowed per call of a batch on top of the decoder, about a cold ERC-20 view
+GAS_PER_CALL = 10_000
+
+
+def _buffer(raw: RawLike) -> memoryview:
+    if isinstance(raw, str):
+        raw = _hex_to_bytes(raw)
+    return memoryview(raw).toreadonly().cast("B")
+
+
+def _uint_word(buf: memoryview, pos: int) -> int:
+    if pos + _WORD > len(buf):
+        raise ValueError(f"ABI word at {pos} past the end of {len(buf)} bytes")
+    return int.from_bytes(buf[pos : pos + _WORD], "big")
+
+
+def _uint(buf: memoryview, pos: int) -> int:
+    """An offset or length word, which must fit in 64 bits."""
+    if pos + _WORD > len(buf):
+        raise ValueError(f"ABI word at {pos} past the end of {len(buf)} bytes")
+    high, low = _OFFSET.unpack_from(buf, pos)
+    if high != _ZERO_HIGH:
+        raise ValueError(f"ABI offset or length at {pos} out of range")
+    return int(low)
+
+
+class ReturnData(Sequence[memoryview]):
+    """The bytes[] or (bool success, bytes returnData)[] of a Multicall3 result.
+
+    Items are memoryview slices of the response buffer (success flags are dropped; see
+    success()). Indexing reads two or three words; nothing is decoded up front."""
+
+    def __init__(self, buf: memoryview, base: int, tupled: bool) -> None:
+        self._buf = buf
+        self._base = base + _WORD  # the offset table, after the length word
+        self._count = _uint(buf, base)
+        self._tupled = tupled
+        if self._base + _WORD * self._count > len(buf):
+            raise ValueError(f"{self._count} results do not fit in {len(buf)} bytes")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _element(self, i: int) -> int:
+        if not -self._count <= i < self._count:
+            raise IndexError("result index out of range")
+        if i < 0:
+            i += self._count
+        return self._base + _uint(self._buf, self._base + _WORD * i)
+
+    def _data(self, pos: int) -> memoryview:
+        if self._tupled:
+            pos += _uint(self._buf, pos + _WORD)
+        start = pos + _WORD
+        end = start + _uint(self._buf, pos)
+        if end > len(self._buf):
+            raise ValueError(f"result at {pos} past the end of {len(self._buf)} bytes")
+        return self._buf[start:end]
+
+    @overload
+    def __getitem__(self, i: int) -> memoryview: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> list[memoryview]: ...
+
+    def __getitem__(self, i: int | slice) -> memoryview | list[memoryview]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        return self._data(self._element(i))
+
+    def __iter__(self) -> Iterator[memoryview]:
+        for i in range(self._count):
+            yield self._data(self._element(i))
+
+    def success(self, i: int) -> bool:
+        """Whether call i succeeded; always True for aggregate, which reverts instead."""
+        if not self._tupled:
+            self._element(i)
+            return True
+        return self._buf[self._element(i) + _WORD - 1] != 0
+
+    def successes(self) -> list[bool]:
+        return [self.success(i) for i in range(self._count)]
+
+    def _regular(self) -> tuple[tuple[bytes, ...], ...] | None:
+        """The per-element words if every call returned exactly one word in canonical
+        layout, else None."""
+        n, fmt = self._count, _TUPLED if self._tupled else _PLAIN
+        table = _WORD * n
+        end = self._base + table + fmt.size * n
+        if end > len(self._buf):
+            return None
+        offsets = _OFFSET.iter_unpack(self._buf[self._base : self._base + table])
+        if list(offsets) != [(_ZERO_HIGH, table + fmt.size * i) for i in range(n)]:
+            return None
+        if n == 0:
+            return ((),)
+        columns = tuple(zip(*fmt.iter_unpack(self._buf[self._base + table : end]), strict=True))
+        if self._tupled:
+            success, head, length, _ = columns
+            if success.count(_ONE) != n or head.count(_TUPLE_HEAD) != n:
+                return None
+        else:
+            length, _ = columns
+        return columns if length.count(_LEN_WORD) == n else None
+
+    def uint256(self, signed: bool = False) -> list[int | None]:
+        """Each result decoded as one uint256 (int256 with signed=True); None where the call
+        failed or returned less than a word. Regular layouts are decoded in bulk."""
+        columns = self._regular()
+        if columns is not None:
+            return [int.from_bytes(w, "big", signed=signed) for w in columns[-1]]
+        out: list[int | None] = []
+        for i in range(self._count):
+            pos = self._element(i)
+            data = self._data(pos)
+            ok = not self._tupled or self._buf[pos + _WORD - 1] != 0
+            out.append(
+                int.from_bytes(data[:_WORD], "big", signed=signed)
+                if ok and len(data) >= _WORD
+                else None
+            )
+        return out
+
+    def tobytes(self) -> list[bytes]:
+        """Copies of all results, as w3.codec.decode would return them."""
+        return [bytes(d) for d in self]
+
+
+def decode_aggregate(raw: RawLike) -> tuple[int, ReturnData]:
+    """Multicall3.aggregate(...) returns (uint256 blockNumber, bytes[] returnData)."""
+    buf = _buffer(raw)
+    return _uint_word(buf, 0), ReturnData(buf, _uint(buf, _WORD), tupled=False)
+
+
+def decode_try_aggregate(raw: RawLike) -> ReturnData:
+    """Multicall3.tryAggregate(...) returns (bool success, bytes returnData)[]."""
+    buf = _buffer(raw)
+    return ReturnData(buf, _uint(buf, 0), tupled=True)
+
+
+def decode_aggregate3(raw: RawLike) -> ReturnData:
+    """Multicall3.aggregate3(...) returns (bool success, bytes returnData)[], like tryAggregate."""
+    return decode_try_aggregate(raw)
+
+
+def _raw_calls(calls: Iterable[tuple[str, HexLike]]) -> list[tuple[bytes, bytes]]:
+    out = []
+    for target, data in calls:
+        address = _hex_to_bytes(target)
+        if len(address) != 20:
+            raise ValueError(f"invalid target address: {target}")
+        out.append((address, data if isinstance(data, bytes) else _hex_to_bytes(data)))
+    return out
+
+
+def _aggregate_calls(data: bytes) -> list[tuple[bytes, bytes]] | None:
+    """The (target, calldata) pairs of Multicall3.aggregate calldata, None for other calls."""
+    if data[:4] != _AGGREGATE:
+        return None
+    try:
+        (calls,) = _abi_decode(["(address,bytes)[]"], data[4:])
+    except Exception:
+        return None
+    return [(bytes.fromhex(t[2:]), d) for t, d in calls]
+
+
+def aggregate_result(block: int, results: Iterable[bytes | memoryview]) -> bytes:
+    """ABI encodes (uint256 blockNumber, bytes[] returnData), as aggregate returns it."""
+    results = list(results)
+    head = bytearray(block.to_bytes(32, "big") + _WORD_64 + len(results).to_bytes(32, "big"))
+    tails = bytearray()
+    for data in results:
+        head += (_WORD * len(results) + len(tails)).to_bytes(32, "big")
+        tails += len(data).to_bytes(32, "big") + data + bytes(-len(data) % 32)
+    return bytes(head + tails)
+
+
+def _aggregate_size(calls: list[tuple[bytes, bytes]]) -> int:
+    return 68 + sum(128 + len(d) + (-len(d) % 32) for _, d in calls)
+
+
+def _build_aggregate(
+    selected: str, stream: str, multicall: str, level: int
+) -> tuple[str, dict[str, str]]:
+    if selected == "agg":
+        return stream, {DECOMPRESSOR_ADDRESS: _agg_fwd_bytecode(multicall)}
+    calldata = flz_compress(stream, level)
+    code = flz_fwd_bytecode(ABI_ADDRESS)
+    return calldata, {DECOMPRESSOR_ADDRESS: code, ABI_ADDRESS: _agg_fwd_bytecode(multicall)}
+
+
+def compress_aggregate(
+    calls: Iterable[tuple[str, HexLike]],
+    *,
+    multicall: str = MULTICALL3_ADDRESS,
+    alg: str = "auto",
+    min_size: int = 800,
+    allow_fallback: bool = True,
+    level: int = 1,
+    sink: Sink | None = None,
+) -> CompressedCall:
+    """A compressed Multicall3.aggregate((address,bytes)[]) over (target, calldata) pairs.
+
+    alg is "agg", "agg-flz" or "auto". The plain ABI encoding is only built for the
+    vanilla fallback, directly rather than through eth_abi. Calls without a selector and
+    batches beyond 255 distinct targets or selectors raise ValueError, except with "auto",
+    which then compresses the ABI encoding with compress_eth_call.
+    """
+    if alg != "auto" and alg not in AGGREGATE_ALGORITHMS:
+        raise ValueError(f"unknown aggregate algorithm: {alg}")
+    raw = _raw_calls(calls)
+    return _compress_aggregate(raw, multicall, alg, min_size, allow_fallback, level, sink)
+
+
+def _compress_aggregate(
+    raw: list[tuple[bytes, bytes]],
+    multicall: str,
+    alg: str,
+    min_size: int,
+    allow_fallback: bool,
+    level: int,
+    sink: Sink | None,
+) -> CompressedCall:
+    if alg in ALGORITHMS:
+        # A calldata codec without an aggregate form compresses the plain ABI encoding
+        return compress_eth_call(
+            multicall,
+            "0x" + _aggregate_calldata(raw).hex(),
+            alg=alg,
+            min_size=min_size,
+            allow_fallback=allow_fallback,
+            level=level,
+            sink=sink,
+        )
+    trace = Trace("compress", sink, multicall) if sink is not None else None
+    size = _aggregate_size(raw)
+    vanilla = (multicall, "0x" + _aggregate_calldata(raw).hex())
+    if trace is not None:
+        trace.mark("parse")
+
+    selected = None
+    if size >= min_size:
+        try:
+            stream = _agg_compress(raw)
+        except ValueError:
+            if alg != "auto":
+                raise
+            return compress_eth_call(
+                *vanilla, min_size=min_size, allow_fallback=allow_fallback, level=level, sink=sink
+            )
+        if trace is not None:
+            trace.mark("select")
+        best: tuple[int, str, str, dict[str, str]] | None = None
+        for name in AGGREGATE_ALGORITHMS if alg == "auto" else (alg,):
+            calldata, codes = _build_aggregate(name, stream, multicall, level)
+            total = (len(calldata) - 2) // 2 + sum((len(c) - 2) // 2 for c in codes.values())
+            if best is None or total < best[0]:
+                best = (total, name, calldata, codes)
+        if trace is not None:
+            trace.mark("build")
+        if best is not None and best[0] < size:
+            total, selected, calldata, codes = best
+
+    if selected is None:
+        sizes = {"original": size, "compressed": size, "code": 0}
+        if trace is not None:
+            meta = {"sizes": sizes}
+            trace.emit(algo="vanilla", sizes=sizes, fallback=vanilla_reason(meta, min_size))
+        return CompressedCall(
+            to=multicall,
+            data=vanilla[1],
+            override=None,
+            algo="vanilla",
+            sizes=sizes,
+            benefit={"bytes_saved": 0, "pct": 0.0},
+            allow_fallback=allow_fallback,
+            _vanilla=vanilla,
+            sink=sink,
+        )
+
+    compressed = (len(calldata) - 2) // 2
+    sizes = {"original": size, "compressed": compressed, "code": total - compressed}
+    if trace is not None:
+        trace.mark("override")
+        trace.emit(algo=selected, sizes=sizes)
+    return CompressedCall(
+        to=DECOMPRESSOR_ADDRESS,
+        data=calldata,
+        override={addr: {"code": code} for addr, code in codes.items()},
+        algo=selected,
+        sizes=sizes,
+        benefit={"bytes_saved": size - total, "pct": (size - total) / size * 100},
+        allow_fallback=allow_fallback,
+        _vanilla=vanilla,
+        sink=sink,
+    )
+
+
+def request_bytes(cc: CompressedCall) -> int:
+    """Approximate JSON-RPC body size of the eth_call sending cc (hex doubles each byte)."""
+    return _request_bytes(cc.sizes)
+
+
+def estimate_gas(cc: CompressedCall, calls: int, gas_per_call: int = GAS_PER_CALL) -> int:
+    """Decoder gas (see ethcompress.analysis.GAS_MODEL) plus gas_per_call for each call."""
+    return _estimate_gas(cc.algo, cc.sizes, calls, gas_per_call)
+
+
+def _request_bytes(sizes: dict[str, int]) -> int:
+    return REQUEST_OVERHEAD + 2 * (sizes["compressed"] + sizes["code"])
+
+
+def _estimate_gas(algo: str, sizes: dict[str, int], calls: int, gas_per_call: int) -> int:
+    return estimate_decode_gas(algo, sizes["original"]) + gas_per_call * calls
+
+
+def _overshoot(
+    algo: str,
+    sizes: dict[str, int],
+    calls: int,
+    max_request_bytes: int | None,
+    max_gas: int | None,
+    gas_per_call: int,
+) -> float:
+    """How many times the call exceeds the tighter budget (at most 1 when it fits)."""
+    ratios = [0.0]
+    if max_request_bytes is not None:
+        ratios.append(_request_bytes(sizes) / max_request_bytes)
+    if max_gas is not None:
+        ratios.append(_estimate_gas(algo, sizes, calls, gas_per_call) / max_gas)
+    return max(ratios)
+
+
+def _partition(raw: list[tuple[bytes, bytes]], k: int) -> list[list[tuple[bytes, bytes]]]:
+    """k consecutive, non-empty runs of calls with about equal ABI encoded size."""
+    if k <= 1:
+        return [raw]
+    weights = list(itertools.accumulate(128 + len(d) + (-len(d) % 32) for _, d in raw))
+    cuts = [0]
+    for j in range(1, k):
+        cut = bisect_left(weights, weights[-1] * j / k) + 1
+        cuts.append(min(max(cut, cuts[-1] + 1), len(raw) - k + j))
+    cuts.append(len(raw))
+    return [raw[a:b] for a, b in itertools.pairwise(cuts)]
+
+
+def split_aggregate(
+    calls: Iterable[tuple[str, HexLike]],
+    *,
+    max_request_bytes: int | None = None,
+    max_gas: int | None = None,
+    gas_per_call: int = GAS_PER_CALL,
+    multicall: str = MULTICALL3_ADDRESS,
+    alg: str = "auto",
+    min_size: int = 800,
+    allow_fallback: bool = True,
+    level: int = 1,
+    sink: Sink | None = None,
+) -> list[tuple[int, CompressedCall]]:
+    """(call count, compressed aggregate) per chunk of consecutive calls, within the budgets.
+
+    The whole batch is one chunk if it fits. Otherwise it is cut into as many chunks as it
+    overshoots the tighter budget, more until each chunk fits; a single call over budget
+    goes out alone.
+    """
+    if alg != "auto" and alg not in AGGREGATE_ALGORITHMS:
+        raise ValueError(f"unknown aggregate algorithm: {alg}")
+    raw = _raw_calls(calls)
+    return _split_aggregate(
+        raw,
+        max_request_bytes,
+        max_gas,
+        gas_per_call,
+        multicall,
+        alg,
+        min_size,
+        allow_fallback,
+        level,
+        sink,
+    )
+
+
+def _split_aggregate(
+    raw: list[tuple[bytes, bytes]],
+    max_request_bytes: int | None,
+    max_gas: int | None,
+    gas_per_call: int,
+    multicall: str,
+    alg: str,
+    min_size: int,
+    allow_fallback: bool,
+    level: int,
+    sink: Sink | None,
+) -> list[tuple[int, CompressedCall]]:
+    k = 1
+    while True:
+        parts = _partition(raw, k)
+        chunks = [
+            (len(p), _compress_aggregate(p, multicall, alg, min_size, allow_fallback, level, sink))
+            for p in parts
+        ]
+        over = max(
+            _overshoot(cc.algo, cc.sizes, n, max_request_bytes, max_gas, gas_per_call)
+            for n, cc in chunks
+        )
+        if over <= 1 or k >= len(raw):
+            return chunks
+        k = min(len(raw), max(k + 1, math.ceil(k * over)))
+
+
+def execute_aggregate(
+    calls: Iterable[tuple[str, HexLike]],
+    w3: Any,
+    *,
+    block: str | int = "latest",
+    concurrency: int = 8,
+    max_request_bytes: int | None = None,
+    max_gas: int | None = None,
+    gas_per_call: int = GAS_PER_CALL,
+    multicall: str = MULTICALL3_ADDRESS,
+    alg: str = "auto",
+    min_size: int = 800,
+    allow_fallback: bool = True,
+    level: int = 1,
+    sink: Sink | None = None,
+) -> tuple[int, list[memoryview]]:
+    """Multicall3.aggregate over calls as (block number, return data per call).
+
+    Chunks from split_aggregate run concurrently; with more than one, "latest" is pinned to
+    the current block number first so that every chunk reads the same state.
+    """
+    chunks = split_aggregate(
+        calls,
+        max_request_bytes=max_request_bytes,
+        max_gas=max_gas,
+        gas_per_call=gas_per_call,
+        multicall=multicall,
+        alg=alg,
+        min_size=min_size,
+        allow_fallback=allow_fallback,
+        level=level,
+        sink=sink,
+    )
+    if len(chunks) > 1 and block == "latest":
+        block = int(w3.eth.block_number)
+    tag = hex(block) if isinstance(block, int) else block
+    number = 0
+    out: list[memoryview] = []
+    for res in execute_many((cc for _, cc in chunks), w3, block=tag, concurrency=concurrency):
+        # execute_many raises instead of yielding exceptions
+        number, data = decode_aggregate(cast(str, res))
+        out.extend(data)
+    return number, out
+
+
+__all__ = [
+    "AGGREGATE_ALGORITHMS",
+    "GAS_PER_CALL",
+    "MULTICALL3_ADDRESS",
+    "REQUEST_OVERHEAD",
+    "RawLike",
+    "ReturnData",
+    "aggregate_result",
+    "compress_aggregate",
+    "decode_aggregate",
+    "decode_aggregate3",
+    "decode_try_aggregate",
+    "estimate_gas",
+    "execute_aggregate",
+    "request_bytes",
+    "split_aggregate",
+]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+from typing import TYPE_CHECKING, Any
+
+import web3
+from web3 import HTTPProvider
+from web3.types import RPCEndpoint
+
+if TYPE_CHECKING:
+    from .compressor import CompressedCall
+
+"""
+Pre-serialized eth_call requests for calls that are sent many times.
+
+A PreparedCall holds the JSON-RPC body of a compressed call (and of its vanilla fallback)
+as byte fragments around the block tag and the request id, so sending it costs a join
+instead of rebuilding dicts and re-encoding multi-KB hex strings. With web3's HTTPProvider
+the bytes are posted directly (through the provider's session, headers and retry settings);
+other providers get the prebuilt parameter objects.
+"""
+
+# HTTPProvider._make_request(method, body: bytes) -> bytes posts a raw body through the
+# provider's session, headers, timeout and retry configuration. It is private and has this
+# shape since web3 7, so older versions send the parameter objects instead.
+_RAW_POST = int(web3.__version__.split(".")[0]) >= 7
+
+_HEAD = b'{"jsonrpc":"2.0","method":"eth_call","params":['
+
+
+def _json(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def _block(block: str | int) -> str:
+    return hex(block) if isinstance(block, int) else block
+
+
+def _fragments(tx: dict[str, str], override: dict[str, Any] | None) -> tuple[bytes, bytes]:
+    # params: [tx, block, override?]; the block goes between the fragments, the id after
+    tail = b"," + _json(override) if override else b""
+    return _HEAD + _json(tx) + b",", tail + b'],"id":'
+
+
+@dataclass(frozen=True)
+class PreparedCall:
+    """Immutable eth_call request serialized once; block and id are filled in per send."""
+
+    tx: dict[str, str]
+    override: dict[str, dict[str, str]] | None
+    vanilla_tx: dict[str, str] | None
+    allow_fallback: bool
+    _compressed: tuple[bytes, bytes]
+    _vanilla: tuple[bytes, bytes] | None
+
+    @classmethod
+    def from_call(cls, cc: CompressedCall) -> PreparedCall:
+        tx = {"to": cc.to, "data": cc.data}
+        override = cc.override or None
+        vanilla_tx = {"to": cc._vanilla[0], "data": cc._vanilla[1]} if cc._vanilla else None
+        return cls(
+            tx=tx,
+            override=override,
+            vanilla_tx=vanilla_tx,
+            allow_fallback=cc.allow_fallback,
+            _compressed=_fragments(tx, override),
+            _vanilla=_fragments(vanilla_tx, None) if vanilla_tx else None,
+        )
+
+    def body(self, block: str | int = "latest", request_id: int = 1) -> bytes:
+        """JSON-RPC request body of the compressed call at `block`."""
+        return _render(self._compressed, block, request_id)
+
+    def vanilla_body(self, block: str | int = "latest", request_id: int = 1) -> bytes | None:
+        """JSON-RPC request body of the uncompressed fallback, if there is one."""
+        return _render(self._vanilla, block, request_id) if self._vanilla else None
+
+    def execute(self, w3: Any, block: str | int = "latest") -> str:
+        """Same semantics as CompressedCall.execute, sending the prepared bytes."""
+        provider = w3.provider
+        tag = _block(block)
+        if self.override is not None:
+            try:
+                res = _send(provider, self._compressed, [self.tx, tag, self.override], tag)
+                if isinstance(res, dict) and "result" in res:
+                    return str(res["result"])
+            except Exception:
+                pass
+
+        if not self.allow_fallback or self.vanilla_tx is None or self._vanilla is None:
+            raise RuntimeError("compressed call failed and fallback disabled")
+
+        res = _send(provider, self._vanilla, [self.vanilla_tx, tag], tag)
+        if isinstance(res, dict) and "result" in res:
+            return str(res["result"])
+        raise RuntimeError(f"fallback eth_call failed: {res}")
+
+
+def _render(fragments: tuple[bytes, bytes], block: str | int, request_id: int) -> bytes:
+    head, tail = fragments
+    return b"".join((head, _json(_block(block)), tail, str(request_id).encode(), b"}"))
+
+
+def _send(provider: Any, fragments: tuple[bytes, bytes], params: list[Any], tag: str) -> Any:
+    if _RAW_POST and isinstance(provider, HTTPProvider):
+        return json.loads(
+            provider._make_request(RPCEndpoint("eth_call"), _render(fragments, tag, 1))
+        )
+    return provider.make_request("eth_call", params)
+
+
+__all__ = ["PreparedCall"]
@@ -0,0 +1,563 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+import http.client
+import itertools
+import json
+import select
+import threading
+import time
+from typing import Any, TypeVar, cast
+from urllib.parse import urlsplit
+
+from requests.exceptions import HTTPError
+from web3._utils.encoding import FriendlyJsonSerde, Web3JsonEncoder
+from web3.providers.base import JSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from .compressor import compress_call_data, merge_override
+from .instrument import Sink, Trace, finish_trace, vanilla_reason
+from .prepared import _block, _json
+from .stream import read_response
+from .transport import CODEC_NS_PER_BYTE, ENCODINGS, available_encodings, encode_body
+
+try:  # web3 >= 7: honours the provider's cache_allowed_requests, like HTTPProvider
+    from web3._utils.caching import handle_request_caching
+except ImportError:  # web3 6 providers do not cache requests
+    _F = TypeVar("_F")
+
+    def handle_request_caching(func: _F) -> _F:  # type: ignore[misc]
+        return func
+
+
+"""
+HTTP JSON-RPC provider that compresses eth_call itself, without the middleware onion.
+
+CompressingHTTPProvider speaks HTTP/1.1 over pooled keep-alive connections (http.client,
+one connection per concurrent request, reused LIFO). eth_call bodies are assembled as bytes
+around the compressed calldata; forwarder overrides that only depend on (codec, target) are
+serialized once per thread and reused. Successful eth_call responses are not JSON-decoded:
+only the `result` string is sliced out. Fallback semantics and `sink=` events (kind
+"provider") match CompressionMiddleware.
+
+With `transport=` request bodies are also sent with a Content-Encoding (ethcompress.transport)
+and, for alg="auto", the encoded plain call competes with the codecs.
+"""
+
+# Codecs whose override code is generated from the calldata and cannot be cached
+_PER_CALL_CODE = frozenset({"jit", "jitcc"})
+_OVERRIDE_CACHE_SIZE = 256
+
+_RESULT = b'"result":'
+_WHITESPACE = b" \t\r\n"
+
+
+def fast_result(raw: bytes) -> str | None:
+    """The `result` of a successful response whose result is a JSON string, else None.
+
+    Hex results cannot contain quotes or escapes, so the string ends at the next quote.
+    """
+    if b'"error"' in raw:
+        return None
+    i = raw.find(_RESULT)
+    if i < 0:
+        return None
+    i += len(_RESULT)
+    while i < len(raw) and raw[i] in _WHITESPACE:
+        i += 1
+    if raw[i : i + 1] != b'"':
+        return None
+    end = raw.find(b'"', i + 1)
+    return raw[i + 1 : end].decode("ascii") if end > 0 else None
+
+
+def _calldata_size(data: Any) -> int:
+    if isinstance(data, str):
+        return len(data) // 2 - 1 if data.startswith("0x") else len(data) // 2
+    return len(data)
+
+
+_T = TypeVar("_T")
+
+
+def _read_all(resp: http.client.HTTPResponse) -> bytes:
+    return resp.read()
+
+
+def _read_stream(resp: http.client.HTTPResponse) -> dict[str, Any] | bytes:
+    # Error bodies are returned raw for the HTTPError message
+    return read_response(resp.read, view=False) if resp.status == 200 else resp.read()
+
+
+# Methods that do not change node or chain state: safe to send again when the connection
+# dropped after the request was written
+_READ_ONLY = (
+    "eth_call",
+    "eth_get",
+    "eth_estimateGas",
+    "eth_simulateV1",
+    "eth_createAccessList",
+    "eth_chainId",
+    "eth_blockNumber",
+    "eth_gasPrice",
+    "eth_maxPriorityFeePerGas",
+    "eth_feeHistory",
+    "eth_blobBaseFee",
+    "eth_syncing",
+    "net_",
+    "web3_",
+)
+
+
+def _missing(request_id: int) -> dict[str, Any]:
+    """Error for a batch entry the server sent no response for."""
+    error = {"code": -32603, "message": "missing response"}
+    return {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+
+def _read_only(*methods: str) -> bool:
+    return all(m.startswith(_READ_ONLY) for m in methods)
+
+
+def _dropped(conn: http.client.HTTPConnection) -> bool:
+    """Whether the server closed an idle connection, as urllib3 checks before reuse.
+
+    An idle keep-alive socket has nothing to read; readable means EOF (or stray bytes),
+    either way the next request on it would fail or be misread. A connection without a
+    socket reconnects by itself on the next request.
+    """
+    sock = conn.sock
+    if sock is None:
+        return False
+    try:
+        if hasattr(select, "poll"):
+            poller = select.poll()
+            poller.register(sock, select.POLLIN)
+            return bool(poller.poll(0))
+        return bool(select.select([sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+# eth_call body parts: target, compressed calldata, block, serialized override (may be empty)
+_Fields = tuple[str, str, Any, bytes]
+
+
+class _Pool:
+    """Idle keep-alive connections to one origin; a request takes one or opens a new one."""
+
+    def __init__(self, url: str, size: int, timeout: float) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme: {url}")
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname or "localhost"
+        self._port = parts.port
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.size = size
+        self.timeout = timeout
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        return cls(self._host, self._port, timeout=self.timeout)
+
+    def _acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect(), False
+            if not _dropped(conn):
+                return conn, True
+            conn.close()
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def post(
+        self,
+        body: bytes,
+        headers: dict[str, str],
+        read: Callable[[http.client.HTTPResponse], _T],
+        *,
+        replay: bool = False,
+    ) -> tuple[int, _T]:
+        """Sends body and returns (status, read(response)); read must consume the response.
+
+        Idle connections the server already closed are discarded before use. When a reused
+        connection drops anyway (the close raced the request), the request is sent again on
+        another one if it was not written yet, or if replay is set (read-only methods): a
+        dropped eth_sendRawTransaction may still have been received.
+        """
+        while True:
+            conn, reused = self._acquire()
+            written = False
+            try:
+                conn.request("POST", self.path, body, headers)
+                written = True
+                resp = conn.getresponse()
+                raw = read(resp)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                # Retry, ending on a fresh connection
+                if reused and (replay or not written):
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return resp.status, raw
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class CompressingHTTPProvider(JSONBaseProvider):
+    """web3 provider posting JSON-RPC over pooled HTTP connections, compressing eth_call.
+
+    `Web3(CompressingHTTPProvider(url))` replaces HTTPProvider + CompressionMiddleware; the
+    compression options are the middleware's. pool_size caps the idle connections kept per
+    provider (concurrent requests beyond it open extra connections). Batch requests
+    (`w3.batch_requests()`) compress every eth_call in the batch and retry failed ones
+    uncompressed in a second batch.
+
+    transport: None (off), "gzip" / "deflate" / "zstd" (trusted to be accepted), or "auto"
+    (the endpoint is probed once per encoding, see accepted_encodings). Bodies of at least
+    min_size bytes are then encoded. alg may also name an encoding, to use transport
+    compression instead of the codecs; otherwise alg="auto" weighs the two (bandwidth_kbps
+    prices the wire bytes against CPU time, see _plan_transport).
+
+    stream_results=True reads eth_call responses incrementally (ethcompress.stream): the
+    result comes back as bytes instead of a hex str.
+    """
+
+    def __init__(
+        self,
+        endpoint_uri: str,
+        *,
+        alg: str = "auto",
+        min_size: int = 800,
+        allow_fallback: bool = True,
+        level: int = 1,
+        sink: Sink | None = None,
+        stream_results: bool = False,
+        transport: str | None = None,
+        transport_level: int = 6,
+        bandwidth_kbps: float = 10_000,
+        pool_size: int = 8,
+        timeout: float = 30.0,
+        headers: dict[str, str] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        if alg in ENCODINGS:
+            transport = transport or alg
+        if transport not in (None, "auto", *ENCODINGS):
+            raise ValueError(f"unknown transport encoding: {transport}")
+        self.endpoint_uri = endpoint_uri
+        self.alg = alg
+        self.min_size = min_size
+        self.allow_fallback = allow_fallback
+        self.level = level
+        self.sink = sink
+        self.stream_results = stream_results
+        self.transport = transport
+        self.transport_level = transport_level
+        self.bandwidth_kbps = bandwidth_kbps
+        self.headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "ethcompress/CompressingHTTPProvider",
+            **(headers or {}),
+        }
+        self._pool = _Pool(endpoint_uri, pool_size, timeout)
+        self._ids = itertools.count(1)
+        self._id_lock = threading.Lock()
+        self._local = threading.local()
+        self._accepted: tuple[str, ...] | None = None
+        self._probe_lock = threading.Lock()
+        # Running estimate of codec CPU time, updated after every codec run
+        self._codec_ns_per_byte = float(CODEC_NS_PER_BYTE)
+
+    def __str__(self) -> str:
+        return f"CompressingHTTPProvider({self.endpoint_uri})"
+
+    def close(self) -> None:
+        """Closes the idle pooled connections."""
+        self._pool.close()
+
+    def _next_id(self) -> int:
+        with self._id_lock:
+            return next(self._ids)
+
+    def _headers(self, encoding: str | None) -> dict[str, str]:
+        return {**self.headers, "Content-Encoding": encoding} if encoding else self.headers
+
+    def _post(self, body: bytes, encoding: str | None = None, *, replay: bool = False) -> bytes:
+        status, raw = self._pool.post(body, self._headers(encoding), _read_all, replay=replay)
+        if status != 200:
+            raise self._http_error(status, raw)
+        return raw
+
+    def _http_error(self, status: int, raw: bytes) -> HTTPError:
+        return HTTPError(f"{status} error for url: {self.endpoint_uri}: {raw[:200]!r}")
+
+    def _eth_call(self, body: bytes, encoding: str | None, request_id: int) -> dict[str, Any]:
+        """eth_call response; the result is sliced out, or streamed into bytes, not decoded."""
+        if self.stream_results:
+            status, res = self._pool.post(body, self._headers(encoding), _read_stream, replay=True)
+            if isinstance(res, bytes):
+                raise self._http_error(status, res)
+            return res
+        raw = self._post(body, encoding, replay=True)
+        result = fast_result(raw)
+        if result is not None:
+            return {"jsonrpc": "2.0", "id": request_id, "result": result}
+        return dict(self.decode_rpc_response(raw))
+
+    def accepted_encodings(self) -> tuple[str, ...]:
+        """Content encodings the endpoint inflates, probed once with web3_clientVersion."""
+        if self._accepted is None:
+            with self._probe_lock:
+                if self._accepted is None:
+                    self._accepted = tuple(e for e in available_encodings() if self._accepts(e))
+        return self._accepted
+
+    def _accepts(self, encoding: str) -> bool:
+        body = self._encode("web3_clientVersion", [], self._next_id())
+        status, raw = self._pool.post(
+            encode_body(body, encoding), self._headers(encoding), _read_all, replay=True
+        )
+        if status != 200:
+            return False
+        try:
+            res = json.loads(raw)
+        except ValueError:
+            return False
+        # A server ignoring the header cannot parse the body (-32700) or the request (-32600)
+        error = res.get("error") if isinstance(res, dict) else None
+        return not (isinstance(error, dict) and error.get("code") in (-32700, -32600))
+
+    def content_encoding(self) -> str | None:
+        """Encoding applied to request bodies, None when transport compression is off."""
+        if self.transport != "auto":
+            return self.transport
+        accepted = self.accepted_encodings()
+        return accepted[0] if accepted else None
+
+    def _wire(self, body: bytes) -> tuple[bytes, str | None]:
+        encoding = self.content_encoding()
+        if encoding is None or len(body) < self.min_size:
+            return body, None
+        return encode_body(body, encoding, self.transport_level), encoding
+
+    def _override_json(self, algo: str, target: str, override: dict[str, Any]) -> bytes:
+        if algo in _PER_CALL_CODE:
+            return _json(override)
+        # Per thread, so lookups never contend; bounded by clearing when full
+        cache: dict[tuple[str, str], bytes] | None = getattr(self._local, "overrides", None)
+        if cache is None:
+            cache = self._local.overrides = {}
+        key = (algo, target.lower())
+        encoded = cache.get(key)
+        if encoded is None:
+            if len(cache) >= _OVERRIDE_CACHE_SIZE:
+                cache.clear()
+            encoded = cache[key] = _json(override)
+        return encoded
+
+    def _compressed_body(self, fields: _Fields, request_id: int) -> bytes:
+        to, data, block, override = fields
+        return b"".join(
+            (
+                b'{"jsonrpc":"2.0","method":"eth_call","params":[{"to":',
+                _json(to),
+                b',"data":"',
+                data.encode("ascii"),
+                b'"},',
+                _json(_block(block)),
+                b"," if override else b"",
+                override,
+                b'],"id":',
+                str(request_id).encode(),
+                b"}",
+            )
+        )
+
+    def encode_rpc_request(self, method: RPCEndpoint, params: Any) -> bytes:
+        return self._encode(method, params, self._next_id())
+
+    def _encode(self, method: str, params: Any, request_id: int) -> bytes:
+        rpc = {"jsonrpc": "2.0", "method": method, "params": params or [], "id": request_id}
+        return FriendlyJsonSerde().json_encode(rpc, Web3JsonEncoder).encode()
+
+    def _plan(
+        self, params: Any, trace: Trace | None
+    ) -> tuple[str | None, dict[str, Any] | None, _Fields | None]:
+        """Compresses an eth_call: (fallback reason, meta, body fields or None)."""
+        tx = params[0] if params and isinstance(params[0], dict) else {}
+        to, data_hex = tx.get("to"), tx.get("data")
+        if not to or not data_hex:
+            return "no_params", None, None
+        if self.alg in ENCODINGS:
+            return "no_transport", None, None
+        try:
+            new_to, new_data, override, meta = compress_call_data(
+                data_hex,
+                to,
+                alg=self.alg,
+                min_size=self.min_size,
+                level=self.level,
+                sink=self.sink,
+            )
+        except Exception:
+            if trace is not None:
+                trace.mark("compress")
+            return "error", None, None
+        if trace is not None:
+            trace.mark("compress")
+        if meta.get("algo") == "vanilla":
+            return vanilla_reason(meta, self.min_size), meta, None
+
+        block = params[1] if len(params) >= 2 else "latest"
+        existing = params[2] if len(params) >= 3 else None
+        if existing:
+            encoded = _json(merge_override(override, existing))
+        elif override:
+            encoded = self._override_json(meta["algo"], to, override)
+        else:
+            encoded = b""
+        return None, meta, (new_to, new_data, block, encoded)
+
+    def _plan_transport(
+        self, params: Any, encoding: str, request_id: int, trace: Trace | None
+    ) -> tuple[str | None, dict[str, Any] | None, bytes | None, bool]:
+        """Picks between the encoded plain call and a codec (also encoded):
+        (fallback reason, meta, wire body or None, whether a codec was used).
+
+        Estimated cost is CPU time plus wire bytes at bandwidth_kbps. The codec only runs
+        when its expected CPU time alone is below the cost of the encoded plain call; then
+        the smaller wire body wins, the plain call on ties since it needs no gas.
+        """
+        tx = params[0] if params and isinstance(params[0], dict) else {}
+        data_hex = tx.get("data")
+        if not tx.get("to") or not data_hex:
+            return "no_params", None, None, False
+        size = _calldata_size(data_hex)
+        if size < self.min_size:
+            return "below_min_size", None, None, False
+
+        t0 = time.perf_counter_ns()
+        body = encode_body(
+            self._encode("eth_call", params, request_id), encoding, self.transport_level
+        )
+        cost = time.perf_counter_ns() - t0 + len(body) * 8e6 / self.bandwidth_kbps
+        meta = {"algo": encoding, "sizes": {"original": size, "compressed": len(body), "code": 0}}
+        if self.alg != "auto" or self._codec_ns_per_byte * size >= cost:
+            return None, meta, body, False
+
+        t0 = time.perf_counter_ns()
+        _, codec_meta, fields = self._plan(params, trace)
+        ns_per_byte = (time.perf_counter_ns() - t0) / size
+        self._codec_ns_per_byte += 0.25 * (ns_per_byte - self._codec_ns_per_byte)
+        if fields is not None:
+            raw = self._compressed_body(fields, request_id)
+            codec_body = encode_body(raw, encoding, self.transport_level)
+            if len(codec_body) < len(body):
+                return None, codec_meta, codec_body, True
+        return None, meta, body, False
+
+    def _send(self, method: str, params: Any) -> dict[str, Any]:
+        request_id = self._next_id()
+        body, encoding = self._wire(self._encode(method, params, request_id))
+        if method == "eth_call":
+            return self._eth_call(body, encoding, request_id)
+        return dict(self.decode_rpc_response(self._post(body, encoding, replay=_read_only(method))))
+
+    @handle_request_caching
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        return cast(RPCResponse, self._call(method, params))
+
+    def _call(self, method: str, params: Any) -> dict[str, Any]:
+        if method != "eth_call":
+            return self._send(method, params)
+
+        tx = params[0] if params and isinstance(params[0], dict) else {}
+        trace = Trace("provider", self.sink, tx.get("to")) if self.sink is not None else None
+        request_id = self._next_id()
+        encoding = self.content_encoding()
+        if encoding is not None and self.alg in ("auto", *ENCODINGS):
+            reason, meta, body, compressed = self._plan_transport(
+                params, encoding, request_id, trace
+            )
+            if trace is not None:
+                trace.mark("compress")
+        else:
+            reason, meta, fields = self._plan(params, trace)
+            body, compressed = None, fields is not None
+            if fields is not None:
+                body, encoding = self._wire(self._compressed_body(fields, request_id))
+        if body is None:
+            return finish_trace(trace, "rpc", self._send(method, params), reason, meta)
+
+        res = self._eth_call(body, encoding, request_id)
+        # A failed plain call (transport encoding only) is the call's own error
+        if "result" in res or not compressed:
+            return finish_trace(trace, "rpc", res, None, meta)
+        if trace is not None:
+            trace.mark("rpc")
+
+        if self.allow_fallback:
+            res = self._send(method, params)
+            return finish_trace(trace, "fallback_rpc", res, "rpc_error", meta)
+        return finish_trace(trace, "rpc", res, "disabled", meta)
+
+    def make_batch_request(
+        self, requests: list[tuple[RPCEndpoint, Any]]
+    ) -> list[RPCResponse] | RPCResponse:
+        ids = [self._next_id() for _ in requests]
+        bodies: list[bytes] = []
+        compressed: list[int] = []
+        for i, (method, params) in enumerate(requests):
+            fields = self._plan(params, None)[2] if method == "eth_call" else None
+            if fields is None:
+                bodies.append(self._encode(method, params, ids[i]))
+            else:
+                bodies.append(self._compressed_body(fields, ids[i]))
+                compressed.append(i)
+
+        replay = _read_only(*(method for method, _ in requests))
+        responses = self._post_batch(bodies, replay)
+        if not isinstance(responses, list):
+            # A whole-batch error comes back as a single response
+            return cast(RPCResponse, responses)
+        by_id = {r.get("id"): r for r in responses if isinstance(r, dict)}
+        out = [by_id.get(request_id) or _missing(request_id) for request_id in ids]
+
+        failed = [i for i in compressed if "result" not in out[i]]
+        if failed and self.allow_fallback:
+            retried = self._post_batch([self._encode(*requests[i], ids[i]) for i in failed], True)
+            if isinstance(retried, list):
+                again = {r.get("id"): r for r in retried}
+                for i in failed:
+                    out[i] = again.get(ids[i], out[i])
+        return cast(list[RPCResponse], out)
+
+    def _post_batch(self, bodies: list[bytes], replay: bool) -> Any:
+        body, encoding = self._wire(b"[" + b",".join(bodies) + b"]")
+        return self.decode_rpc_response(self._post(body, encoding, replay=replay))
+
+
+__all__ = ["CompressingHTTPProvider", "fast_result"]
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import binascii
+from collections.abc import Callable, Iterable
+import json
+from typing import Any, cast
+
+from eth_typing import URI
+import web3
+from web3 import AsyncHTTPProvider, HTTPProvider
+from web3.types import RPCEndpoint
+
+"""
+Streaming decode of eth_call responses with multi-MB hex results.
+
+Materializing a big `result` costs the raw body, a decoded str of the same size and the bytes
+decoded from it again by the caller. ResultReader is fed the response body in chunks: the
+hex string is decoded into one bytearray as it arrives (binascii, chunk by chunk), and only
+the few bytes around it are kept and JSON-decoded. The result is returned as a read-only
+memoryview of that buffer, or as one bytes copy of it. Responses without a string result
+(errors, other methods) are buffered and decoded as usual.
+
+CompressingHTTPProvider(stream_results=True) reads eth_call responses through it directly;
+CompressionMiddleware(stream_results=True) does so when the provider is web3's HTTPProvider, and
+AsyncCompressionMiddleware(stream_results=True) with AsyncHTTPProvider (aiohttp).
+Both return the result as bytes: web3's formatters and middlewares accept bytes (HexBytes
+takes it as is), while a memoryview would be walked as a sequence.
+"""
+
+# HTTPProvider/AsyncHTTPProvider._request_session_manager (private) posts through the
+# provider's cached session since web3 7; other versions keep their own make_request.
+_SESSION_MANAGER = int(web3.__version__.split(".")[0]) >= 7
+
+# Bytes read from the socket per step
+STREAM_CHUNK = 256 * 1024
+
+_RESULT = b'"result":'
+_HEAD, _HEX, _TAIL, _BUFFER = range(4)
+
+
+class ResultReader:
+    """Incremental parser for one JSON-RPC response body; feed() chunks, then finish()."""
+
+    def __init__(self) -> None:
+        self.head = bytearray()  # everything before the result string (or the whole body)
+        self.tail = bytearray()  # everything after it
+        self.buf = bytearray()  # decoded result bytes
+        self._state = _HEAD
+        self._carry = b""  # hex digits not decoded yet: an odd nibble or a split "0x"
+        self._prefixed = False
+
+    def feed(self, chunk: bytes) -> None:
+        if self._state == _HEX:
+            self._hex(chunk)
+        elif self._state == _TAIL:
+            self.tail += chunk
+        else:
+            self.head += chunk
+            if self._state == _HEAD:
+                self._find_result()
+
+    def _find_result(self) -> None:
+        head = self.head
+        i = head.find(_RESULT)
+        if i < 0:
+            return
+        j = i + len(_RESULT)
+        while j < len(head) and head[j] in b" \t\r\n":
+            j += 1
+        if j == len(head):
+            return  # the value starts in the next chunk
+        if head[j] != ord('"') or b'"error"' in head[:i]:
+            self._state = _BUFFER
+            return
+        rest = bytes(head[j + 1 :])
+        del head[j:]
+        self._state = _HEX
+        self._hex(rest)
+
+    def _hex(self, data: bytes) -> None:
+        end = data.find(b'"')
+        digits = self._carry + (data if end < 0 else data[:end])
+        if not self._prefixed:
+            if len(digits) < 2 and end < 0:
+                self._carry = digits
+                return
+            if digits[:2] in (b"0x", b"0X"):
+                digits = digits[2:]
+            self._prefixed = True
+        even = len(digits) & ~1
+        self.buf += binascii.unhexlify(digits[:even])
+        self._carry = digits[even:]
+        if end >= 0:
+            if self._carry:
+                raise ValueError("odd-length hex result")
+            self._state = _TAIL
+            self.tail += data[end + 1 :]
+
+    def finish(self, view: bool = True) -> dict[str, Any]:
+        """The response; a string result is a read-only memoryview of the decoded bytes, or
+        bytes with view=False."""
+        if self._state == _HEX:
+            raise ValueError("response ended inside the result")
+        if self._state != _TAIL:
+            return dict(json.loads(self.head))
+        # The envelope with an empty result, to read id and check for errors
+        envelope = dict(json.loads(bytes(self.head) + b'""' + bytes(self.tail)))
+        if envelope.get("result") == "" and "error" not in envelope:
+            envelope["result"] = memoryview(self.buf).toreadonly() if view else bytes(self.buf)
+        return envelope
+
+
+def read_result(chunks: Iterable[bytes], *, view: bool = True) -> dict[str, Any]:
+    """Parses a response body given as chunks, see ResultReader."""
+    reader = ResultReader()
+    for chunk in chunks:
+        reader.feed(chunk)
+    return reader.finish(view)
+
+
+def read_response(
+    read: Callable[[int], bytes], chunk_size: int = STREAM_CHUNK, *, view: bool = True
+) -> dict[str, Any]:
+    """read_result over a file-like read(n), until it returns b""."""
+    return read_result(iter(lambda: read(chunk_size), b""), view=view)
+
+
+def _session_manager(provider: Any, cls: type) -> Any:
+    if not (_SESSION_MANAGER and isinstance(provider, cls)):
+        return None
+    return getattr(provider, "_request_session_manager", None)
+
+
+def stream_eth_call(make_request: Callable[..., Any], provider: Any) -> Callable[..., Any]:
+    """Wraps make_request so eth_call is posted through web3 HTTPProvider's own session
+    (headers, timeout) and its response streamed; other requests, other providers and web3
+    versions without the session manager go through make_request unchanged."""
+    manager = _session_manager(provider, HTTPProvider)
+    if manager is None:
+        return make_request
+
+    def request(method: str, params: Any) -> Any:
+        if method != "eth_call":
+            return make_request(method, params)
+        body = provider.encode_rpc_request(RPCEndpoint(method), params)
+        kwargs = {"timeout": 30, **provider.get_request_kwargs(), "stream": True}
+        uri = cast(URI, provider.endpoint_uri)
+        with manager.get_response_from_post_request(uri, data=body, **kwargs) as response:
+            response.raise_for_status()
+            return read_result(response.iter_content(STREAM_CHUNK), view=False)
+
+    return request
+
+
+def async_stream_eth_call(make_request: Callable[..., Any], provider: Any) -> Callable[..., Any]:
+    """stream_eth_call for AsyncHTTPProvider: the aiohttp response body is fed to a
+    ResultReader as it arrives."""
+    manager = _session_manager(provider, AsyncHTTPProvider)
+    if manager is None:
+        return make_request
+
+    async def request(method: str, params: Any) -> Any:
+        if method != "eth_call":
+            return await make_request(method, params)
+        body = provider.encode_rpc_request(RPCEndpoint(method), params)
+        uri = cast(URI, provider.endpoint_uri)
+        response = await manager.async_get_response_from_post_request(
+            uri, data=body, **provider.get_request_kwargs()
+        )
+        async with response:
+            response.raise_for_status()
+            reader = ResultReader()
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK):
+                reader.feed(chunk)
+            return reader.finish(view=False)
+
+    return request
+
+
+__all__ = [
+    "STREAM_CHUNK",
+    "ResultReader",
+    "async_stream_eth_call",
+    "read_response",
+    "read_result",
+    "stream_eth_call",
+]
@@ -0,0 +1,24 @@
+from .corpus import KINDS, Sample, corpus, generate
+from .provider import (
+    ECHO_ADDRESS,
+    MULTICALL3_ADDRESS,
+    AsyncEVMProvider,
+    CallRecord,
+    EVMProvider,
+)
+from .server import PROFILES, NetworkProfile, RPCServer
+
+__all__ = [
+    "ECHO_ADDRESS",
+    "KINDS",
+    "MULTICALL3_ADDRESS",
+    "PROFILES",
+    "AsyncEVMProvider",
+    "CallRecord",
+    "EVMProvider",
+    "NetworkProfile",
+    "RPCServer",
+    "Sample",
+    "corpus",
+    "generate",
+]
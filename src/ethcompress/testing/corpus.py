@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import random
+
+from eth_abi import encode
+
+"""
+Deterministic, seeded calldata corpus with the shapes seen in production eth_call traffic.
+
+Every generator takes a random.Random and a target size in bytes and returns raw calldata.
+Fixed-shape calls (transfers, swaps, permits) reach larger sizes the way clients batch them:
+through Multicall3.aggregate3. The same (kind, size, seed) always yields the same bytes.
+"""
+
+MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# ERC-20 view selectors used by tests/integration
+SYMBOL = bytes.fromhex("95d89b41")
+NAME = bytes.fromhex("06fdde03")
+DECIMALS = bytes.fromhex("313ce567")
+BALANCE_OF = bytes.fromhex("70a08231")
+
+AGGREGATE = bytes.fromhex("252dba42")  # aggregate((address,bytes)[])
+AGGREGATE3 = bytes.fromhex("82ad56cb")  # aggregate3((address,bool,bytes)[])
+TRANSFER = bytes.fromhex("a9059cbb")  # transfer(address,uint256)
+SWAP_EXACT_TOKENS = bytes.fromhex(
+    "38ed1739"
+)  # swapExactTokensForTokens(uint256,uint256,address[],address,uint256)
+PERMIT = bytes.fromhex("d505accf")  # permit(address,address,uint256,uint256,uint8,bytes32,bytes32)
+CLAIM = bytes.fromhex("2e7ba6ef")  # claim(uint256,address,uint256,bytes32[])
+MULTICALL_BYTES = bytes.fromhex("ac9650d8")  # multicall(bytes[])
+
+KINDS = ("aggregate", "aggregate3", "transfer", "swap", "permit", "merkle", "blobs")
+
+# Size of the seeded token universe; targets are drawn with a Zipf-like skew toward popular tokens
+TOKEN_POOL = 256
+
+
+@dataclass(frozen=True)
+class Sample:
+    kind: str
+    to: str
+    data: str
+
+
+def _address(rng: random.Random) -> str:
+    return "0x" + rng.randbytes(20).hex()
+
+
+def _tokens(seed: int) -> list[str]:
+    rng = random.Random(f"tokens:{seed}")
+    return [_address(rng) for _ in range(TOKEN_POOL)]
+
+
+def _token(rng: random.Random, tokens: list[str]) -> str:
+    return rng.choices(tokens, weights=[1 / (i + 1) for i in range(len(tokens))])[0]
+
+
+def _amount(rng: random.Random) -> int:
+    # Round human amounts in 18 or 6 decimals, or arbitrary on-chain balances
+    r = rng.random()
+    if r < 0.4:
+        return rng.randrange(1, 10_000) * 10 ** rng.choice((18, 6))
+    if r < 0.5:
+        return (1 << 256) - 1  # max approval
+    return rng.randrange(1, 10 ** rng.randrange(6, 27))
+
+
+def _view_call(rng: random.Random, owner: str) -> bytes:
+    sel = rng.choice((SYMBOL, NAME, DECIMALS, BALANCE_OF, BALANCE_OF))
+    return sel + encode(["address"], [owner]) if sel == BALANCE_OF else sel
+
+
+def _aggregate3(calls: list[tuple[str, bytes]], rng: random.Random) -> bytes:
+    args = [(to, rng.random() < 0.5, data) for to, data in calls]
+    return AGGREGATE3 + encode(["(address,bool,bytes)[]"], [args])
+
+
+def _batched(
+    rng: random.Random, size: int, tokens: list[str], make: Callable[[], tuple[str, bytes]]
+) -> bytes:
+    """One call if it already reaches size, else an aggregate3 batch of calls."""
+    to, data = make()
+    if len(data) >= size:
+        return data
+    calls = [(to, data)]
+    total = len(data) + 160
+    while total < size:
+        to, data = make()
+        calls.append((to, data))
+        total += len(data) + 160 + (-len(data) % 32)
+    return _aggregate3(calls, rng)
+
+
+def aggregate(rng: random.Random, size: int, tokens: list[str]) -> bytes:
+    """Multicall3.aggregate of ERC-20 views (symbol/name/decimals/balanceOf) over N targets."""
+    owner = _address(rng)
+    calls = [(_token(rng, tokens), _view_call(rng, owner))]
+    while 32 * 6 * len(calls) < size:
+        calls.append((_token(rng, tokens), _view_call(rng, owner)))
+    return AGGREGATE + encode(["(address,bytes)[]"], [calls])
+
+
+def aggregate3(rng: random.Random, size: int, tokens: list[str]) -> bytes:
+    """Multicall3.aggregate3 of ERC-20 views with per-call allowFailure flags."""
+    owner = _address(rng)
+    return _batched(rng, size, tokens, lambda: (_token(rng, tokens), _view_call(rng, owner)))
+
+
+def transfer(rng: random.Random, size: int, tokens: list[str]) -> bytes:
+    """ERC-20 transfer(to, amount), batched for sizes above one call."""
+    return _batched(
+        rng,
+        size,
+        tokens,
+        lambda: (
+            _token(rng, tokens),
+            TRANSFER + encode(["address", "uint256"], [_address(rng), _amount(rng)]),
+        ),
+    )
+
+
+def swap(rng: random.Random, size: int, tokens: list[str]) -> bytes:
+    """UniswapV2-style swapExactTokensForTokens over a 2-5 token path."""
+    router = _address(rng)
+    recipient = _address(rng)
+    deadline = 1_700_000_000 + rng.randrange(10**7)
+
+    def make() -> tuple[str, bytes]:
+        path = [_token(rng, tokens) for _ in range(rng.randint(2, 5))]
+        args = [_amount(rng), _amount(rng) // 100 * 99, path, recipient, deadline]
+        return router, SWAP_EXACT_TOKENS + encode(
+            ["uint256", "uint256", "address[]", "address", "uint256"], args
+        )
+
+    return _batched(rng, size, tokens, make)
+
+
+def permit(rng: random.Random, size: int, tokens: list[str]) -> bytes:
+    """ERC-2612 permit with a v/r/s signature."""
+    owner = _address(rng)
+
+    def make() -> tuple[str, bytes]:
+        args = [
+            owner,
+            _address(rng),
+            _amount(rng),
+            1_700_000_000 + rng.randrange(10**7),
+            rng.choice((27, 28)),
+            rng.randbytes(32),
+            rng.randbytes(32),
+        ]
+        types = ["address", "address", "uint256", "uint256", "uint8", "bytes32", "bytes32"]
+        return _token(rng, tokens), PERMIT + encode(types, args)
+
+    return _batched(rng, size, tokens, make)
+
+
+def merkle(rng: random.Random, size: int, tokens: list[str]) -> bytes:
+    """Merkle airdrop claim(index, account, amount, proof) with a proof deep enough for size."""
+    depth = max(1, (size - 196) // 32)
+    proof = [rng.randbytes(32) for _ in range(depth)]
+    args = [rng.randrange(1 << 20), _address(rng), _amount(rng), proof]
+    return CLAIM + encode(["uint256", "address", "uint256", "bytes32[]"], args)
+
+
+def blobs(rng: random.Random, size: int, tokens: list[str]) -> bytes:
+    """multicall(bytes[]) of opaque blobs (random bytes with zero padded tails)."""
+    items: list[bytes] = []
+    total = 68
+    while total < size:
+        n = rng.randint(64, 2048)
+        items.append(rng.randbytes(n))
+        total += 64 + n + (-n % 32)
+    return MULTICALL_BYTES + encode(["bytes[]"], [items])
+
+
+GENERATORS = {
+    "aggregate": aggregate,
+    "aggregate3": aggregate3,
+    "transfer": transfer,
+    "swap": swap,
+    "permit": permit,
+    "merkle": merkle,
+    "blobs": blobs,
+}
+
+
+def generate(kind: str, size: int = 4096, seed: int = 0) -> str:
+    """Returns 0x-hex calldata of the given kind, about `size` bytes long (never less than one call)."""
+    try:
+        gen = GENERATORS[kind]
+    except KeyError:
+        raise ValueError(f"unknown corpus kind: {kind}") from None
+    rng = random.Random(f"{kind}:{size}:{seed}")
+    return "0x" + gen(rng, size, _tokens(seed)).hex()
+
+
+def corpus(
+    count: int = 64,
+    *,
+    seed: int = 0,
+    kinds: tuple[str, ...] = KINDS,
+    min_size: int = 256,
+    max_size: int = 16384,
+) -> list[Sample]:
+    """A mixed corpus of `count` samples, kinds in round robin and sizes log-uniform in range."""
+    rng = random.Random(f"corpus:{seed}")
+    tokens = _tokens(seed)
+    samples: list[Sample] = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        size = int(min_size * (max_size / min_size) ** rng.random())
+        data = GENERATORS[kind](rng, size, tokens)
+        to = MULTICALL3 if data[:4] in (AGGREGATE, AGGREGATE3) else _token(rng, tokens)
+        samples.append(Sample(kind=kind, to=to, data="0x" + data.hex()))
+    return samples
+
+
+__all__ = ["KINDS", "MULTICALL3", "Sample", "corpus", "generate"]
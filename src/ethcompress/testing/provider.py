@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import itertools
+import threading
+from typing import Any
+
+from eth_typing import Address
+from web3.providers.async_base import AsyncBaseProvider
+from web3.providers.base import BaseProvider
+
+from compressions.utils import hex_to_bytes as _hex_to_bytes
+
+"""
+In-process Web3 providers backed by py-evm, for offline end to end tests and benchmarks.
+
+eth_call runs real EVM code on one warmed chain: the VM and its state are created once,
+preloaded contracts stay installed, and the third eth_call parameter (state override,
+per address {"code": ...}) is applied inside a snapshot that is reverted after the call.
+eth_simulateV1 runs its blocks of calls the same way, inside one snapshot. Gas used by
+every call is recorded on the provider.
+
+py-evm is a test dependency and is only imported when a provider is created.
+"""
+
+ECHO_ADDRESS = "0x" + "11" * 20
+# Returns its calldata
+ECHO_CODE = "0x365f5f37365ff3"
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+# Minimal Multicall3 with only aggregate((address,bytes)[]) returns (uint256, bytes[]);
+# reverts with the callee's revert data when a call fails, like Multicall3.
+MULTICALL3_CODE = "0x5f3560e01c63252dba42146011575f80fd5b435f52604060205260043560040180358060405290602001908060051b6060015f5b82811015609a57838160051b01358401806020013581018035808260200186602001375f5f82876020015f87355af115609e575050503d606083038260051b60600152808352805f846020013e5f81840160200152603f01601f1916820191506001016033565b505ff35b3d5f803e3d5ffd"
+
+DEFAULT_CONTRACTS = {ECHO_ADDRESS: ECHO_CODE, MULTICALL3_ADDRESS: MULTICALL3_CODE}
+
+SENDER = Address(b"\xaa" * 20)
+CALL_GAS = 100_000_000
+
+
+@dataclass
+class CallRecord:
+    to: str
+    data_bytes: int
+    override: bool
+    gas_used: int
+    success: bool
+
+
+def _raw(value: str | bytes) -> bytes:
+    return bytes(value) if isinstance(value, (bytes, bytearray)) else _hex_to_bytes(value)
+
+
+def _address(addr: str | bytes) -> Address:
+    b = _raw(addr)
+    if len(b) != 20:
+        raise ValueError(f"invalid address: {addr!r}")
+    return Address(b)
+
+
+_BLOCK_TAGS = frozenset({"latest", "earliest", "pending", "safe", "finalized"})
+
+
+def _check_block(params: Any, i: int) -> None:
+    """Validates the block parameter like a node would (the state is the same at every block):
+    a tag, a hex quantity or an EIP-1898 object, never a bare JSON number."""
+    if len(params) <= i or isinstance(params[i], dict):
+        return
+    block = params[i]
+    if not isinstance(block, str) or not (block in _BLOCK_TAGS or _is_quantity(block)):
+        raise ValueError(f"invalid block: {block!r}")
+
+
+def _is_quantity(value: str) -> bool:
+    try:
+        return value.startswith("0x") and int(value, 16) >= 0
+    except ValueError:
+        return False
+
+
+def _chain() -> Any:
+    try:
+        from eth import constants
+        from eth.chains.base import MiningChain
+        from eth.db.atomic import AtomicDB
+        from eth.vm.forks.prague import PragueVM
+    except ImportError as e:  # pragma: no cover - depends on the environment
+        raise ImportError("EVMProvider requires py-evm: pip install py-evm") from e
+
+    chain_class = MiningChain.configure(
+        __name__="EVMProviderChain", vm_configuration=((0, PragueVM),)
+    )
+    return chain_class.from_genesis(
+        AtomicDB(),
+        {
+            "difficulty": 0,
+            "gas_limit": constants.GENESIS_GAS_LIMIT,
+            "timestamp": 0,
+            "coinbase": constants.ZERO_ADDRESS,
+            "extra_data": constants.GENESIS_EXTRA_DATA,
+            "nonce": b"\x00" * 8,
+        },
+    )
+
+
+class _EVMBackend:
+    """Shared execution core of the sync and async providers."""
+
+    def __init__(self, contracts: dict[str, str] | None, chain_id: int, gas: int) -> None:
+        from eth.vm.message import Message
+        from eth.vm.transaction_context import BaseTransactionContext
+
+        self._message_class = Message
+        self._context = BaseTransactionContext(origin=SENDER, gas_price=1)
+        self._vm = _chain().get_vm()
+        self._vm.state.set_balance(SENDER, 10**18)
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self.chain_id = chain_id
+        self.gas = gas
+        self.calls: list[CallRecord] = []
+        for addr, code in (DEFAULT_CONTRACTS if contracts is None else contracts).items():
+            self.set_code(addr, code)
+
+    def set_code(self, address: str, code: str | bytes) -> None:
+        """Installs code permanently (unlike a per-call state override)."""
+        with self._lock:
+            self._vm.state.set_code(_address(address), _raw(code))
+
+    @property
+    def gas_used(self) -> list[int]:
+        return [c.gas_used for c in self.calls]
+
+    def _run(self, state: Any, tx: dict[str, Any]) -> tuple[bool, bytes, int]:
+        to = _address(tx["to"])
+        data = _raw(tx.get("data") or tx.get("input") or b"")
+        sender = _address(tx["from"]) if tx.get("from") else SENDER
+        gas = int(tx["gas"], 16) if isinstance(tx.get("gas"), str) else tx.get("gas") or self.gas
+        message = self._message_class(
+            to=to, sender=sender, value=0, data=data, code=state.get_code(to), gas=gas
+        )
+        computation = state.computation_class.apply_computation(state, message, self._context)
+        ok = not computation.is_error
+        out = bytes(computation.output) if ok or computation.output else b""
+        return ok, out, computation.get_gas_used()
+
+    def _override(self, state: Any, override: dict[str, dict[str, Any]] | None) -> None:
+        for addr, fields in (override or {}).items():
+            if "code" in fields:
+                state.set_code(_address(addr), _raw(fields["code"]))
+
+    def call(
+        self, tx: dict[str, Any], override: dict[str, dict[str, Any]] | None = None
+    ) -> tuple[bool, bytes, int]:
+        """Executes an eth_call; returns (success, output or revert data, gas used)."""
+        with self._lock:
+            state = self._vm.state
+            snapshot = state.snapshot()
+            try:
+                self._override(state, override)
+                ok, out, gas_used = self._run(state, tx)
+            finally:
+                state.revert(snapshot)
+            data_bytes = len(_raw(tx.get("data") or tx.get("input") or b""))
+            self.calls.append(
+                CallRecord(
+                    "0x" + _address(tx["to"]).hex(), data_bytes, bool(override), gas_used, ok
+                )
+            )
+        return ok, out, gas_used
+
+    def simulate(self, payload: dict[str, Any]) -> list[dict[str, Any]]:
+        """Executes eth_simulateV1 blockStateCalls on top of the current state: each block's
+        stateOverrides (code only) and calls apply in order and persist until the end of the
+        simulation, then everything is reverted. Block overrides and logs are not modelled."""
+        blocks = []
+        with self._lock:
+            state = self._vm.state
+            snapshot = state.snapshot()
+            number = self._vm.get_header().block_number
+            try:
+                for i, block in enumerate(payload["blockStateCalls"]):
+                    override = block.get("stateOverrides")
+                    self._override(state, override)
+                    calls, total = [], 0
+                    for tx in block.get("calls", []):
+                        ok, out, gas_used = self._run(state, tx)
+                        data_bytes = len(_raw(tx.get("data") or tx.get("input") or b""))
+                        to = "0x" + _address(tx["to"]).hex()
+                        self.calls.append(CallRecord(to, data_bytes, bool(override), gas_used, ok))
+                        result: dict[str, Any] = {
+                            "returnData": "0x" + out.hex(),
+                            "logs": [],
+                            "gasUsed": hex(gas_used),
+                            "status": "0x1" if ok else "0x0",
+                        }
+                        if not ok:
+                            result["error"] = {"code": 3, "message": "execution reverted"}
+                        calls.append(result)
+                        total += gas_used
+                    blocks.append(
+                        {
+                            "number": hex(number + 1 + i),
+                            "hash": "0x" + (number + 1 + i).to_bytes(32, "big").hex(),
+                            "timestamp": hex(number + 1 + i),
+                            "gasLimit": hex(self.gas),
+                            "gasUsed": hex(total),
+                            "calls": calls,
+                        }
+                    )
+            finally:
+                state.revert(snapshot)
+        return blocks
+
+    def handle(self, method: str, params: Any) -> dict[str, Any]:
+        with self._lock:
+            request_id = next(self._ids)
+        response: dict[str, Any] = {"jsonrpc": "2.0", "id": request_id}
+        if method == "eth_call":
+            tx = params[0]
+            override = params[2] if len(params) >= 3 else None
+            try:
+                _check_block(params, 1)
+                ok, out, _ = self.call(tx, override)
+            except (KeyError, ValueError) as e:
+                response["error"] = {"code": -32602, "message": f"invalid params: {e}"}
+                return response
+            if ok:
+                response["result"] = "0x" + out.hex()
+            else:
+                response["error"] = {
+                    "code": 3,
+                    "message": "execution reverted",
+                    "data": "0x" + out.hex(),
+                }
+        elif method == "eth_simulateV1":
+            try:
+                _check_block(params, 1)
+                response["result"] = self.simulate(params[0])
+            except (KeyError, ValueError, TypeError) as e:
+                response["error"] = {"code": -32602, "message": f"invalid params: {e}"}
+        elif method == "eth_chainId":
+            response["result"] = hex(self.chain_id)
+        elif method == "net_version":
+            response["result"] = str(self.chain_id)
+        elif method == "eth_blockNumber":
+            response["result"] = hex(self._vm.get_header().block_number)
+        elif method == "eth_getCode":
+            with self._lock:
+                response["result"] = "0x" + self._vm.state.get_code(_address(params[0])).hex()
+        elif method == "web3_clientVersion":
+            response["result"] = "ethcompress/EVMProvider"
+        else:
+            response["error"] = {"code": -32601, "message": f"method not supported: {method}"}
+        return response
+
+
+class EVMProvider(BaseProvider):
+    """Web3 provider executing eth_call on an in-process py-evm chain.
+
+    contracts maps address -> code to preload (defaults to an echo contract and a minimal
+    Multicall3). Gas used per call is kept in `calls` / `gas_used`.
+    """
+
+    def __init__(
+        self,
+        contracts: dict[str, str] | None = None,
+        *,
+        chain_id: int = 1,
+        gas: int = CALL_GAS,
+    ) -> None:
+        super().__init__()
+        self.backend = _EVMBackend(contracts, chain_id, gas)
+
+    @property
+    def calls(self) -> list[CallRecord]:
+        return self.backend.calls
+
+    @property
+    def gas_used(self) -> list[int]:
+        return self.backend.gas_used
+
+    def set_code(self, address: str, code: str | bytes) -> None:
+        self.backend.set_code(address, code)
+
+    def make_request(self, method: Any, params: Any) -> Any:
+        return self.backend.handle(str(method), params)
+
+    def make_batch_request(self, requests: Any) -> Any:
+        return [self.backend.handle(str(method), params) for method, params in requests]
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+
+class AsyncEVMProvider(AsyncBaseProvider):
+    """Async variant of EVMProvider; calls execute inline on the event loop thread."""
+
+    def __init__(
+        self,
+        contracts: dict[str, str] | None = None,
+        *,
+        chain_id: int = 1,
+        gas: int = CALL_GAS,
+    ) -> None:
+        super().__init__()
+        self.backend = _EVMBackend(contracts, chain_id, gas)
+
+    @property
+    def calls(self) -> list[CallRecord]:
+        return self.backend.calls
+
+    @property
+    def gas_used(self) -> list[int]:
+        return self.backend.gas_used
+
+    def set_code(self, address: str, code: str | bytes) -> None:
+        self.backend.set_code(address, code)
+
+    async def make_request(self, method: Any, params: Any) -> Any:
+        return self.backend.handle(str(method), params)
+
+    async def make_batch_request(self, requests: Any) -> Any:
+        return [self.backend.handle(str(method), params) for method, params in requests]
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+
+__all__ = [
+    "DEFAULT_CONTRACTS",
+    "ECHO_ADDRESS",
+    "ECHO_CODE",
+    "MULTICALL3_ADDRESS",
+    "MULTICALL3_CODE",
+    "AsyncEVMProvider",
+    "CallRecord",
+    "EVMProvider",
+]
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import threading
+import time
+from typing import Any
+import zlib
+
+from ..transport import decode_body
+from .provider import EVMProvider
+
+"""
+Local HTTP JSON-RPC stand-in backed by EVMProvider, with network shaping.
+
+Compression only pays off through fewer bytes on the wire, which an in-memory provider
+cannot show. This server sits behind a real web3 HTTPProvider and delays every exchange
+by the profile's round trip time (plus jitter) and by the time the request and response
+bodies take at the configured up/down bandwidth. Requests above max_request_bytes are
+rejected with HTTP 413, as node gateways do. Compressed request bodies (Content-Encoding)
+are only inflated for the encodings in accept_encodings; others get HTTP 415. Malformed
+requests and batch entries get JSON-RPC error -32600 and provider exceptions -32603, so
+one bad entry never costs the rest of a batch its replies.
+"""
+
+
+@dataclass(frozen=True)
+class NetworkProfile:
+    """Link model: rtt/jitter in milliseconds, bandwidth in kilobits per second (None = unlimited)."""
+
+    rtt_ms: float = 0.0
+    jitter_ms: float = 0.0
+    up_kbps: float | None = None
+    down_kbps: float | None = None
+    max_request_bytes: int | None = None
+
+    def delay(self, request_bytes: int, response_bytes: int, rng: random.Random) -> float:
+        """Seconds one exchange of the given body sizes takes on this link."""
+        seconds = self.rtt_ms / 1e3
+        if self.jitter_ms:
+            seconds += rng.uniform(-self.jitter_ms, self.jitter_ms) / 1e3
+        if self.up_kbps:
+            seconds += request_bytes * 8 / (self.up_kbps * 1e3)
+        if self.down_kbps:
+            seconds += response_bytes * 8 / (self.down_kbps * 1e3)
+        return max(0.0, seconds)
+
+
+PROFILES = {
+    "local": NetworkProfile(),
+    "datacenter": NetworkProfile(rtt_ms=1, jitter_ms=0.2, up_kbps=1_000_000, down_kbps=1_000_000),
+    "broadband": NetworkProfile(rtt_ms=30, jitter_ms=5, up_kbps=10_000, down_kbps=50_000),
+    "mobile": NetworkProfile(rtt_ms=80, jitter_ms=25, up_kbps=2_000, down_kbps=10_000),
+    "constrained": NetworkProfile(
+        rtt_ms=150, jitter_ms=40, up_kbps=256, down_kbps=1_000, max_request_bytes=128 * 1024
+    ),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _Server
+    # Headers and body are separate writes; Nagle would hold the body for the client's ACK
+    disable_nagle_algorithm = True
+    # Every reply carries Content-Length, so clients may keep connections alive
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        srv = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        limit = srv.profile.max_request_bytes
+        if limit is not None and length > limit:
+            self.rfile.read(length)
+            self._reply(413, b"content length too large", "text/plain", length)
+            return
+        raw = self.rfile.read(length)
+        encoding = self.headers.get("Content-Encoding", "identity").lower()
+        if encoding != "identity" and encoding not in srv.rpc.accept_encodings:
+            self._reply(415, b"unsupported content encoding", "text/plain", length)
+            return
+        try:
+            request = json.loads(raw if encoding == "identity" else decode_body(raw, encoding))
+        except (ValueError, OSError, zlib.error):
+            body = json.dumps(_error(None, -32700, "parse error")).encode()
+            self._reply(200, body, "application/json", length)
+            return
+        if isinstance(request, list) and request:
+            response: Any = [srv.dispatch(r) for r in request]
+        else:
+            # An empty batch is answered like any other malformed request
+            response = srv.dispatch(request or None)
+        self._reply(200, json.dumps(response).encode(), "application/json", length)
+
+    def _reply(self, status: int, body: bytes, content_type: str, request_bytes: int) -> None:
+        wait = self.server.delay(request_bytes, len(body))
+        if wait:
+            time.sleep(wait)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], rpc: RPCServer) -> None:
+        super().__init__(address, _Handler)
+        self.rpc = rpc
+
+    @property
+    def profile(self) -> NetworkProfile:
+        return self.rpc.profile
+
+    def delay(self, request_bytes: int, response_bytes: int) -> float:
+        return self.rpc.delay(request_bytes, response_bytes)
+
+    def dispatch(self, request: Any) -> dict[str, Any]:
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            request_id = request.get("id") if isinstance(request, dict) else None
+            return _error(request_id, -32600, "invalid request")
+        try:
+            response = self.rpc.provider.make_request(request["method"], request.get("params", []))
+        except Exception as e:
+            return _error(request.get("id"), -32603, f"internal error: {e}")
+        return {**response, "id": request.get("id")}
+
+
+def _error(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class RPCServer:
+    """Threaded JSON-RPC server on 127.0.0.1 serving an EVMProvider under a NetworkProfile.
+
+    Use as a context manager; `url` is ready for web3's HTTPProvider. Bytes received and
+    sent are counted in `bytes_in` / `bytes_out` (as on the wire, i.e. before inflating).
+    """
+
+    def __init__(
+        self,
+        provider: EVMProvider | None = None,
+        *,
+        profile: NetworkProfile | str = "local",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0,
+        accept_encodings: tuple[str, ...] = (),
+    ) -> None:
+        self.provider = provider if provider is not None else EVMProvider()
+        self.profile = PROFILES[profile] if isinstance(profile, str) else profile
+        self.accept_encodings = accept_encodings
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = _Server((host, port), self)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def delay(self, request_bytes: int, response_bytes: int) -> float:
+        with self._lock:
+            self.bytes_in += request_bytes
+            self.bytes_out += response_bytes
+            return self.profile.delay(request_bytes, response_bytes, self._rng)
+
+    def start(self) -> RPCServer:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> RPCServer:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+
+__all__ = ["PROFILES", "NetworkProfile", "RPCServer"]
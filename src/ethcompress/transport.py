@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+import gzip
+import zlib
+
+try:  # Python 3.14+
+    from compression import zstd as _zstd  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - depends on the interpreter
+    try:
+        import zstandard as _zstd  # type: ignore[import-not-found]
+    except ImportError:
+        _zstd = None
+
+"""
+HTTP request body compression (Content-Encoding), as an alternative to on-chain decoding.
+
+Transport encoding costs no gas and runs in C, but only works where the node or a proxy in
+front of it inflates request bodies. CompressingHTTPProvider(transport=...) probes the
+endpoint once and then weighs the encoded plain call against the codecs (see there).
+zstd needs Python 3.14 (compression.zstd) or the zstandard package.
+"""
+
+# Preference order when an endpoint accepts several
+ENCODINGS = ("zstd", "gzip", "deflate")
+
+# CPU time of the pure Python codecs per calldata byte, before any call was measured
+CODEC_NS_PER_BYTE = 1_000
+
+
+def _zstd_compress(body: bytes, level: int) -> bytes:
+    if _zstd is None:
+        raise ValueError("zstd needs Python 3.14 or the zstandard package")
+    return bytes(_zstd.compress(body, level))
+
+
+def _zstd_decompress(body: bytes) -> bytes:
+    if _zstd is None:
+        raise ValueError("zstd needs Python 3.14 or the zstandard package")
+    return bytes(_zstd.decompress(body))
+
+
+def _deflate(body: bytes, level: int) -> bytes:
+    return zlib.compress(body, level)
+
+
+def _gzip(body: bytes, level: int) -> bytes:
+    return gzip.compress(body, level, mtime=0)
+
+
+_ENCODERS: dict[str, tuple[Callable[[bytes, int], bytes], Callable[[bytes], bytes]]] = {
+    "gzip": (_gzip, gzip.decompress),
+    "deflate": (_deflate, zlib.decompress),
+    "zstd": (_zstd_compress, _zstd_decompress),
+}
+
+
+def available_encodings() -> tuple[str, ...]:
+    """ENCODINGS this interpreter can produce."""
+    return tuple(e for e in ENCODINGS if e != "zstd" or _zstd is not None)
+
+
+def encode_body(body: bytes, encoding: str, level: int = 6) -> bytes:
+    try:
+        encode = _ENCODERS[encoding][0]
+    except KeyError:
+        raise ValueError(f"unknown content encoding: {encoding}") from None
+    return encode(body, level)
+
+
+def decode_body(body: bytes, encoding: str) -> bytes:
+    try:
+        decode = _ENCODERS[encoding][1]
+    except KeyError:
+        raise ValueError(f"unknown content encoding: {encoding}") from None
+    return decode(body)
+
+
+__all__ = [
+    "CODEC_NS_PER_BYTE",
+    "ENCODINGS",
+    "available_encodings",
+    "decode_body",
+    "encode_body",
+]
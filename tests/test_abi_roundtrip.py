@@ -0,0 +1,48 @@
+import os
+import time
+
+import pytest
+
+from compressions.aggregate import aggregate_calldata
+from ethcompress import abi_restore, abi_transform, flz_compress
+
+
+def _hex(b: bytes) -> str:
+    return "0x" + b.hex()
+
+
+def _aggregate(targets: list[bytes]) -> bytes:
+    return aggregate_calldata([(t, bytes.fromhex("95d89b41")) for t in targets])
+
+
+def test_abi_roundtrip_aggregate_improves_flz():
+    data = _aggregate([os.urandom(20) for _ in range(64)])
+    h = _hex(data)
+    t0 = time.perf_counter()
+    comp = abi_transform(h)
+    t1 = time.perf_counter()
+    decomp = abi_restore(comp)
+    t2 = time.perf_counter()
+    assert decomp == h
+    flz_plain = (len(flz_compress(h)) - 2) // 2
+    flz_abi = (len(flz_compress(comp)) - 2) // 2
+    assert flz_abi < flz_plain
+    print(
+        f"ABI aggregate: in={len(data)}B flz={flz_plain}B abi+flz={flz_abi}B transform_ms={(t1 - t0) * 1000:.3f} restore_ms={(t2 - t1) * 1000:.3f}"
+    )
+
+
+def test_abi_roundtrip_random_and_partial_words():
+    for n in (4, 5, 36, 1000, 4099):
+        data = os.urandom(n)
+        h = _hex(data)
+        assert abi_restore(abi_transform(h)) == h
+    # Zero words and trailing padding of a short last word
+    data = bytes.fromhex("a9059cbb") + b"\x00" * 64 + b"\x01" * 40 + b"\x00" * 3
+    h = _hex(data)
+    assert abi_restore(abi_transform(h)) == h
+
+
+def test_abi_transform_rejects_short_input():
+    with pytest.raises(ValueError):
+        abi_transform("0x1234")
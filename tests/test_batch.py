@@ -0,0 +1,49 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+import pytest
+
+from ethcompress import compress_call_data
+from ethcompress.batch import compress_many
+from ethcompress.testing import corpus
+
+
+def _shm_blocks() -> set[str]:
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+@pytest.fixture(scope="module")
+def items():
+    return [(s.to, s.data) for s in corpus(40, seed=11, min_size=300, max_size=6000)]
+
+
+@pytest.mark.parametrize(
+    "kw",
+    [
+        {"workers": 1},
+        {"workers": 2, "chunk_size": 3},  # pickled chunks
+        {"workers": 2, "chunk_size": 5, "shm_threshold": 0},  # every chunk via shared memory
+    ],
+)
+def test_compress_many_matches_serial_in_order(items, kw):
+    before = _shm_blocks()
+    expected = [compress_call_data(d, t) for t, d in items]
+    assert list(compress_many(items, **kw)) == expected
+    assert _shm_blocks() == before
+
+
+def test_compress_many_bytes_input_and_shared_executor(items):
+    raw = [(t, bytes.fromhex(d[2:])) for t, d in items[:10]]
+    expected = [compress_call_data(d, t, alg="cd", min_size=0) for t, d in items[:10]]
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        for _ in range(2):
+            out = compress_many(raw, alg="cd", min_size=0, workers=2, executor=pool, chunk_size=4)
+            assert list(out) == expected
+
+
+def test_compress_many_early_stop_releases_shared_memory(items):
+    before = _shm_blocks()
+    stream = compress_many(items, workers=2, chunk_size=2, shm_threshold=0)
+    next(stream)
+    stream.close()
+    assert _shm_blocks() == before
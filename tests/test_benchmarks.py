@@ -0,0 +1,75 @@
+import json
+
+from benchmarks import __main__ as bench_main, report
+
+
+def test_benchmarks_run_and_compare_against_own_baseline(tmp_path):
+    out = tmp_path / "results.json"
+    argv = ["--sizes", "256", "--kinds", "aggregate", "--repeat", "2", "--out", str(out)]
+    assert bench_main.main(argv) == 0
+    doc = json.loads(out.read_text())
+    assert "codec/flz_compress/aggregate/256" in doc["results"]
+    assert "middleware/auto/256" in doc["results"]
+    assert doc["results"]["middleware/auto/256"]["p50_us"] > 0
+
+
+def test_compare_flags_regressions_beyond_thresholds():
+    base = {"codec/x/random/1024": {"mb_s": 10.0, "p50_us": 100.0, "p99_us": 150.0}}
+    ok = {"codec/x/random/1024": {"mb_s": 9.5, "p50_us": 110.0, "p99_us": 160.0}}
+    bad = {"codec/x/random/1024": {"mb_s": 5.0, "p50_us": 200.0, "p99_us": 150.0}}
+    assert report.compare(ok, base) == []
+    regressions = report.compare(bad, base, max_throughput_drop=0.1, max_latency_increase=0.2)
+    assert len(regressions) == 2
+    # Cases missing from the baseline are not regressions
+    assert report.compare({"codec/new/random/1": ok["codec/x/random/1024"]}, base) == []
+
+
+def test_gas_harness_buckets_and_flags_gas_regressions():
+    from benchmarks import gas
+
+    results = gas.run(count=4, max_size=2048, algs=("jit", "wd"))
+    assert gas.bucket(1000) == "0-1024" and gas.bucket(70000) == "65536+"
+    fit = results["gas/jit/fit"]
+    assert fit["samples"] == 4 and fit["per_byte"] > 0
+    rows = [k for k in results if k.startswith("gas/wd/") and not k.endswith("/fit")]
+    assert rows and all(results[k]["gas_p50"] > 0 for k in rows)
+
+    worse = {k: {**v, "gas_p99": v.get("gas_p99", 0) * 1.1} for k, v in results.items()}
+    assert report.compare(results, results) == []
+    bucket_rows = [k for k in results if not k.endswith("/fit")]
+    assert len(report.compare(worse, results, max_gas_increase=0.05)) == len(bucket_rows)
+
+
+def test_batch_scaling_reports_speedup_per_worker_count():
+    from benchmarks import batch
+
+    results = batch.run([1, 2], count=8, repeat=1, max_size=2048)
+    assert set(results) == {"batch/1", "batch/2"}
+    assert results["batch/1"]["speedup"] == 1.0
+    assert results["batch/2"]["calls_s"] > 0
+    assert batch.default_workers()[0] == 1
+
+
+def test_thread_scaling_runs_with_or_without_gil():
+    from benchmarks import threads
+
+    results = threads.run([1, 2], count=6, repeat=1, max_size=2048)
+    assert results["threads/1"]["speedup"] == 1.0
+    assert results["threads/2"]["gil"] == float(threads.gil_enabled())
+
+
+def test_provider_benchmark_compares_both_clients():
+    from benchmarks import provider
+
+    results = provider.run(["local"], [512], repeat=1, algs=("jit",))
+    assert set(results) == {"provider/local/middleware/jit/512", "provider/local/provider/jit/512"}
+    assert results["provider/local/middleware/jit/512"]["speedup"] == 1.0
+
+
+def test_transport_benchmark_reports_request_bytes():
+    from benchmarks import provider
+
+    results = provider.run_transport(["local"], [1024], repeat=1)
+    sent = {k.split("/")[2]: r["request_bytes"] for k, r in results.items()}
+    assert sent["gzip"] < sent["vanilla"]
+    assert sent["auto"] <= sent["codecs"]
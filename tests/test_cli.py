@@ -0,0 +1,98 @@
+import csv
+import gzip
+import json
+
+import pytest
+
+from ethcompress.analysis import Summary, analyze_call, estimate_decode_gas, read_calls
+from ethcompress.cli import analyze_stream, main
+from ethcompress.testing import corpus, generate
+
+TO = "0x" + "11" * 20
+
+
+def _write_jsonl(path, samples):
+    with open(path, "w") as f:
+        for s in samples:
+            f.write(json.dumps({"to": s.to, "input": s.data}) + "\n")
+
+
+@pytest.mark.parametrize("alg", ["flz", "cd", "wd", "flz64k", "abi-flz", "abi-cd"])
+def test_cli_compress_decompress_roundtrip(alg: str, capsys):
+    data = generate("aggregate", 3000, seed=1)
+    assert main(["compress", data, "--to", TO, "--alg", alg]) == 0
+    out = json.loads(capsys.readouterr().out)
+    assert out["meta"]["algo"] == alg
+    assert out["override"]
+
+    assert main(["decompress", out["data"], "--alg", alg]) == 0
+    assert capsys.readouterr().out.strip() == data
+
+
+def test_analyze_call_reports_every_codec():
+    data = generate("transfer", 2048, seed=2)
+    r = analyze_call(TO, data)
+    assert r["original"] == len(data) // 2 - 1
+    assert r["auto"]["algo"] != "vanilla" and r["auto"]["bytes_saved"] > 0
+    for alg, c in r["codecs"].items():
+        assert c["total"] == c["calldata"] + c["code"]
+        assert c["gas"] == estimate_decode_gas(alg, r["original"])
+
+
+def test_read_calls_jsonl_csv_and_gzip(tmp_path):
+    samples = corpus(6, seed=3, min_size=300, max_size=2000)
+    expected = [(s.to, s.data) for s in samples]
+
+    _write_jsonl(tmp_path / "calls.jsonl", samples)
+    assert list(read_calls(str(tmp_path / "calls.jsonl"))) == expected
+
+    with gzip.open(tmp_path / "calls.csv.gz", "wt", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["to", "data"])
+        w.writerows([*expected, (TO, "0x")])  # empty calldata is skipped
+    assert list(read_calls(str(tmp_path / "calls.csv.gz"))) == expected
+
+
+def test_analyze_pool_matches_serial(tmp_path):
+    samples = corpus(20, seed=4, min_size=300, max_size=3000)
+    calls = [(s.to, s.data) for s in samples]
+    serial = [r["auto"]["algo"] for r in analyze_stream(calls, workers=1, batch_size=3)]
+    pooled = [r["auto"]["algo"] for r in analyze_stream(calls, workers=2, batch_size=3)]
+    assert pooled == serial and len(serial) == 20
+
+
+def test_cli_analyze_summary_and_emit(tmp_path, capsys):
+    samples = corpus(12, seed=5, min_size=300, max_size=4000)
+    _write_jsonl(tmp_path / "calls.jsonl", samples)
+    rows = tmp_path / "rows.jsonl"
+    argv = ["analyze", str(tmp_path / "calls.jsonl"), "--workers", "2", "--batch-size", "4"]
+    assert main([*argv, "--json", "--emit", str(rows), "--algs", "flz,cd,jit"]) == 0
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["calls"] == 12
+    assert set(summary["codecs"]) == {"flz", "cd", "jit"}
+    assert sum(summary["auto"]["chosen"].values()) == 12
+    assert len(rows.read_text().splitlines()) == 12
+
+    total = Summary()
+    for line in rows.read_text().splitlines():
+        total.add(json.loads(line))
+    assert total.to_dict() == summary
+
+    assert main([*argv, "--limit", "5"]) == 0
+    assert capsys.readouterr().out.startswith("5 calls")
+
+
+def test_cli_analyze_skips_and_counts_bad_rows(tmp_path, capsys):
+    samples = corpus(4, seed=6, min_size=300, max_size=2000)
+    path = tmp_path / "calls.jsonl"
+    _write_jsonl(path, samples)
+    with open(path, "a") as f:
+        f.write(json.dumps({"to": TO, "data": "0xzz12"}) + "\n")
+        f.write("[1, 2]\n")
+        f.write('{"to": "' + TO + '", "data": "0x12')  # truncated last line
+    assert main(["analyze", str(path), "--json"]) == 0
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["calls"] == 4 and summary["skipped"] == 3
+    assert main(["analyze", str(path), "--workers", "2"]) == 0
+    first = capsys.readouterr().out.splitlines()[0]
+    assert first.startswith("4 calls, ") and first.endswith("3 bad rows skipped")
@@ -0,0 +1,215 @@
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+from requests.exceptions import HTTPError
+from web3 import HTTPProvider, Web3
+
+from ethcompress import HistogramSink
+from ethcompress.middleware import DECOMPRESSOR_ADDRESS, CompressionMiddleware
+from ethcompress.provider import CompressingHTTPProvider, fast_result
+from ethcompress.testing import ECHO_ADDRESS, NetworkProfile, RPCServer, generate
+
+
+def test_provider_compresses_eth_call_and_passes_other_methods():
+    data = generate("aggregate", 4096)
+    sink = HistogramSink()
+    with RPCServer() as srv:
+        w3 = Web3(CompressingHTTPProvider(srv.url, min_size=0, sink=sink))
+        assert w3.is_connected()
+        assert "0x" + w3.eth.call({"to": ECHO_ADDRESS, "data": data}).hex() == data
+        assert (
+            hex(w3.eth.block_number) == srv.provider.make_request("eth_blockNumber", [])["result"]
+        )
+        assert srv.provider.calls[-1].override
+        assert srv.bytes_in < len(data) * 3
+    snap = sink.snapshot()
+    assert snap["stages"]["provider"]["compress"]["count"] == 1
+    assert sum(n for k, n in snap["algos"].items() if k.startswith("provider/")) == 1
+
+
+def test_provider_reuses_keep_alive_connections():
+    data = generate("transfer", 2048)
+    with RPCServer() as srv:
+        provider = CompressingHTTPProvider(srv.url, min_size=0)
+        w3 = Web3(provider)
+        w3.eth.call({"to": ECHO_ADDRESS, "data": data})
+        (conn,) = provider._pool._idle
+        sock = conn.sock
+        for _ in range(3):
+            w3.eth.call({"to": ECHO_ADDRESS, "data": data})
+        assert provider._pool._idle == [conn] and conn.sock is sock
+        provider.close()
+        assert provider._pool._idle == []
+        # Connections closed by either side are replaced transparently
+        w3.eth.call({"to": ECHO_ADDRESS, "data": data})
+        provider._pool._idle[0].sock.shutdown(socket.SHUT_RDWR)
+        assert "0x" + w3.eth.call({"to": ECHO_ADDRESS, "data": data}).hex() == data
+
+
+class _DroppedConnection:
+    """An idle connection the server closes after the reuse check: fails on write, or after it."""
+
+    sock = None
+
+    def __init__(self, on_write: bool):
+        self.on_write, self.writes = on_write, 0
+
+    def request(self, *args, **kwargs):
+        if self.on_write:
+            raise BrokenPipeError
+        self.writes += 1
+
+    def getresponse(self):
+        raise http.client.RemoteDisconnected("closed")
+
+    def close(self):
+        pass
+
+
+def test_provider_replays_only_unsent_or_read_only_requests():
+    with RPCServer() as srv:
+        provider = CompressingHTTPProvider(srv.url)
+        dropped = _DroppedConnection(on_write=False)
+        provider._pool._idle = [dropped]
+        with pytest.raises(http.client.RemoteDisconnected):
+            provider.make_request("eth_sendRawTransaction", ["0x02"])
+        assert dropped.writes == 1
+
+        for conn in (_DroppedConnection(on_write=False), _DroppedConnection(on_write=True)):
+            provider._pool._idle = [conn]
+            assert provider.make_request("eth_blockNumber", [])["result"].startswith("0x")
+        provider._pool._idle = [_DroppedConnection(on_write=True)]
+        assert "error" in provider.make_request("eth_sendRawTransaction", ["0x02"])
+
+
+class _CloseAfterReply(BaseHTTPRequestHandler):
+    """Replies without Connection: close, then closes: the client keeps a dead connection."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": "0x1"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_provider_skips_idle_connections_the_server_closed():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _CloseAfterReply)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        provider = CompressingHTTPProvider(f"http://127.0.0.1:{httpd.server_address[1]}")
+        assert provider.make_request("eth_blockNumber", [])["result"] == "0x1"
+        (stale,) = provider._pool._idle
+        writes = []
+        stale.send = writes.append
+        time.sleep(0.05)
+        # Over a real link the whole request could be written before the reset arrives, and
+        # a non-replayable request would then fail: the closed connection is never written to
+        assert provider.make_request("eth_sendRawTransaction", ["0x02"])["result"] == "0x1"
+        assert writes == [] and stale not in provider._pool._idle and stale.sock is None
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_provider_falls_back_when_the_compressed_call_fails():
+    data = generate("aggregate", 2048)
+    # The caller's override wins over the forwarder and makes the compressed call revert
+    params = [
+        {"to": ECHO_ADDRESS, "data": data},
+        "latest",
+        {DECOMPRESSOR_ADDRESS: {"code": "0xfe"}},
+    ]
+    sink = HistogramSink()
+    with RPCServer() as srv:
+        provider = CompressingHTTPProvider(srv.url, alg="flz", min_size=0, sink=sink)
+        assert provider.make_request("eth_call", params)["result"] == data
+        strict = CompressingHTTPProvider(srv.url, alg="flz", min_size=0, allow_fallback=False)
+        assert "error" in strict.make_request("eth_call", params)
+    assert sink.snapshot()["fallbacks"] == {"provider/rpc_error": 1}
+
+
+def test_provider_batches_compressed_calls():
+    big = generate("aggregate", 4096, seed=1)
+    small = "0x" + "ab" * 40
+    with RPCServer() as srv:
+        w3 = Web3(CompressingHTTPProvider(srv.url))
+        with w3.batch_requests() as batch:
+            batch.add(w3.eth.call({"to": ECHO_ADDRESS, "data": big}))
+            batch.add(w3.eth.get_block_number())
+            batch.add(w3.eth.call({"to": ECHO_ADDRESS, "data": small}))
+            results = batch.execute()
+        assert ["0x" + results[0].hex(), "0x" + results[2].hex()] == [big, small]
+        assert [bool(c.override) for c in srv.provider.calls] == [True, False]
+
+        failing = {DECOMPRESSOR_ADDRESS: {"code": "0xfe"}}
+        out = w3.provider.make_batch_request(
+            [("eth_call", [{"to": ECHO_ADDRESS, "data": big}, "latest", failing])] * 2
+        )
+        assert [r["result"] for r in out] == [big, big]
+
+
+def test_provider_reports_batch_entries_without_response():
+    with RPCServer() as srv:
+        provider = CompressingHTTPProvider(srv.url)
+        requests = [("eth_chainId", []), ("eth_blockNumber", [])]
+        # The server drops the second reply
+        provider._post_batch = lambda bodies, replay: [{"jsonrpc": "2.0", "id": 1, "result": "0x1"}]
+        provider._ids = iter([1, 2])
+        first, second = provider.make_batch_request(requests)
+        assert first["result"] == "0x1"
+        assert second == {
+            "jsonrpc": "2.0",
+            "id": 2,
+            "error": {"code": -32603, "message": "missing response"},
+        }
+
+
+def test_provider_raises_http_errors():
+    with RPCServer(profile=NetworkProfile(max_request_bytes=1024)) as srv:
+        w3 = Web3(CompressingHTTPProvider(srv.url))
+        with pytest.raises(HTTPError):
+            # Incompressible, so it goes out as is
+            w3.eth.call({"to": ECHO_ADDRESS, "data": "0x" + os.urandom(2048).hex()})
+
+
+def test_fast_result_slices_only_string_results():
+    assert fast_result(b'{"jsonrpc":"2.0","id":1,"result":"0xab"}') == "0xab"
+    assert fast_result(b'{"jsonrpc": "2.0", "id": 1, "result": "0x"}') == "0x"
+    assert fast_result(b'{"jsonrpc":"2.0","id":1,"result":{"number":"0x1"}}') is None
+    assert fast_result(b'{"jsonrpc":"2.0","id":1,"error":{"code":3,"data":"0x"}}') is None
+
+
+def test_provider_is_faster_than_http_provider_with_middleware():
+    data = generate("aggregate", 2048, seed=2)
+    tx = {"to": ECHO_ADDRESS, "data": data}
+    with RPCServer() as srv:
+        direct = Web3(CompressingHTTPProvider(srv.url, alg="flz", min_size=0))
+        onion = Web3(HTTPProvider(srv.url))
+        for w3 in (direct, onion):
+            w3.middleware_onion.clear()
+        onion.middleware_onion.add(CompressionMiddleware(alg="flz", min_size=0))
+
+        timings = {}
+        for name, w3 in (("provider", direct), ("middleware", onion)):
+            w3.eth.call(tx)
+            t0 = time.perf_counter()
+            for _ in range(20):
+                w3.eth.call(tx)
+            timings[name] = (time.perf_counter() - t0) / 20
+    print(f"\nflz 2 KB eth_call: {timings}")
+    assert timings["provider"] < timings["middleware"] * 1.5
@@ -0,0 +1,34 @@
+from eth_abi import decode
+import pytest
+
+from ethcompress.testing import KINDS, corpus, generate
+
+
+def test_corpus_is_deterministic_per_seed():
+    assert generate("swap", 2000, seed=3) == generate("swap", 2000, seed=3)
+    assert generate("swap", 2000, seed=3) != generate("swap", 2000, seed=4)
+    assert corpus(8, seed=1) == corpus(8, seed=1)
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_generate_reaches_requested_size(kind: str):
+    for size in (512, 4096):
+        data = bytes.fromhex(generate(kind, size)[2:])
+        # Within a call or two of the target; whole calls are never truncated
+        assert size * 0.8 <= len(data) <= size + 2200
+        assert (len(data) - 4) % 32 == 0
+
+
+def test_generated_calldata_is_valid_abi():
+    agg = bytes.fromhex(generate("aggregate", 2048)[2:])
+    assert agg[:4] == bytes.fromhex("252dba42")
+    (calls,) = decode(["(address,bytes)[]"], agg[4:])
+    assert all(c[1][:4].hex() in ("95d89b41", "06fdde03", "313ce567", "70a08231") for c in calls)
+
+    claim = bytes.fromhex(generate("merkle", 1024)[2:])
+    _, _, _, proof = decode(["uint256", "address", "uint256", "bytes32[]"], claim[4:])
+    assert len(proof) == (1024 - 196) // 32
+
+    swap = bytes.fromhex(generate("swap", 100)[2:])
+    _, _, path, _, _ = decode(["uint256", "uint256", "address[]", "address", "uint256"], swap[4:])
+    assert 2 <= len(path) <= 5
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+
+from eth_abi import decode, encode
+import pytest
+from web3 import AsyncWeb3, Web3
+
+from ethcompress import compress_eth_call
+from ethcompress.compressor import DECOMPRESSOR_ADDRESS
+from ethcompress.middleware import AsyncCompressionMiddleware, CompressionMiddleware
+from ethcompress.testing import (
+    ECHO_ADDRESS,
+    MULTICALL3_ADDRESS,
+    AsyncEVMProvider,
+    EVMProvider,
+    generate,
+)
+
+
+@pytest.mark.parametrize("alg", ["flz", "cd", "jit", "wd", "flz64k", "abi-flz"])
+def test_evm_provider_roundtrips_compressed_calls(alg: str):
+    provider = EVMProvider()
+    w3 = Web3(provider)
+    w3.middleware_onion.add(CompressionMiddleware(alg=alg, min_size=0, allow_fallback=False))
+    data = generate("transfer", 3000)
+    out = w3.eth.call({"to": ECHO_ADDRESS, "data": data})
+    assert "0x" + out.hex() == data
+    call = provider.calls[-1]
+    assert call.override and call.success
+    assert call.to == DECOMPRESSOR_ADDRESS
+    assert call.gas_used > 0
+    print(f"{alg}: calldata={call.data_bytes}B gas={call.gas_used}")
+
+
+def test_evm_provider_reverts_overrides_and_keeps_preloaded_code():
+    provider = EVMProvider()
+    w3 = Web3(provider)
+    data = generate("aggregate", 2000)
+    cc = compress_eth_call(ECHO_ADDRESS, data, alg="cd", min_size=0, allow_fallback=False)
+    assert cc.algo == "cd"
+    assert cc.execute(w3) == data
+    # The override was scoped to the call, preloaded contracts stay installed
+    assert w3.eth.get_code(Web3.to_checksum_address(DECOMPRESSOR_ADDRESS)) == b""
+    assert w3.eth.get_code(Web3.to_checksum_address(MULTICALL3_ADDRESS)) != b""
+    assert provider.gas_used == [c.gas_used for c in provider.calls]
+
+
+def test_evm_provider_multicall3_aggregate():
+    w3 = Web3(EVMProvider())
+    calls = [(ECHO_ADDRESS, bytes([i]) * i) for i in range(1, 20)]
+    data = "0x252dba42" + encode(["(address,bytes)[]"], [calls]).hex()
+    out = w3.eth.call({"to": MULTICALL3_ADDRESS, "data": data})
+    _, results = decode(["uint256", "bytes[]"], out)
+    assert list(results) == [c[1] for c in calls]
+
+
+def test_evm_provider_rejects_bare_number_blocks():
+    provider = EVMProvider()
+    tx = {"to": ECHO_ADDRESS, "data": "0x1234"}
+    for block in ("latest", "0x10", {"blockNumber": "0x10"}):
+        assert provider.make_request("eth_call", [tx, block])["result"] == "0x1234"
+    for block in (16, "16", None):
+        assert provider.make_request("eth_call", [tx, block])["error"]["code"] == -32602
+
+
+def test_async_evm_provider_with_middleware():
+    async def run() -> None:
+        provider = AsyncEVMProvider()
+        aw3 = AsyncWeb3(provider)
+        aw3.middleware_onion.add(AsyncCompressionMiddleware(alg="flz", min_size=0))
+        data = generate("swap", 2000)
+        out = await aw3.eth.call({"to": ECHO_ADDRESS, "data": data})
+        assert "0x" + out.hex() == data
+        assert provider.calls[-1].override
+
+    asyncio.run(run())
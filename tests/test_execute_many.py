@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from web3 import AsyncWeb3, Web3
+
+from ethcompress import HistogramSink, compress_eth_call, execute_many, execute_many_async
+from ethcompress.testing import ECHO_ADDRESS, AsyncEVMProvider, EVMProvider, generate
+
+
+def _calls(n: int, **kw):
+    datas = [generate("transfer", 1200 + 64 * i, seed=i) for i in range(n)]
+    return datas, [compress_eth_call(ECHO_ADDRESS, d, **kw) for d in datas]
+
+
+class SlowW3:
+    """Sync provider that records the peak number of concurrent requests."""
+
+    def __init__(self, delay: float = 0.01, fail: bool = False):
+        self.provider = self
+        self.delay, self.fail = delay, fail
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    def make_request(self, method, params):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if self.fail:
+            return {"error": {"code": -32000, "message": "boom"}}
+        return {"result": params[0]["data"][:10]}
+
+
+def test_execute_async_decodes_on_evm():
+    datas, calls = _calls(3, alg="flz")
+    aw3 = AsyncWeb3(AsyncEVMProvider())
+
+    async def main():
+        return await asyncio.gather(*(c.execute_async(aw3) for c in calls))
+
+    outs = asyncio.run(main())
+    assert outs == datas
+
+
+def test_execute_async_reports_fallback_like_execute():
+    datas, (call,) = _calls(1, alg="flz")
+
+    def reply(params):
+        if len(params) == 3:
+            return {"error": {"code": -32000, "message": "override unsupported"}}
+        return {"result": params[0]["data"]}
+
+    class W3:
+        def __init__(self):
+            self.provider = self
+
+        def make_request(self, method, params):
+            return reply(params)
+
+    class AW3(W3):
+        async def make_request(self, method, params):
+            return reply(params)
+
+    sync_sink, async_sink = HistogramSink(), HistogramSink()
+    assert call.execute(W3(), sink=sync_sink) == datas[0]
+    assert asyncio.run(call.execute_async(AW3(), sink=async_sink)) == datas[0]
+    assert sync_sink.snapshot()["fallbacks"] == {"execute/rpc_error": 1}
+    assert async_sink.snapshot()["fallbacks"] == sync_sink.snapshot()["fallbacks"]
+
+    strict = compress_eth_call(ECHO_ADDRESS, datas[0], alg="flz", allow_fallback=False)
+    with pytest.raises(RuntimeError, match="fallback disabled"):
+        asyncio.run(strict.execute_async(AW3(), sink=async_sink))
+    assert async_sink.snapshot()["fallbacks"]["execute/disabled"] == 1
+
+
+def test_execute_many_preserves_order_with_bounded_threads():
+    datas, calls = _calls(12, alg="cd")
+    w3 = Web3(EVMProvider())
+    assert list(execute_many(calls, w3, concurrency=4)) == datas
+
+    slow = SlowW3()
+    list(execute_many(calls * 3, slow, concurrency=3))
+    assert slow.peak == 3
+
+
+def test_execute_many_errors_and_return_exceptions():
+    _, calls = _calls(4, alg="cd", allow_fallback=False)
+    with pytest.raises(RuntimeError, match="fallback disabled"):
+        list(execute_many(calls, SlowW3(fail=True), concurrency=2))
+    outs = list(execute_many(calls, SlowW3(fail=True), concurrency=2, return_exceptions=True))
+    assert all(isinstance(o, RuntimeError) for o in outs) and len(outs) == 4
+
+
+def test_execute_many_async_semaphore_and_order():
+    datas, calls = _calls(10, alg="flz")
+
+    class SlowAsync:
+        active = peak = 0
+
+        def __init__(self):
+            self.provider = self
+
+        async def make_request(self, method, params):
+            SlowAsync.active += 1
+            SlowAsync.peak = max(SlowAsync.peak, SlowAsync.active)
+            await asyncio.sleep(0.005 * (len(params) % 2 + 1))
+            SlowAsync.active -= 1
+            return {"result": params[0]["data"][:10]}
+
+    async def main():
+        aw3 = AsyncWeb3(AsyncEVMProvider())
+        evm = [r async for r in execute_many_async(calls, aw3, concurrency=4)]
+        slow = [r async for r in execute_many_async(calls * 4, SlowAsync(), concurrency=5)]
+        return evm, slow
+
+    evm, slow = asyncio.run(main())
+    assert evm == datas
+    assert slow == [c.data[:10] for c in calls * 4]
+    assert SlowAsync.peak == 5
@@ -0,0 +1,78 @@
+import pytest
+from web3 import HTTPProvider, Web3
+
+from ethcompress import compress_eth_call
+from ethcompress.testing import ECHO_ADDRESS, EVMProvider, RPCServer, generate
+
+
+class FlakyW3:
+    """Fails every request (compressed and vanilla) for a block until it was seen `fails` times."""
+
+    def __init__(self, bad_blocks, fails: int = 1):
+        self.provider = self
+        self.bad, self.fails = set(bad_blocks), fails
+        self.seen: dict[str, int] = {}
+        self.batches = 0
+
+    def make_request(self, method, params):
+        block = params[1]
+        self.seen[block] = self.seen.get(block, 0) + 1
+        if int(block, 16) in self.bad and self.seen[block] <= 2 * self.fails:
+            return {"error": {"code": -32000, "message": f"header not found {block}"}}
+        return {"result": block}
+
+    def make_batch_request(self, requests):
+        self.batches += 1
+        return [self.make_request(m, p) for m, p in requests]
+
+
+@pytest.mark.parametrize("batch_size", [0, 16])
+def test_execute_range_on_evm(batch_size: int):
+    data = generate("aggregate", 3000, seed=3)
+    cc = compress_eth_call(ECHO_ADDRESS, data, alg="flz")
+    blocks = list(range(1000, 1040))
+    out = cc.execute_range(Web3(EVMProvider()), blocks, batch_size=batch_size, concurrency=4)
+    assert list(out) == blocks and set(out.values()) == {data}
+
+
+def test_execute_range_batches_over_http():
+    data = generate("transfer", 2000, seed=4)
+    cc = compress_eth_call(ECHO_ADDRESS, data, alg="cd")
+    with RPCServer() as srv:
+        w3 = Web3(HTTPProvider(srv.url))
+        out = cc.execute_range(w3, ["latest", 5, 6, 7], batch_size=2, concurrency=2)
+    assert list(out) == ["latest", 5, 6, 7] and set(out.values()) == {data}
+
+
+@pytest.mark.parametrize("batch_size", [0, 8])
+def test_execute_range_retries_partial_failures(batch_size: int):
+    cc = compress_eth_call("0x" + "22" * 20, "0x" + "00" * 1600, alg="cd")
+    w3 = FlakyW3({3, 7})
+    out = cc.execute_range(w3, range(10), batch_size=batch_size, retries=1)
+    assert out == {b: hex(b) for b in range(10)}
+    if batch_size:
+        assert w3.batches == 4  # compressed + vanilla batch, twice
+
+    w3 = FlakyW3({3, 7}, fails=2)
+    with pytest.raises(RuntimeError, match="2 of 10 blocks"):
+        cc.execute_range(w3, range(10), batch_size=batch_size, retries=1)
+    w3 = FlakyW3({3, 7}, fails=2)
+    out = cc.execute_range(w3, range(10), batch_size=batch_size, retries=1, return_exceptions=True)
+    assert isinstance(out[3], RuntimeError) and out[4] == "0x4"
+
+
+@pytest.mark.parametrize("batch_size", [0, 4])
+def test_execute_range_shares_request_parts(batch_size: int):
+    cc = compress_eth_call("0x" + "22" * 20, "0x" + "00" * 1600, alg="cd")
+    w3 = FlakyW3(set())
+    sent = []
+    make_request = w3.make_request
+
+    def record(method, params):
+        sent.append(params)
+        return make_request(method, params)
+
+    w3.make_request = record
+    cc.execute_range(w3, range(12), batch_size=batch_size)
+    assert len(sent) == 12 and len({id(p[0]) for p in sent}) == 1
+    assert all(p[2] is cc.override for p in sent)
@@ -0,0 +1,72 @@
+import os
+import time
+
+import pytest
+
+from ethcompress import flz64k_compress, flz64k_decompress, flz_compress
+
+from .integration.addresses_data import ADDRESSES
+
+
+def _hex(b: bytes) -> str:
+    return "0x" + b.hex()
+
+
+def _aggregate_balance_of(n_calls: int) -> bytes:
+    """Multicall3.aggregate over ERC-20 balanceOf(holder), cycling through the address corpus."""
+    n = n_calls
+    offsets = b""
+    tails = b""
+    for i in range(n):
+        offsets += (32 * n + len(tails)).to_bytes(32, "big")
+        token = bytes.fromhex(ADDRESSES[i % len(ADDRESSES)][2:])
+        holder = bytes.fromhex(ADDRESSES[(i * 7) % len(ADDRESSES)][2:])
+        call = bytes.fromhex("70a08231") + holder.rjust(32, b"\x00")
+        tails += token.rjust(32, b"\x00") + (64).to_bytes(32, "big")
+        tails += len(call).to_bytes(32, "big") + call.ljust(64, b"\x00")
+    head = (32).to_bytes(32, "big") + n.to_bytes(32, "big")
+    return bytes.fromhex("252dba42") + head + offsets + tails
+
+
+def test_flz64k_roundtrip_structured():
+    pat = (b"ABCD" * 64) + (b"\x00" * 70000) + (b"EFGH" * 64) + os.urandom(9000) + (b"ABCD" * 64)
+    h = _hex(pat)
+    t0 = time.perf_counter()
+    comp = flz64k_compress(h)
+    t1 = time.perf_counter()
+    decomp = flz64k_decompress(comp)
+    t2 = time.perf_counter()
+    assert decomp == h
+    print(
+        f"FLZ64K structured: in={len(pat)}B comp={(len(comp) - 2) // 2}B comp_ms={(t1 - t0) * 1000:.3f} decomp_ms={(t2 - t1) * 1000:.3f}"
+    )
+
+
+def test_flz64k_roundtrip_random_small_medium():
+    for n in (0, 3, 64, 1024, 5000):
+        data = os.urandom(n)
+        h = _hex(data)
+        comp = flz64k_compress(h)
+        assert flz64k_decompress(comp) == h
+
+
+@pytest.mark.parametrize("n_calls", [50, 500, 2000])
+def test_flz64k_ratio_vs_flz_on_aggregate_shapes(n_calls: int):
+    data = _aggregate_balance_of(n_calls)
+    h = _hex(data)
+    t0 = time.perf_counter()
+    c64 = flz64k_compress(h)
+    t1 = time.perf_counter()
+    c8 = flz_compress(h)
+    t2 = time.perf_counter()
+    assert flz64k_decompress(c64) == h
+    size64 = (len(c64) - 2) // 2
+    size8 = (len(c8) - 2) // 2
+    print(
+        f"aggregate n={n_calls} in={len(data)}B flz={size8}B ({size8 / len(data) * 100:.1f}%, "
+        f"{(t2 - t1) * 1000:.1f}ms) flz64k={size64}B ({size64 / len(data) * 100:.1f}%, "
+        f"{(t1 - t0) * 1000:.1f}ms)"
+    )
+    # Once the payload outgrows FLZ's 8 KB window, the wider window must win
+    if len(data) > 4 * 8192:
+        assert size64 < size8
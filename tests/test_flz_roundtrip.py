@@ -1,6 +1,9 @@
+import hashlib
 import os
 import time
 
+import pytest
+
 from ethcompress import flz_compress, flz_decompress
 
 
@@ -36,3 +39,56 @@ def test_flz_roundtrip_random_small_medium():
         print(
             f"FLZ random: n={n} comp={(len(comp) - 2) // 2}B comp_ms={(t1 - t0) * 1000:.3f} decomp_ms={(t2 - t1) * 1000:.3f}"
         )
+
+
+def _level_corpus() -> list[tuple[str, bytes]]:
+    words = [bytes([i + 1]) * 20 for i in range(40)]
+    aggregate = b"".join(
+        w.rjust(32, b"\x00")
+        + (64).to_bytes(32, "big")
+        + bytes.fromhex("95d89b41").ljust(32, b"\x00")
+        for w in words * 3
+    )
+    return [
+        ("structured", (b"ABCD" * 64) + (b"\x00" * 128) + (b"EFGH" * 64)),
+        ("aggregate", bytes.fromhex("252dba42") + aggregate),
+        ("runs", b"\x00" * 3000 + b"ab" * 300 + b"\xff" * 70),
+        ("random", os.urandom(2048)),
+    ]
+
+
+def test_flz_level1_is_bit_exact():
+    data = (
+        bytes(range(256)) * 3
+        + b"\x00" * 300
+        + b"ABCD" * 100
+        + bytes(i * 7 % 251 for i in range(3000))
+    ) * 2
+    comp = flz_compress(_hex(data), level=1)
+    assert comp == flz_compress(_hex(data))
+    # Output of the original solady.js port for this input
+    assert hashlib.sha256(comp.encode()).hexdigest() == (
+        "4327d760e1bcbb352da01eb800d2c8c20f9385d12bd91a7de4888d2cb3ec9ab9"
+    )
+
+
+def test_flz_levels_roundtrip_and_ratio():
+    for name, data in _level_corpus():
+        h = _hex(data)
+        sizes = []
+        for level in (1, 2, 3):
+            t0 = time.perf_counter()
+            comp = flz_compress(h, level=level)
+            t1 = time.perf_counter()
+            assert flz_decompress(comp) == h
+            sizes.append((len(comp) - 2) // 2)
+            print(
+                f"FLZ level={level} {name}: in={len(data)}B comp={sizes[-1]}B comp_ms={(t1 - t0) * 1000:.3f}"
+            )
+        # Optimal parse never loses to the greedy encoder
+        assert sizes[2] <= sizes[0]
+
+
+def test_flz_invalid_level():
+    with pytest.raises(ValueError):
+        flz_compress("0x00", level=4)
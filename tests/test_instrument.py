@@ -0,0 +1,92 @@
+import random
+import time
+
+from ethcompress import HistogramSink, compress_call_data, compress_eth_call
+from ethcompress.instrument import Event, Histogram
+from ethcompress.middleware import CompressionMiddleware
+from ethcompress.testing import generate
+
+TO = "0x" + "11" * 20
+
+
+class W3:
+    def __init__(self, fail_compressed: bool = False):
+        self.provider = self
+        self.fail_compressed = fail_compressed
+
+    def make_request(self, method, params):
+        if len(params) >= 3 and self.fail_compressed:
+            return {"error": {"code": -32000, "message": "simulated error"}}
+        return {"result": "0x01"}
+
+
+def test_compress_reports_stages_algo_and_sizes():
+    events: list[Event] = []
+    data = generate("aggregate", 1500, seed=1)
+    _, _, _, meta = compress_call_data(data, TO, sink=events.append)
+    (ev,) = events
+    assert ev.kind == "compress" and ev.algo == meta["algo"] and ev.sizes == meta["sizes"]
+    assert list(ev.stages) == ["parse", "select", "build", "alternatives", "override"]
+    assert all(ns >= 0 for ns in ev.stages.values()) and ev.fallback is None
+
+    compress_call_data(data, TO, min_size=10_000, sink=events.append)
+    noise = "0x" + random.Random(0).randbytes(900).hex()
+    compress_call_data(noise, TO, alg="flz", sink=events.append)
+    assert [e.fallback for e in events[1:]] == ["below_min_size", "no_gain"]
+    assert list(events[1].stages) == ["parse"]
+
+
+def test_execute_and_middleware_report_fallbacks():
+    sink = HistogramSink()
+    data = "0x" + "00" * 1600
+    cc = compress_eth_call(TO, data, alg="cd", sink=sink)
+    assert cc.execute(W3()) == "0x01"
+    assert cc.execute(W3(fail_compressed=True)) == "0x01"
+
+    w3 = W3(fail_compressed=True)
+    mw = CompressionMiddleware(alg="cd", sink=sink)(w3.make_request, w3)
+    mw("eth_call", [{"to": TO, "data": data}, "latest"])
+    mw("eth_call", [{"to": TO, "data": "0x1234"}, "latest"])
+    mw("eth_blockNumber", [])  # not an eth_call: no event
+
+    snap = sink.snapshot()
+    assert snap["events"] == 7  # 3 compress, 2 execute, 2 middleware
+    assert snap["fallbacks"] == {
+        "compress/below_min_size": 1,
+        "execute/rpc_error": 1,
+        "middleware/below_min_size": 1,
+        "middleware/rpc_error": 1,
+    }
+    assert snap["algos"]["execute/cd"] == 2 and snap["algos"]["middleware/cd"] == 1
+    stages = snap["stages"]["middleware"]
+    assert set(stages) == {"compress", "merge", "rpc", "fallback_rpc", "total"}
+    assert snap["stages"]["execute"]["rpc"]["count"] == 2
+    assert snap["sizes"]["compress/original"] == 2 * 1600 + 2
+
+
+def test_histogram_buckets_and_percentiles():
+    h = Histogram()
+    for ns in (500, 1_500, 1_500, 3_000_000, 10**11):
+        h.observe(ns)
+    cum = dict(h.cumulative())
+    assert cum[1_000.0] == 1 and cum[2_000.0] == 3 and cum[float("inf")] == 5
+    assert h.percentile(50) == 2_000 and h.percentile(80) == 5_000_000
+    assert h.percentile(100) == float("inf")
+
+
+def test_disabled_hooks_cost_nothing_measurable():
+    data = generate("transfer", 1200, seed=2)
+    sink = HistogramSink()
+
+    def best(**kw) -> float:
+        runs = []
+        for _ in range(5):
+            t0 = time.perf_counter()
+            for _ in range(20):
+                compress_call_data(data, TO, alg="cd", **kw)
+            runs.append(time.perf_counter() - t0)
+        return min(runs)
+
+    off, on = best(), best(sink=sink)
+    print(f"cd 1.2 KB x20: no sink {off * 1e3:.2f} ms, HistogramSink {on * 1e3:.2f} ms")
+    assert sink.histogram("compress").count == 100
@@ -19,3 +19,15 @@ def test_jit_suffix_and_nonempty():
     # Known trailer from implementation (JIT epilogue)
     assert bc.endswith("345f355af13d5f5f3e3d5ff3")
     print(f"JIT bytecode: bytes={(len(bc) - 2) // 2} gen_ms={(t1 - t0) * 1000:.3f}")
+
+
+def test_jit_data_section_for_dense_words():
+    # Three incompressible words in a row are copied from a trailing data section
+    data = bytes.fromhex("12345678") + os.urandom(96) + (7).to_bytes(32, "big")
+    h = _hex(data)
+    plain = jit_bytecode(h)
+    bc = jit_bytecode(h, data_section=True)
+    assert plain.endswith("345f355af13d5f5f3e3d5ff3")
+    assert len(bc) < len(plain)
+    assert bc.endswith(data[4:100].hex())
+    print(f"JIT data section: bytes={(len(bc) - 2) // 2} plain={(len(plain) - 2) // 2}")
@@ -0,0 +1,82 @@
+import re
+from wsgiref.util import setup_testing_defaults
+
+from ethcompress.metrics import CONTENT_TYPE, PrometheusMetrics
+from ethcompress.middleware import CompressionMiddleware
+
+TO = "0x" + "AB" * 20
+LINE = re.compile(r'^[a-z_]+(\{([a-z]+="[^"]*",?)*\})? [0-9.e+-]+(Inf)?$')
+
+
+class W3:
+    def __init__(self, fail_compressed: bool = False):
+        self.provider = self
+        self.fail_compressed = fail_compressed
+
+    def make_request(self, method, params):
+        if len(params) >= 3 and self.fail_compressed:
+            return {"error": {"code": -32000, "message": "simulated error"}}
+        return {"result": "0x01"}
+
+
+def _samples(text: str) -> dict[str, float]:
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            assert LINE.match(line), line
+            key, value = line.rsplit(" ", 1)
+            out[key] = float(value)
+    return out
+
+
+def test_prometheus_exposition_from_middleware():
+    metrics = PrometheusMetrics()
+    data = "0x" + "00" * 1600
+    ok, failing = W3(), W3(fail_compressed=True)
+    for w3 in (ok, ok, failing):
+        mw = CompressionMiddleware(alg="cd", sink=metrics)(w3.make_request, w3)
+        mw("eth_call", [{"to": TO, "data": data}, "latest"])
+    mw("eth_call", [{"to": TO, "data": "0x1234"}, "latest"])
+
+    text = metrics.render()
+    assert "# TYPE ethcompress_rpc_seconds histogram" in text
+    s = _samples(text)
+    t = TO.lower()
+    assert s[f'ethcompress_requests_total{{algo="cd",target="{t}"}}'] == 3
+    assert s[f'ethcompress_requests_total{{algo="vanilla",target="{t}"}}'] == 1
+    assert s[f'ethcompress_override_failures_total{{algo="cd",target="{t}"}}'] == 1
+    assert s[f'ethcompress_fallbacks_total{{reason="rpc_error",target="{t}"}}'] == 1
+    assert s[f'ethcompress_fallbacks_total{{reason="below_min_size",target="{t}"}}'] == 1
+    assert s[f'ethcompress_original_bytes_total{{algo="cd",target="{t}"}}'] == 3 * 1600
+    saved = s[f'ethcompress_saved_bytes_total{{algo="cd",target="{t}"}}']
+    assert 0 < saved < 2 * 1600
+    assert s[f'ethcompress_compression_ratio_count{{algo="cd",target="{t}"}}'] == 2
+    assert s[f'ethcompress_compression_ratio_bucket{{algo="cd",target="{t}",le="+Inf"}}'] == 2
+    assert s[f'ethcompress_rpc_seconds_count{{algo="cd",target="{t}"}}'] == 3
+    assert f'ethcompress_compress_seconds_bucket{{algo="cd",target="{t}",le="1e-06"}}' in s
+
+
+def test_target_cardinality_is_capped(tmp_path):
+    metrics = PrometheusMetrics(namespace="app", max_targets=2)
+    w3 = W3()
+    mw = CompressionMiddleware(sink=metrics)(w3.make_request, w3)
+    for i in range(4):
+        mw("eth_call", [{"to": "0x" + f"{i:040x}", "data": "0x12"}, "latest"])
+    s = _samples(metrics.render())
+    targets = {k.split('target="')[1].split('"')[0] for k in s if k.startswith("app_requests")}
+    assert targets == {f"0x{0:040x}", f"0x{1:040x}", "other"}
+
+    path = tmp_path / "ethcompress.prom"
+    metrics.write(path)
+    assert path.read_text() == metrics.render()
+    assert [p.name for p in tmp_path.iterdir()] == ["ethcompress.prom"]
+
+
+def test_wsgi_handler_serves_exposition():
+    metrics = PrometheusMetrics()
+    environ: dict = {}
+    setup_testing_defaults(environ)
+    seen = []
+    body = b"".join(metrics.wsgi(environ, lambda status, headers: seen.append((status, headers))))
+    assert seen[0][0] == "200 OK" and ("Content-Type", CONTENT_TYPE) in seen[0][1]
+    assert body.decode() == metrics.render()
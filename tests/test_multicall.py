@@ -0,0 +1,334 @@
+import asyncio
+import os
+import random
+import time
+
+from eth_abi import decode, encode
+import pytest
+from requests.exceptions import HTTPError
+from web3 import HTTPProvider, Web3
+
+from compressions.aggregate import agg_compress, agg_decompress
+from ethcompress import HistogramSink, compress_eth_call
+from ethcompress.middleware import AsyncCompressionMiddleware, CompressionMiddleware
+from ethcompress.multicall import (
+    compress_aggregate,
+    decode_aggregate,
+    decode_aggregate3,
+    decode_try_aggregate,
+    estimate_gas,
+    execute_aggregate,
+    request_bytes,
+    split_aggregate,
+)
+from ethcompress.provider import CompressingHTTPProvider
+from ethcompress.testing import (
+    ECHO_ADDRESS,
+    MULTICALL3_ADDRESS,
+    EVMProvider,
+    NetworkProfile,
+    RPCServer,
+)
+
+AGGREGATE = bytes.fromhex("252dba42")
+
+
+def test_decode_aggregate_slices_the_response_buffer():
+    blobs = [b"", os.urandom(1), os.urandom(32), os.urandom(100)]
+    raw = encode(["uint256", "bytes[]"], [1234, blobs])
+    block, results = decode_aggregate(raw)
+    assert block == 1234 and len(results) == 4
+    assert all(isinstance(r, memoryview) and r.obj is raw for r in results)
+    assert results.tobytes() == list(decode(["uint256", "bytes[]"], raw)[1])
+    assert bytes(results[-1]) == blobs[-1] and [bytes(r) for r in results[1:3]] == blobs[1:3]
+    assert results.successes() == [True] * 4
+    words = [int.from_bytes(b[:32], "big") for b in blobs[2:]]
+    assert results.uint256() == [None, None, *words]
+    assert decode_aggregate("0x" + raw.hex())[1].tobytes() == blobs
+    with pytest.raises(IndexError):
+        results[4]
+
+
+def test_decode_try_aggregate_reports_failures():
+    entries = [(True, (7).to_bytes(32, "big")), (False, b"\x08\xc3\x79\xa0"), (True, b"")]
+    raw = encode(["(bool,bytes)[]"], [entries])
+    for decoder in (decode_try_aggregate, decode_aggregate3):
+        results = decoder(raw)
+        assert [bytes(r) for r in results] == [d for _, d in entries]
+        assert results.successes() == [True, False, True]
+        assert results.uint256() == [7, None, None]
+    assert decode_aggregate3(encode(["(bool,bytes)[]"], [[]])).uint256() == []
+
+
+def test_decode_rejects_truncated_results():
+    raw = encode(["uint256", "bytes[]"], [1, [os.urandom(64)] * 3])
+    with pytest.raises(ValueError):
+        decode_aggregate(raw[:100])
+    _, results = decode_aggregate(raw[:-64])
+    with pytest.raises(ValueError):
+        results[2]
+
+
+def test_uint256_bulk_path_beats_codec_decode():
+    balances = [int.from_bytes(os.urandom(32), "big") for _ in range(5000)]
+    raw = encode(["uint256", "bytes[]"], [1, [b.to_bytes(32, "big") for b in balances]])
+    raw3 = encode(["(bool,bytes)[]"], [[(True, b.to_bytes(32, "big")) for b in balances]])
+    w3 = Web3()
+
+    t0 = time.perf_counter()
+    _, blobs = w3.codec.decode(["uint256", "bytes[]"], raw)
+    expected = [int.from_bytes(b, "big") for b in blobs]
+    codec_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    got = decode_aggregate(raw)[1].uint256()
+    bulk_s = time.perf_counter() - t0
+    assert got == expected == balances
+    assert decode_aggregate3(raw3).uint256() == balances
+    assert decode_aggregate3(raw3)._regular() is not None
+    print(f"\n5000 balances: codec {codec_s * 1e3:.1f} ms, bulk {bulk_s * 1e3:.1f} ms")
+    assert bulk_s * 5 < codec_s
+
+
+def test_decode_streamed_multicall_result():
+    calls = [(ECHO_ADDRESS, os.urandom(32)) for _ in range(200)]
+    data = "0x" + (AGGREGATE + encode(["(address,bytes)[]"], [calls])).hex()
+    with RPCServer() as srv:
+        provider = CompressingHTTPProvider(srv.url, stream_results=True)
+        raw = provider.make_request(
+            "eth_call", [{"to": MULTICALL3_ADDRESS, "data": data}, "latest"]
+        )
+    block, results = decode_aggregate(raw["result"])
+    assert block >= 0 and results.tobytes() == [d for _, d in calls]
+    assert results.uint256() == [int.from_bytes(d, "big") for _, d in calls]
+
+
+def test_agg_stream_rebuilds_the_abi_encoding():
+    targets = [os.urandom(20) for _ in range(3)]
+    calls = [(targets[i % 3], bytes.fromhex("70a08231") + os.urandom(i % 70)) for i in range(40)]
+    expected = "0x" + (AGGREGATE + encode(["(address,bytes)[]"], [calls])).hex()
+    stream = agg_compress(calls)
+    assert agg_decompress(stream) == expected
+    assert (len(stream) - 2) // 2 < (len(expected) - 2) // 4
+    with pytest.raises(ValueError):
+        agg_compress([(targets[0], b"\x01")])
+    with pytest.raises(ValueError):
+        agg_compress([(os.urandom(20), b"\x01\x02\x03\x04") for _ in range(256)])
+
+
+def test_compress_aggregate_executes_through_multicall3():
+    calls = [(ECHO_ADDRESS, "0x" + os.urandom(4 + i % 90).hex()) for i in range(60)]
+    sink = HistogramSink()
+    with RPCServer() as srv:
+        w3 = Web3(Web3.HTTPProvider(srv.url))
+        vanilla = compress_aggregate(calls, min_size=10**9)
+        assert vanilla.algo == "vanilla" and vanilla.to == MULTICALL3_ADDRESS
+        expected = vanilla.execute(w3)
+        for alg in ("agg", "agg-flz"):
+            cc = compress_aggregate(calls, alg=alg, min_size=0, sink=sink)
+            assert cc.algo == alg and cc.sizes["compressed"] < cc.sizes["original"] // 2
+            assert cc.execute(w3) == expected
+            assert srv.provider.calls[-1].override
+    assert decode_aggregate(expected)[1].tobytes() == [bytes.fromhex(d[2:]) for _, d in calls]
+    algos = sink.snapshot()["algos"]
+    assert algos["compress/agg"] == algos["execute/agg-flz"] == 1
+
+
+def test_compress_aggregate_falls_back_to_generic_codecs():
+    calls = [("0x" + os.urandom(20).hex(), "0x70a08231" + "00" * 32) for _ in range(300)]
+    assert compress_aggregate(calls).algo not in ("agg", "agg-flz", "vanilla")
+    with pytest.raises(ValueError):
+        compress_aggregate(calls, alg="agg")
+    with pytest.raises(ValueError):
+        compress_aggregate(calls, alg="flz")
+
+
+def test_compress_aggregate_beats_encode_then_compress():
+    rng = random.Random(1)
+    tokens = ["0x" + rng.randbytes(20).hex() for _ in range(64)]
+    owner = rng.randbytes(20).hex().rjust(64, "0")
+    calls = [(rng.choice(tokens), "0x70a08231" + owner) for _ in range(500)]
+    w3 = Web3()
+
+    t0 = time.perf_counter()
+    args = [(t, bytes.fromhex(d[2:])) for t, d in calls]
+    data = AGGREGATE + w3.codec.encode(["(address,bytes)[]"], [args])
+    generic = compress_eth_call(MULTICALL3_ADDRESS, data)
+    generic_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    direct = compress_aggregate(calls)
+    direct_s = time.perf_counter() - t0
+
+    def total(cc):
+        return cc.sizes["compressed"] + cc.sizes["code"]
+
+    print(
+        f"\n500 balanceOf: {generic.algo} {total(generic)} B {generic_s * 1e3:.1f} ms, "
+        f"{direct.algo} {total(direct)} B {direct_s * 1e3:.1f} ms"
+    )
+    assert total(direct) < total(generic)
+    assert direct_s * 5 < generic_s
+
+
+def _echo_calls(n: int) -> list[tuple[str, str]]:
+    return [(ECHO_ADDRESS, "0x70a08231" + os.urandom(32).hex()) for _ in range(n)]
+
+
+def test_split_aggregate_balances_chunks_within_budgets():
+    calls = _echo_calls(400)
+    ((n, whole),) = split_aggregate(calls)
+    assert n == 400 and request_bytes(whole) > 8192
+    chunks = split_aggregate(calls, max_request_bytes=8192)
+    counts = [n for n, _ in chunks]
+    assert sum(counts) == 400 and max(counts) - min(counts) <= 1
+    assert all(request_bytes(cc) <= 8192 for _, cc in chunks)
+    chunks = split_aggregate(calls, max_gas=500_000, gas_per_call=2_000)
+    assert len(chunks) > 1 and all(estimate_gas(cc, n, 2_000) <= 500_000 for n, cc in chunks)
+    # A single call over budget goes out alone
+    assert [n for n, _ in split_aggregate(calls[:3], max_request_bytes=1)] == [1, 1, 1]
+
+
+def test_execute_aggregate_fits_request_size_and_gas_limits():
+    calls = _echo_calls(400)
+    expected = [bytes.fromhex(d[2:]) for _, d in calls]
+    with RPCServer(profile=NetworkProfile(max_request_bytes=8192)) as srv:
+        w3 = Web3(HTTPProvider(srv.url))
+        with pytest.raises(HTTPError):
+            execute_aggregate(calls, w3)
+        t0 = time.perf_counter()
+        block, results = execute_aggregate(calls, w3, max_request_bytes=8192)
+        elapsed = time.perf_counter() - t0
+        assert block == w3.eth.block_number and [bytes(r) for r in results] == expected
+        print(f"\n400 calls in {len(srv.provider.calls)} chunks: {elapsed * 1e3:.0f} ms")
+
+    with RPCServer(EVMProvider(gas=600_000)) as srv:
+        w3 = Web3(HTTPProvider(srv.url))
+        # Unsplit, the compressed call runs out of gas and is retried vanilla
+        execute_aggregate(calls, w3)
+        assert [c.override for c in srv.provider.calls] == [True, False]
+        del srv.provider.calls[:]
+        _, results = execute_aggregate(calls, w3, max_gas=600_000, gas_per_call=2_000)
+        assert [bytes(r) for r in results] == expected
+        assert len(srv.provider.calls) > 1 and all(c.override for c in srv.provider.calls)
+
+
+def test_middleware_splits_oversize_aggregate_calls():
+    calls = _echo_calls(300)
+    args = [(t, bytes.fromhex(d[2:])) for t, d in calls]
+    data = "0x" + (AGGREGATE + encode(["(address,bytes)[]"], [args])).hex()
+    sink = HistogramSink()
+    with RPCServer(profile=NetworkProfile(max_request_bytes=8192)) as srv:
+        w3 = Web3(HTTPProvider(srv.url))
+        w3.middleware_onion.add(CompressionMiddleware(max_request_bytes=8192, sink=sink))
+        raw = w3.eth.call({"to": MULTICALL3_ADDRESS, "data": data})
+        assert decode_aggregate(raw)[1].tobytes() == [d for _, d in args]
+        assert len(srv.provider.calls) > 1 and all(c.override for c in srv.provider.calls)
+    assert sink.snapshot()["algos"]["middleware/agg"] == 1
+
+
+class _W3:
+    def __init__(self, provider):
+        self.provider = provider
+
+
+def _aggregate_tx(calls) -> dict[str, str]:
+    args = [(t, bytes.fromhex(d[2:])) for t, d in calls]
+    data = AGGREGATE + encode(["(address,bytes)[]"], [args])
+    return {"to": MULTICALL3_ADDRESS, "data": "0x" + data.hex()}
+
+
+def test_middleware_sends_the_encoding_checked_against_the_budget():
+    rng = random.Random(2)
+    owner = rng.randbytes(20).hex().rjust(64, "0")
+    tokens = [ECHO_ADDRESS] + ["0x" + rng.randbytes(20).hex() for _ in range(7)]
+    calls = [(rng.choice(tokens), "0x70a08231" + owner) for _ in range(60)]
+    tx = _aggregate_tx(calls)
+    ((_, planned),) = split_aggregate(calls, max_request_bytes=1900)
+    generic = compress_eth_call(MULTICALL3_ADDRESS, tx["data"])
+    assert request_bytes(planned) <= 1900 < request_bytes(generic)
+
+    provider = EVMProvider()
+    sent = []
+
+    def make_request(method, params):
+        sent.append(params)
+        return provider.make_request(method, params)
+
+    mw = CompressionMiddleware(max_request_bytes=1900)
+    res = mw(make_request, _W3(provider))("eth_call", [tx, "latest"])
+    assert res["result"] == provider.make_request("eth_call", [tx, "latest"])["result"]
+    ((call, _, override),) = sent
+    assert call == {"to": planned.to, "data": planned.data} and override == planned.override
+
+
+def test_middleware_split_reuses_its_pool_and_survives_errors():
+    calls = _echo_calls(300)
+    tx = _aggregate_tx(calls)
+    provider = EVMProvider()
+    expected = provider.make_request("eth_call", [tx, "latest"])["result"]
+    pin_fails = False
+
+    def make_request(method, params):
+        if method == "eth_blockNumber" and pin_fails:
+            return {"jsonrpc": "2.0", "id": 1, "error": {"code": -32000, "message": "busy"}}
+        return provider.make_request(method, params)
+
+    sink = HistogramSink()
+    mw = CompressionMiddleware(max_request_bytes=4096, concurrency=4, sink=sink)
+    middleware = mw(make_request, _W3(provider))
+    del provider.calls[:]
+    assert middleware("eth_call", [tx, "latest"])["result"] == expected
+    pool = mw._pool
+    assert pool is not None and len(provider.calls) > 1
+    assert middleware("eth_call", [tx, "latest"])["result"] == expected
+    assert mw._pool is pool
+
+    # A failure while splitting sends the call whole instead
+    pin_fails = True
+    del provider.calls[:]
+    assert middleware("eth_call", [tx, "latest"])["result"] == expected
+    assert len(provider.calls) == 1
+    assert sink.snapshot()["fallbacks"] == {"middleware/split_error": 1}
+    mw.close()
+    assert mw._pool is None
+
+
+def test_middleware_splits_with_its_alg_and_reports_planning_errors():
+    calls = _echo_calls(300)
+    tx = _aggregate_tx(calls)
+    provider = EVMProvider()
+    expected = provider.make_request("eth_call", [tx, "latest"])["result"]
+
+    for alg, algo in (("flz", "agg-flz"), ("cd", "cd"), ("auto", "agg")):
+        sink = HistogramSink()
+        mw = CompressionMiddleware(alg=alg, max_request_bytes=4096, sink=sink)
+        del provider.calls[:]
+        res = mw(provider.make_request, _W3(provider))("eth_call", [tx, "latest"])
+        assert res["result"] == expected
+        assert len(provider.calls) > 2 and all(c.override for c in provider.calls)
+        assert sink.snapshot()["algos"][f"middleware/{algo}"] == 1
+
+    # agg-flz needs a selector per call: planning raises and the call goes out whole
+    selectorless = _aggregate_tx([*calls[:40], (ECHO_ADDRESS, "0x")])
+    expected = provider.make_request("eth_call", [selectorless, "latest"])["result"]
+    sink = HistogramSink()
+    mw = CompressionMiddleware(alg="flz", max_request_bytes=4096, sink=sink)
+    del provider.calls[:]
+    res = mw(provider.make_request, _W3(provider))("eth_call", [selectorless, "latest"])
+    assert res["result"] == expected and [c.override for c in provider.calls] == [True]
+    assert sink.snapshot()["fallbacks"] == {"middleware/split_error": 1}
+
+
+def test_async_middleware_splits_oversize_aggregate_calls():
+    calls = _echo_calls(300)
+    tx = _aggregate_tx(calls)
+    provider = EVMProvider()
+    expected = provider.make_request("eth_call", [tx, "latest"])["result"]
+    del provider.calls[:]
+
+    async def make_request(method, params):
+        return provider.make_request(method, params)
+
+    mw = AsyncCompressionMiddleware(max_request_bytes=4096)
+    res = asyncio.run(mw(make_request, _W3(provider))("eth_call", [tx, "latest"]))
+    assert res["result"] == expected
+    assert len(provider.calls) > 1 and all(c.override for c in provider.calls)
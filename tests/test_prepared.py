@@ -0,0 +1,91 @@
+import json
+import time
+
+import pytest
+from web3 import HTTPProvider, Web3
+
+from ethcompress import compress_eth_call
+from ethcompress.testing import ECHO_ADDRESS, EVMProvider, RPCServer, generate
+
+
+def test_prepared_body_matches_execute_request():
+    data = generate("aggregate", 4000, seed=5)
+    cc = compress_eth_call(ECHO_ADDRESS, data, alg="jit")
+    prepared = cc.prepare()
+    body = json.loads(prepared.body(17_000_000, request_id=9))
+    assert body == {
+        "jsonrpc": "2.0",
+        "method": "eth_call",
+        "params": [{"to": cc.to, "data": cc.data}, hex(17_000_000), cc.override],
+        "id": 9,
+    }
+    vanilla = json.loads(prepared.vanilla_body("latest"))
+    assert vanilla["params"] == [{"to": ECHO_ADDRESS, "data": data}, "latest"]
+
+
+def test_prepared_execute_over_http_and_in_process():
+    data = generate("transfer", 3000, seed=6)
+    prepared = compress_eth_call(ECHO_ADDRESS, data, alg="flz").prepare()
+    with RPCServer() as srv:
+        w3 = Web3(HTTPProvider(srv.url))
+        assert [prepared.execute(w3, b) for b in ("latest", 1, 2)] == [data] * 3
+        assert all(c.override for c in srv.provider.calls)
+    assert prepared.execute(Web3(EVMProvider()), 5) == data
+
+
+def test_prepared_posts_raw_bodies_only_through_http_provider():
+    class LookAlike(EVMProvider):
+        # AsyncHTTPProvider has both attributes, and its _make_request is a coroutine
+        endpoint_uri = "http://localhost"
+
+        def _make_request(self, method, body):
+            raise AssertionError("raw post on a non-HTTPProvider")
+
+    data = generate("transfer", 3000, seed=7)
+    prepared = compress_eth_call(ECHO_ADDRESS, data, alg="flz").prepare()
+    provider = LookAlike()
+    assert prepared.execute(Web3(provider)) == data
+    assert provider.calls[-1].override
+
+
+def test_prepared_fallback_semantics():
+    class W3:
+        def __init__(self):
+            self.provider = self
+            self.params = []
+
+        def make_request(self, method, params):
+            self.params.append(params)
+            if len(params) == 3:
+                return {"error": {"code": -32000, "message": "override not supported"}}
+            return {"result": "0xabcd"}
+
+    cc = compress_eth_call("0x" + "33" * 20, "0x" + "00" * 1600, alg="cd")
+    w3 = W3()
+    assert cc.prepare().execute(w3, 7) == "0xabcd"
+    assert [len(p) for p in w3.params] == [3, 2] and w3.params[1][1] == "0x7"
+
+    cc.allow_fallback = False
+    with pytest.raises(RuntimeError, match="fallback disabled"):
+        cc.prepare().execute(W3())
+
+
+def test_prepared_body_is_cheaper_than_encoding():
+    cc = compress_eth_call(ECHO_ADDRESS, generate("aggregate", 8000, seed=7), alg="jit")
+    prepared = cc.prepare()
+    provider = HTTPProvider("http://127.0.0.1:1")
+
+    def best(fn) -> float:
+        runs = []
+        for _ in range(5):
+            t0 = time.perf_counter()
+            for _ in range(200):
+                fn()
+            runs.append(time.perf_counter() - t0)
+        return min(runs) / 200
+
+    tx = {"to": cc.to, "data": cc.data}
+    encoded = best(lambda: provider.encode_rpc_request("eth_call", [tx, "latest", cc.override]))
+    joined = best(lambda: prepared.body("latest"))
+    print(f"8 KB jit request: web3 encode {encoded * 1e6:.1f} us, prepared {joined * 1e6:.1f} us")
+    assert joined < encoded
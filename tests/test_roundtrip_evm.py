@@ -1,8 +1,8 @@
 """
 Roundtrip compression tests using py-evm against real data.
 
-Tests JIT, FLZ, and CD compression algorithms by:
-1. Loading real transactions from base-blocks.json
+Tests JIT, FLZ, FLZ64K, CD and WD compression algorithms by:
+1. Loading real transactions from base-blocks.json (or the seeded synthetic corpus)
 2. Compressing the calldata with each algorithm
 3. Executing the compressed call in EVM with state override
 4. Verifying the result matches the original calldata
@@ -13,12 +13,14 @@ from __future__ import annotations
 from dataclasses import dataclass
 import json
 from pathlib import Path
+import random
 import time
 from typing import Any
 
 import pytest
 
-from ethcompress import cd_compress, flz_compress, jit_bytecode
+from ethcompress import cd_compress, flz64k_compress, flz_compress, jit_bytecode, wd_compress
+from ethcompress.testing import corpus
 
 from .evm_helpers import (
     DECOMPRESSOR_ADDRESS as DECOMPRESSOR_ADDRESS_BYTES,
@@ -60,6 +62,16 @@ class CompressionMetrics:
     cd_ratio: float | None = None
     cd_gas_used: int | None = None
     cd_roundtrip_success: bool = False
+    wd_bytes: int | None = None
+    wd_code_bytes: int | None = None
+    wd_ratio: float | None = None
+    wd_gas_used: int | None = None
+    wd_roundtrip_success: bool = False
+    flz64k_bytes: int | None = None
+    flz64k_code_bytes: int | None = None
+    flz64k_ratio: float | None = None
+    flz64k_gas_used: int | None = None
+    flz64k_roundtrip_success: bool = False
     failures: list[dict[str, Any]] | None = None
 
 
@@ -227,6 +239,110 @@ def _test_transaction_roundtrip(tx: Transaction, tx_index: int, chain) -> Compre
             }
         )
 
+    # Test WD (word dictionary) compression
+    try:
+        wd_calldata = wd_compress(original_calldata)
+        wd_bytes = (len(wd_calldata) - 2) // 2
+
+        # Generate word dictionary forwarder bytecode - use echo contract as target
+        from compressions.worddict import wd_fwd_bytecode
+
+        echo_addr_hex = "0x" + ECHO_CONTRACT_ADDRESS.hex()
+        wd_code = wd_fwd_bytecode(echo_addr_hex)
+        wd_code_bytes = (len(wd_code) - 2) // 2
+
+        metrics.wd_bytes = wd_bytes
+        metrics.wd_code_bytes = wd_code_bytes
+        total_wd = wd_bytes + wd_code_bytes
+        metrics.wd_ratio = total_wd / src_bytes if src_bytes > 0 else 0
+
+        # Execute with state override
+        result, gas_used = execute_call_with_state_override(
+            chain,
+            to=DECOMPRESSOR_ADDRESS_BYTES,
+            data=hex_to_bytes(wd_calldata),
+            code_override={DECOMPRESSOR_ADDRESS_BYTES: hex_to_bytes(wd_code)},
+        )
+
+        metrics.wd_gas_used = gas_used
+        reconstructed = bytes_to_hex(result)
+
+        # Verify roundtrip
+        if reconstructed.lower() == original_calldata.lower():
+            metrics.wd_roundtrip_success = True
+        else:
+            failures.append(
+                {
+                    "algorithm": "wd",
+                    "error": "Roundtrip mismatch",
+                    "expected": original_calldata,
+                    "reconstructed": reconstructed,
+                    "payload": wd_calldata,
+                }
+            )
+    except Exception as e:
+        failures.append(
+            {
+                "algorithm": "wd",
+                "error": str(e),
+                "expected": original_calldata,
+                "reconstructed": None,
+                "payload": None,
+            }
+        )
+
+    # Test FLZ64K (wide window FastLZ) compression
+    try:
+        flz64k_calldata = flz64k_compress(original_calldata)
+        flz64k_bytes = (len(flz64k_calldata) - 2) // 2
+
+        # Generate FLZ64K forwarder bytecode - use echo contract as target
+        from compressions.fastlz import flz64k_fwd_bytecode
+
+        echo_addr_hex = "0x" + ECHO_CONTRACT_ADDRESS.hex()
+        flz64k_code = flz64k_fwd_bytecode(echo_addr_hex)
+        flz64k_code_bytes = (len(flz64k_code) - 2) // 2
+
+        metrics.flz64k_bytes = flz64k_bytes
+        metrics.flz64k_code_bytes = flz64k_code_bytes
+        total_flz64k = flz64k_bytes + flz64k_code_bytes
+        metrics.flz64k_ratio = total_flz64k / src_bytes if src_bytes > 0 else 0
+
+        # Execute with state override
+        result, gas_used = execute_call_with_state_override(
+            chain,
+            to=DECOMPRESSOR_ADDRESS_BYTES,
+            data=hex_to_bytes(flz64k_calldata),
+            code_override={DECOMPRESSOR_ADDRESS_BYTES: hex_to_bytes(flz64k_code)},
+        )
+
+        metrics.flz64k_gas_used = gas_used
+        reconstructed = bytes_to_hex(result)
+
+        # Verify roundtrip
+        if reconstructed.lower() == original_calldata.lower():
+            metrics.flz64k_roundtrip_success = True
+        else:
+            failures.append(
+                {
+                    "algorithm": "flz64k",
+                    "error": "Roundtrip mismatch",
+                    "expected": original_calldata,
+                    "reconstructed": reconstructed,
+                    "payload": flz64k_calldata,
+                }
+            )
+    except Exception as e:
+        failures.append(
+            {
+                "algorithm": "flz64k",
+                "error": str(e),
+                "expected": original_calldata,
+                "reconstructed": None,
+                "payload": None,
+            }
+        )
+
     if failures:
         metrics.failures = failures
 
@@ -239,17 +355,29 @@ def mean(values: list[float | int]) -> float:
 
 
 def test_roundtrip_on_base_blocks():
-    """Test compression roundtrips on real Base blockchain transactions."""
-    # Load the fixture
-    fixture_path = Path(__file__).parent / "fixture" / "base-blocks.json"
-    with open(fixture_path) as f:
-        cached = json.load(f)
+    """Test compression roundtrips on real Base blockchain transactions.
 
-    blocks = cached["blocks"]
+    Without the fixture, runs on the seeded synthetic corpus from ethcompress.testing.
+    """
     min_calldata_size = 800
+    all_transactions: list[Transaction] = []
+
+    fixture_path = Path(__file__).parent / "fixture" / "base-blocks.json"
+    if fixture_path.exists():
+        with open(fixture_path) as f:
+            cached = json.load(f)
+        blocks = cached["blocks"]
+        source = "Base blocks"
+    else:
+        blocks = []
+        source = "synthetic corpus"
+        for sample in corpus(32, seed=7, min_size=min_calldata_size // 2, max_size=8000):
+            if len(sample.data) >= min_calldata_size:
+                all_transactions.append(
+                    Transaction(from_addr="0x" + "00" * 20, to=sample.to, input=sample.data)
+                )
 
     # Collect transactions with significant calldata
-    all_transactions: list[Transaction] = []
     for block in blocks:
         if "transactions" in block and isinstance(block["transactions"], list):
             for tx in block["transactions"]:
@@ -270,10 +398,10 @@ def test_roundtrip_on_base_blocks():
     # Limit to first 10 transactions for performance
     all_transactions = all_transactions[:200]
 
-    print(f"\nTesting {len(all_transactions)} transactions from Base blocks...")
+    print(f"\nTesting {len(all_transactions)} transactions from {source}...")
 
     results: list[CompressionMetrics] = []
-    success_cnt = {"jit": 0, "flz": 0, "cd": 0}
+    success_cnt = {"jit": 0, "flz": 0, "cd": 0, "wd": 0, "flz64k": 0}
     all_failures: list[dict[str, Any]] = []
 
     start_time = time.time()
@@ -292,6 +420,10 @@ def test_roundtrip_on_base_blocks():
             success_cnt["flz"] += 1
         if metrics.cd_roundtrip_success:
             success_cnt["cd"] += 1
+        if metrics.wd_roundtrip_success:
+            success_cnt["wd"] += 1
+        if metrics.flz64k_roundtrip_success:
+            success_cnt["flz64k"] += 1
 
         if metrics.failures:
             all_failures.extend([{**f, "txIndex": i} for f in metrics.failures])
@@ -327,10 +459,14 @@ def test_roundtrip_on_base_blocks():
     jit_ratios = [r.jit_ratio for r in results if r.jit_ratio is not None]
     flz_ratios = [r.flz_ratio for r in results if r.flz_ratio is not None]
     cd_ratios = [r.cd_ratio for r in results if r.cd_ratio is not None]
+    wd_ratios = [r.wd_ratio for r in results if r.wd_ratio is not None]
+    flz64k_ratios = [r.flz64k_ratio for r in results if r.flz64k_ratio is not None]
 
     jit_gas = [r.jit_gas_used for r in results if r.jit_gas_used is not None]
     flz_gas = [r.flz_gas_used for r in results if r.flz_gas_used is not None]
     cd_gas = [r.cd_gas_used for r in results if r.cd_gas_used is not None]
+    wd_gas = [r.wd_gas_used for r in results if r.wd_gas_used is not None]
+    flz64k_gas = [r.flz64k_gas_used for r in results if r.flz64k_gas_used is not None]
 
     src_sizes = [r.src_bytes for r in results]
     avg_src_size = mean(src_sizes)
@@ -342,15 +478,22 @@ def test_roundtrip_on_base_blocks():
     print(
         f"{len(results)} txs | JIT: \033[32m{success_cnt['jit']}\033[0m | "
         f"FLZ: \033[32m{success_cnt['flz']}\033[0m | "
-        f"CD: \033[32m{success_cnt['cd']}\033[0m"
+        f"CD: \033[32m{success_cnt['cd']}\033[0m | "
+        f"WD: \033[32m{success_cnt['wd']}\033[0m | "
+        f"FLZ64K: \033[32m{success_cnt['flz64k']}\033[0m"
     )
     print(f"Avg Src Size: {avg_src_size:.1f} bytes")
     print(
         f"Compression Ratio: JIT {mean(jit_ratios) * 100:.1f}% | "
         f"FLZ {mean(flz_ratios) * 100:.1f}% | "
-        f"CD {mean(cd_ratios) * 100:.1f}%"
+        f"CD {mean(cd_ratios) * 100:.1f}% | "
+        f"WD {mean(wd_ratios) * 100:.1f}% | "
+        f"FLZ64K {mean(flz64k_ratios) * 100:.1f}%"
+    )
+    print(
+        f"Gas Used: JIT {mean(jit_gas):.0f} | FLZ {mean(flz_gas):.0f} | "
+        f"CD {mean(cd_gas):.0f} | WD {mean(wd_gas):.0f} | FLZ64K {mean(flz64k_gas):.0f}"
     )
-    print(f"Gas Used: JIT {mean(jit_gas):.0f} | FLZ {mean(flz_gas):.0f} | CD {mean(cd_gas):.0f}")
     print(f"Elapsed Time: {elapsed_time:.2f}s")
     print(f"{'=' * 60}\n")
 
@@ -364,4 +507,165 @@ def test_roundtrip_on_base_blocks():
     assert success_cnt["cd"] == len(results), (
         f"CD roundtrip failures: {len(results) - success_cnt['cd']}"
     )
+    assert success_cnt["wd"] == len(results), (
+        f"WD roundtrip failures: {len(results) - success_cnt['wd']}"
+    )
+    assert success_cnt["flz64k"] == len(results), (
+        f"FLZ64K roundtrip failures: {len(results) - success_cnt['flz64k']}"
+    )
     assert len(results) > 0, "No transactions were tested"
+
+
+def _aggregate_calldata(targets: list[bytes], selector: bytes) -> str:
+    """ABI encodes Multicall3.aggregate((address,bytes)[]) with one selector per target."""
+    from compressions.aggregate import aggregate_calldata
+
+    return bytes_to_hex(aggregate_calldata([(t, selector) for t in targets]))
+
+
+def _aggregate_codecs() -> dict[str, tuple[Any, dict[bytes, str]]]:
+    """Compressor and override codes per codec, all forwarding to the echo contract."""
+    from compressions.calldata import rle_fwd_bytecode
+    from compressions.fastlz import flz64k_fwd_bytecode, flz_fwd_bytecode
+    from compressions.worddict import wd_fwd_bytecode
+    from ethcompress import abi_fwd_bytecode, abi_transform
+    from ethcompress.compressor import ABI_ADDRESS
+
+    echo = "0x" + ECHO_CONTRACT_ADDRESS.hex()
+    abi_addr = hex_to_bytes(ABI_ADDRESS)
+    return {
+        "flz": (flz_compress, {DECOMPRESSOR_ADDRESS_BYTES: flz_fwd_bytecode(echo)}),
+        "wd": (wd_compress, {DECOMPRESSOR_ADDRESS_BYTES: wd_fwd_bytecode(echo)}),
+        "flz64k": (flz64k_compress, {DECOMPRESSOR_ADDRESS_BYTES: flz64k_fwd_bytecode(echo)}),
+        "abi-flz": (
+            lambda d: flz_compress(abi_transform(d)),
+            {
+                DECOMPRESSOR_ADDRESS_BYTES: flz_fwd_bytecode(ABI_ADDRESS),
+                abi_addr: abi_fwd_bytecode(echo),
+            },
+        ),
+        "abi-cd": (
+            lambda d: cd_compress(abi_transform(d)),
+            {
+                DECOMPRESSOR_ADDRESS_BYTES: rle_fwd_bytecode(ABI_ADDRESS),
+                abi_addr: abi_fwd_bytecode(echo),
+            },
+        ),
+    }
+
+
+@pytest.mark.parametrize(
+    ("codec", "n_calls", "window"),
+    [
+        # Repeat a window of real token addresses so repetition sits beyond FLZ's 8 KB window
+        ("wd", 32, 300),
+        ("wd", 400, 300),
+        ("flz64k", 32, None),
+        ("flz64k", 1200, None),
+        ("abi-flz", 32, None),
+        ("abi-flz", 300, None),
+        ("abi-cd", 300, None),
+    ],
+)
+def test_codec_roundtrip_on_aggregate_calldata(codec: str, n_calls: int, window: int | None):
+    """Each aggregate codec must roundtrip through its forwarders and hold its edge over FLZ."""
+    from .integration.addresses_data import ADDRESSES
+
+    targets = [hex_to_bytes(a) for a in ADDRESSES[:window]]
+    calldata = _aggregate_calldata(
+        [targets[i % len(targets)] for i in range(n_calls)], bytes.fromhex("95d89b41")
+    )
+    codecs = _aggregate_codecs()
+    chain = create_test_evm()
+
+    gas: dict[str, int] = {}
+    sizes: dict[str, int] = {}
+    for name in (codec, "flz"):
+        compress, codes = codecs[name]
+        payload = compress(calldata)
+        result, gas[name] = execute_call_with_state_override(
+            chain,
+            to=DECOMPRESSOR_ADDRESS_BYTES,
+            data=hex_to_bytes(payload),
+            code_override={a: hex_to_bytes(c) for a, c in codes.items()},
+        )
+        assert bytes_to_hex(result) == calldata
+        sizes[name] = (len(payload) - 2) // 2 + sum((len(c) - 2) // 2 for c in codes.values())
+
+    print(f"\n{codec.upper()} vs FLZ ({n_calls} calls): sizes={sizes} gas={gas}")
+    if codec == "wd":
+        assert gas["wd"] < gas["flz"]
+        if n_calls >= 400:
+            assert sizes["wd"] < sizes["flz"]
+    elif codec == "flz64k":
+        assert gas["flz64k"] < gas["flz"]
+        if n_calls >= 1200:
+            assert sizes["flz64k"] < sizes["flz"]
+    elif codec == "abi-flz":
+        assert sizes["abi-flz"] < sizes["flz"]
+        assert gas["abi-flz"] < gas["flz"]
+
+
+@pytest.mark.parametrize("level", [2, 3])
+def test_flz_levels_decode_with_solady_forwarder(level: int):
+    """Higher FLZ levels must stay decodable by the unchanged Solady forwarder."""
+    from compressions.fastlz import flz_fwd_bytecode
+
+    from .integration.addresses_data import ADDRESSES
+
+    targets = [hex_to_bytes(a) for a in ADDRESSES[:60]]
+    calldata = _aggregate_calldata(targets * 2, bytes.fromhex("95d89b41"))
+    flz_calldata = flz_compress(calldata, level=level)
+    flz_code = flz_fwd_bytecode("0x" + ECHO_CONTRACT_ADDRESS.hex())
+    result, _ = execute_call_with_state_override(
+        create_test_evm(),
+        to=DECOMPRESSOR_ADDRESS_BYTES,
+        data=hex_to_bytes(flz_calldata),
+        code_override={DECOMPRESSOR_ADDRESS_BYTES: hex_to_bytes(flz_code)},
+    )
+    assert bytes_to_hex(result) == calldata
+    assert len(flz_calldata) <= len(flz_compress(calldata))
+
+
+def _mixed_calldata(n_words: int, seed: int) -> str:
+    """Selector plus a seeded mix of hashes, signatures, addresses and small amounts."""
+    rng = random.Random(seed)
+    out = bytes.fromhex("12345678")
+    for _ in range(n_words):
+        r = rng.random()
+        if r < 0.3:
+            out += rng.randbytes(32)
+        elif r < 0.45:
+            out += rng.randbytes(65) + b"\x00" * 31
+        elif r < 0.7:
+            out += rng.randbytes(20).rjust(32, b"\x00")
+        else:
+            out += rng.randrange(1, 10**6).to_bytes(32, "big")
+    return bytes_to_hex(out)
+
+
+@pytest.mark.parametrize("n_words", [20, 200])
+def test_jit_data_section_roundtrip(n_words: int):
+    """The CODECOPY data section must roundtrip and never cost more than the plain JIT."""
+    calldata = _mixed_calldata(n_words, seed=n_words)
+    target_padded = "0x" + ECHO_CONTRACT_ADDRESS.hex().rjust(64, "0")
+    chain = create_test_evm()
+
+    gas: dict[str, int] = {}
+    sizes: dict[str, int] = {}
+    for name, code in (
+        ("jit", jit_bytecode(calldata)),
+        ("jitcc", jit_bytecode(calldata, data_section=True)),
+    ):
+        result, gas[name] = execute_call_with_state_override(
+            chain,
+            to=DECOMPRESSOR_ADDRESS_BYTES,
+            data=hex_to_bytes(target_padded),
+            code_override={DECOMPRESSOR_ADDRESS_BYTES: hex_to_bytes(code)},
+        )
+        assert bytes_to_hex(result) == calldata
+        sizes[name] = (len(code) - 2) // 2
+
+    print(f"\nJIT data section ({n_words} words): sizes={sizes} gas={gas}")
+    assert sizes["jitcc"] <= sizes["jit"]
+    assert gas["jitcc"] <= gas["jit"]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import random
+import time
+
+import pytest
+import requests
+from requests.exceptions import HTTPError
+from web3 import HTTPProvider, Web3
+
+from ethcompress.middleware import CompressionMiddleware
+from ethcompress.testing import ECHO_ADDRESS, NetworkProfile, RPCServer, generate
+
+
+def test_rpc_server_roundtrips_compressed_call_over_http():
+    data = generate("aggregate", 4096)
+    with RPCServer() as srv:
+        w3 = Web3(HTTPProvider(srv.url))
+        w3.eth.call({"to": ECHO_ADDRESS, "data": data})
+        vanilla = srv.bytes_in
+        w3.middleware_onion.add(CompressionMiddleware(min_size=0, allow_fallback=False))
+        assert "0x" + w3.eth.call({"to": ECHO_ADDRESS, "data": data}).hex() == data
+        assert srv.provider.calls[-1].override
+        # Compressed body on the wire is far smaller than the vanilla one
+        assert vanilla > len(data) and srv.bytes_in - vanilla < vanilla // 2
+
+
+def test_rpc_server_shapes_latency_and_bandwidth():
+    profile = NetworkProfile(rtt_ms=40, up_kbps=800)
+    # 40 ms RTT + 10 KB at 800 kbit/s = 140 ms
+    assert profile.delay(10_000, 0, random.Random(0)) == pytest.approx(0.14)
+    with RPCServer(profile=profile) as srv:
+        w3 = Web3(HTTPProvider(srv.url, cache_allowed_requests=True))
+        assert w3.eth.chain_id == 1  # primes the cached eth_chainId
+        t0 = time.perf_counter()
+        w3.eth.call({"to": ECHO_ADDRESS, "data": "0x" + "ab" * 2000})
+        assert time.perf_counter() - t0 >= 0.04 + 4000 * 8 / 800e3
+
+
+def test_rpc_server_rejects_oversized_requests():
+    with RPCServer(profile=NetworkProfile(max_request_bytes=1024)) as srv:
+        w3 = Web3(HTTPProvider(srv.url))
+        with pytest.raises(HTTPError):
+            w3.eth.call({"to": ECHO_ADDRESS, "data": "0x" + "00" * 2048})
+
+
+def test_rpc_server_answers_malformed_entries_and_provider_errors():
+    call = {"jsonrpc": "2.0", "id": 1, "method": "eth_chainId", "params": []}
+    with RPCServer() as srv:
+        batch = requests.post(srv.url, json=[call, 7, {"id": 3, "params": []}], timeout=5).json()
+        assert batch[0] == {"jsonrpc": "2.0", "id": 1, "result": "0x1"}
+        assert [r["error"]["code"] for r in batch[1:]] == [-32600, -32600]
+        assert [r["id"] for r in batch[1:]] == [None, 3]
+        for body in (b"[]", b'"eth_chainId"', b"null"):
+            reply = requests.post(srv.url, data=body, timeout=5).json()
+            assert reply["error"]["code"] == -32600
+
+        # eth_call without params makes the provider raise; the entry keeps its id
+        broken = {"jsonrpc": "2.0", "id": 9, "method": "eth_call"}
+        batch = requests.post(srv.url, json=[broken, call], timeout=5).json()
+        assert batch[0]["id"] == 9 and batch[0]["error"]["code"] == -32603
+        assert batch[1]["result"] == "0x1"
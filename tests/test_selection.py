@@ -1,4 +1,7 @@
 import os
+import random
+
+import pytest
 
 from ethcompress.compressor import DECOMPRESSOR_ADDRESS, compress_call_data
 
@@ -42,3 +45,70 @@ def test_vanilla_when_not_beneficial():
         assert to == target
         assert d.startswith("0x") and ((len(d) - 2) // 2) == len(data)
         assert override is None
+
+
+def test_auto_select_weighs_wd_on_repeated_words():
+    target = "0x000000000000000000000000000000000000dEaD"
+    # Words drawn from a small pool in shuffled order: no long matches, many repeats
+    rng = random.Random(27)
+    pool = [rng.randbytes(20).rjust(32, b"\x00") for _ in range(16)] + [b"\x00" * 32]
+    data = bytes.fromhex("252dba42") + b"".join(rng.choice(pool) for _ in range(320))
+    to, calldata, override, meta = compress_call_data(_hex(data), target, alg="auto", min_size=800)
+    assert meta["algo"] == "wd"
+    assert to == DECOMPRESSOR_ADDRESS
+    assert isinstance(override, dict) and DECOMPRESSOR_ADDRESS.lower() in override
+    assert meta["sizes"]["compressed"] == (len(calldata) - 2) // 2
+
+
+def test_auto_select_abi_flz_on_aggregate():
+    from ethcompress.compressor import ABI_ADDRESS
+
+    target = "0x000000000000000000000000000000000000dEaD"
+    # Multicall3.aggregate((address,bytes)[]) calling symbol() on random targets
+    n = 48
+    data = bytes.fromhex("252dba42") + (32).to_bytes(32, "big") + n.to_bytes(32, "big")
+    data += b"".join((32 * n + 128 * i).to_bytes(32, "big") for i in range(n))
+    for _ in range(n):
+        data += os.urandom(20).rjust(32, b"\x00") + (64).to_bytes(32, "big")
+        data += (4).to_bytes(32, "big") + bytes.fromhex("95d89b41").ljust(32, b"\x00")
+    to, _calldata, override, meta = compress_call_data(_hex(data), target, alg="auto")
+    assert meta["algo"] == "abi-flz"
+    assert to == DECOMPRESSOR_ADDRESS
+    assert isinstance(override, dict)
+    assert set(override) == {DECOMPRESSOR_ADDRESS.lower(), ABI_ADDRESS.lower()}
+    assert meta["sizes"]["code"] == sum((len(v["code"]) - 2) // 2 for v in override.values())
+
+
+def test_auto_select_keeps_smaller_jit_variant():
+    target = "0x000000000000000000000000000000000000dEaD"
+    # Runs of hashes between addresses and small amounts: both JIT variants apply
+    rng = random.Random(29)
+    data = bytes.fromhex("12345678")
+    for _ in range(120):
+        r = rng.random()
+        if r < 0.3:
+            data += rng.randbytes(32)
+        elif r < 0.6:
+            data += rng.randbytes(20).rjust(32, b"\x00")
+        else:
+            data += rng.randrange(1, 10**6).to_bytes(32, "big")
+    totals = {}
+    for alg in ("jit", "jitcc"):
+        meta = compress_call_data(_hex(data), target, alg=alg)[3]
+        totals[alg] = meta["sizes"]["compressed"] + meta["sizes"]["code"]
+    meta = compress_call_data(_hex(data), target, alg="auto")[3]
+    assert meta["algo"] == min(totals, key=lambda a: (totals[a], a))
+    assert meta["sizes"]["compressed"] + meta["sizes"]["code"] == min(totals.values())
+
+
+def test_build_call_data_forces_codec_without_benefit_check():
+    from ethcompress import build_call_data
+
+    target = "0x000000000000000000000000000000000000dEaD"
+    data = _hex(os.urandom(900))
+    assert compress_call_data(data, target, alg="flz")[3]["algo"] == "vanilla"
+    calldata, override = build_call_data(data, target, "flz")
+    assert set(override) == {DECOMPRESSOR_ADDRESS.lower()}
+    assert (len(calldata) - 2) // 2 > 900
+    with pytest.raises(ValueError):
+        build_call_data(data, target, "zstd")
@@ -0,0 +1,219 @@
+import asyncio
+import os
+import time
+
+from eth_abi import encode
+import pytest
+from web3 import HTTPProvider, Web3
+
+from compressions.utils import revert_on_failure
+from ethcompress import HistogramSink, build_call_data
+from ethcompress.middleware import (
+    DECOMPRESSOR_ADDRESS,
+    SIMULATE_ALGORITHMS,
+    AsyncCompressionMiddleware,
+    CompressionMiddleware,
+)
+from ethcompress.testing import ECHO_ADDRESS, MULTICALL3_ADDRESS, EVMProvider, RPCServer
+
+AGGREGATE = bytes.fromhex("252dba42")
+# Reverts with its calldata / returns msg.sender
+REVERTER = "0x" + "52" * 20
+REVERTER_CODE = "0x365f5f37365ffd"
+WHOAMI = "0x" + "57" * 20
+WHOAMI_CODE = "0x335f5260205ff3"
+
+
+def _echo(n: int = 2560) -> dict[str, str]:
+    return {"to": ECHO_ADDRESS, "data": "0x" + os.urandom(64).hex() * (n // 64)}
+
+
+def _aggregate(n: int = 40) -> dict[str, str]:
+    calls = [(ECHO_ADDRESS, b"\x70\xa0\x82\x31" + bytes(28) + os.urandom(4)) for _ in range(n)]
+    data = AGGREGATE + encode(["(address,bytes)[]"], [calls])
+    return {"to": MULTICALL3_ADDRESS, "data": "0x" + data.hex()}
+
+
+def _return_data(res) -> list[list[str]]:
+    return [[c["returnData"] for c in b["calls"]] for b in res["result"]]
+
+
+class W3:
+    def __init__(self, provider):
+        self.provider = provider
+
+
+def test_simulate_compresses_calls_and_installs_forwarders_once_per_block():
+    payload = {
+        "blockStateCalls": [
+            {"calls": [_echo(), _echo(), _aggregate()]},
+            {"calls": [_echo(), {"to": ECHO_ADDRESS}, _echo(100)]},
+        ]
+    }
+    provider = EVMProvider()
+    sink = HistogramSink()
+    sent = []
+
+    def make_request(method, params):
+        sent.append(params)
+        return provider.make_request(method, params)
+
+    middleware = CompressionMiddleware(sink=sink, compress_simulate=True)(
+        make_request, W3(provider)
+    )
+    t0 = time.perf_counter()
+    vanilla = provider.make_request("eth_simulateV1", [payload, "latest"])
+    vanilla_s = time.perf_counter() - t0
+    del provider.calls[:]
+    t0 = time.perf_counter()
+    res = middleware("eth_simulateV1", [payload, "latest"])
+    compressed_s = time.perf_counter() - t0
+
+    assert _return_data(res) == _return_data(vanilla)
+    assert [c["status"] for b in res["result"] for c in b["calls"]] == ["0x1"] * 6
+    first, second = sent[-1][0]["blockStateCalls"]
+    # One forwarder per distinct target, one address per forwarder
+    assert len(first["stateOverrides"]) == 2 and len(second["stateOverrides"]) == 1
+    to = [c["to"] for c in first["calls"]]
+    assert to[0] == to[1] != to[2] and set(to) == set(first["stateOverrides"])
+    assert second["calls"][1:] == payload["blockStateCalls"][1]["calls"][1:]
+    assert [r.override for r in provider.calls] == [True] * 6
+    (algo,) = (k for k in sink.snapshot()["algos"] if k.startswith("middleware/"))
+    assert algo.split("/")[1] in SIMULATE_ALGORITHMS
+    print(
+        f"\nsimulate 6 calls: vanilla {vanilla_s * 1e3:.0f} ms, "
+        f"middleware {compressed_s * 1e3:.0f} ms"
+    )
+
+
+def test_simulate_keeps_caller_overrides_and_skips_small_requests():
+    code = "0x5f5ff3"
+    other = "0x" + "22" * 20
+    payload = {"blockStateCalls": [{"stateOverrides": {other: {"code": code}}, "calls": [_echo()]}]}
+    with RPCServer() as srv:
+        w3 = Web3(HTTPProvider(srv.url))
+        w3.middleware_onion.add(CompressionMiddleware(compress_simulate=True))
+        res = w3.eth.simulate_v1(payload, "latest")
+        assert bytes(res[0]["calls"][0]["returnData"]) == bytes.fromhex(
+            payload["blockStateCalls"][0]["calls"][0]["data"][2:]
+        )
+        assert srv.provider.calls[-1].override
+
+        small = {"blockStateCalls": [{"calls": [_echo(128)]}]}
+        w3.eth.simulate_v1(small, "latest")
+        assert not srv.provider.calls[-1].override
+
+
+def test_simulate_falls_back_to_vanilla_when_a_forwarder_fails():
+    payload = {"blockStateCalls": [{"calls": [_echo(8192)]}]}
+    sink = HistogramSink()
+    with RPCServer(EVMProvider(gas=30_000)) as srv:
+        w3 = Web3(HTTPProvider(srv.url))
+        w3.middleware_onion.add(CompressionMiddleware(sink=sink, compress_simulate=True))
+        res = w3.eth.simulate_v1(payload, "latest")
+        assert bytes(res[0]["calls"][0]["returnData"]) == bytes.fromhex(
+            payload["blockStateCalls"][0]["calls"][0]["data"][2:]
+        )
+        assert [c.override for c in srv.provider.calls] == [True, False]
+    assert sink.snapshot()["fallbacks"] == {"middleware/rpc_error": 1}
+
+
+def test_async_middleware_compresses_simulate_calls():
+    payload = {"blockStateCalls": [{"calls": [_echo(), _echo()]}]}
+    provider = EVMProvider()
+
+    async def make_request(method, params):
+        return provider.make_request(method, params)
+
+    middleware = AsyncCompressionMiddleware(compress_simulate=True)(make_request, W3(provider))
+    res = asyncio.run(middleware("eth_simulateV1", [payload, "latest"]))
+    expected = [[c["data"] for c in payload["blockStateCalls"][0]["calls"]]]
+    assert _return_data(res) == expected
+    assert [c.override for c in provider.calls] == [True, True]
+
+
+def _recording(provider):
+    sent = []
+
+    def make_request(method, params):
+        sent.append(params)
+        return provider.make_request(method, params)
+
+    return sent, make_request
+
+
+def _status(res) -> list[str]:
+    return [c["status"] for b in res["result"] for c in b["calls"]]
+
+
+def test_simulate_is_passed_through_unless_enabled():
+    payload = {"blockStateCalls": [{"calls": [_echo()]}]}
+    provider = EVMProvider()
+    sent, make_request = _recording(provider)
+    CompressionMiddleware(min_size=0)(make_request, W3(provider))("eth_simulateV1", [payload])
+    assert sent == [[payload]]
+
+
+@pytest.mark.parametrize("alg", SIMULATE_ALGORITHMS)
+def test_reverting_forwarders_propagate_the_target_status(alg):
+    provider = EVMProvider()
+    provider.set_code(REVERTER, REVERTER_CODE)
+    data = _echo()["data"]
+    for target, ok in ((ECHO_ADDRESS, True), (REVERTER, False)):
+        calldata, override = build_call_data(data, target, alg)
+        ((addr, fields),) = override.items()
+        code = revert_on_failure(fields["code"])
+        assert len(code) - len(fields["code"]) == 30
+        success, out, _ = provider.backend.call(
+            {"to": DECOMPRESSOR_ADDRESS, "data": calldata}, {addr: {"code": code}}
+        )
+        assert (success, "0x" + out.hex()) == (ok, data)
+
+
+def test_simulate_keeps_the_status_of_reverting_targets():
+    payload = {"blockStateCalls": [{"calls": [{"to": REVERTER, "data": _echo()["data"]}, _echo()]}]}
+    provider = EVMProvider()
+    provider.set_code(REVERTER, REVERTER_CODE)
+    vanilla = provider.make_request("eth_simulateV1", [payload, "latest"])
+    assert _status(vanilla) == ["0x0", "0x1"]
+
+    sent, make_request = _recording(provider)
+    strict = CompressionMiddleware(compress_simulate=True, allow_fallback=False)
+    res = strict(make_request, W3(provider))("eth_simulateV1", [payload, "latest"])
+    (compressed,) = sent
+    assert compressed[0]["blockStateCalls"][0]["calls"][0]["to"] != REVERTER
+    assert _status(res) == _status(vanilla) and _return_data(res) == _return_data(vanilla)
+
+    # With fallback, the failed status is confirmed by the original request
+    del sent[:]
+    middleware = CompressionMiddleware(compress_simulate=True)(make_request, W3(provider))
+    res = middleware("eth_simulateV1", [payload, "latest"])
+    assert len(sent) == 2 and sent[1] == [payload, "latest"]
+    assert _status(res) == _status(vanilla) and _return_data(res) == _return_data(vanilla)
+
+
+def test_simulate_sends_sender_dependent_calls_as_is():
+    sender = "0x" + "5e" * 20
+    data = "0x" + os.urandom(32).hex() * 40
+    calls = [
+        {"from": sender, "to": WHOAMI, "data": data},
+        {"to": ECHO_ADDRESS, "data": data, "value": "0x1"},
+        {"to": ECHO_ADDRESS, "data": data, "value": "0x0"},
+    ]
+    payload = {"blockStateCalls": [{"calls": calls}]}
+    provider = EVMProvider()
+    provider.set_code(WHOAMI, WHOAMI_CODE)
+    sent, make_request = _recording(provider)
+    sink = HistogramSink()
+    middleware = CompressionMiddleware(sink=sink, compress_simulate=True)
+    res = middleware(make_request, W3(provider))("eth_simulateV1", [payload, "latest"])
+    assert _return_data(res)[0][0] == "0x" + sender[2:].rjust(64, "0")
+    (compressed,) = sent
+    assert compressed[0]["blockStateCalls"][0]["calls"][:2] == calls[:2]
+    assert compressed[0]["blockStateCalls"][0]["calls"][2]["to"] != ECHO_ADDRESS
+
+    del sent[:]
+    checked = {**payload, "validation": True}
+    middleware(make_request, W3(provider))("eth_simulateV1", [checked, "latest"])
+    assert sent == [[checked, "latest"]]
+    assert sink.snapshot()["fallbacks"] == {"middleware/validation": 1}
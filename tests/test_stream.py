@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+import time
+import tracemalloc
+
+from web3 import AsyncHTTPProvider, AsyncWeb3, HTTPProvider, Web3
+
+from ethcompress import stream
+from ethcompress.middleware import AsyncCompressionMiddleware, CompressionMiddleware
+from ethcompress.provider import CompressingHTTPProvider
+from ethcompress.stream import ResultReader, async_stream_eth_call, read_result, stream_eth_call
+from ethcompress.testing import ECHO_ADDRESS, RPCServer
+
+
+def _chunks(body: bytes, size: int) -> list[bytes]:
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+def test_reader_decodes_results_split_at_any_boundary():
+    data = os.urandom(97)
+    bodies = [
+        b'{"jsonrpc":"2.0","id":7,"result":"0x' + data.hex().encode() + b'"}',
+        b'{"jsonrpc": "2.0", "result": "0x' + data.hex().encode() + b'", "id": 7}',
+    ]
+    for body in bodies:
+        for size in (1, 2, 3, 5, 64, len(body)):
+            res = read_result(_chunks(body, size))
+            assert res["id"] == 7 and bytes(res["result"]) == data
+            assert read_result(_chunks(body, size), view=False)["result"] == data
+    empty = read_result(_chunks(b'{"jsonrpc":"2.0","id":1,"result":"0x"}', 3))
+    assert bytes(empty["result"]) == b""
+
+
+def test_reader_falls_back_to_json_for_errors_and_other_results():
+    error = {"jsonrpc": "2.0", "id": 1, "error": {"code": 3, "message": "x", "data": "0xab"}}
+    nested = {"jsonrpc": "2.0", "id": 1, "error": {"code": 3, "data": {"result": "0xab"}}}
+    block = {"jsonrpc": "2.0", "id": 1, "result": {"number": "0x1"}}
+    for doc in (error, nested, block):
+        body = json.dumps(doc).encode()
+        for size in (1, 4, len(body)):
+            assert read_result(_chunks(body, size)) == doc
+
+
+def test_streaming_halves_peak_memory_of_big_results():
+    data = os.urandom(4 << 20)
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "result": "0x" + data.hex()}).encode()
+    chunks = _chunks(body, 256 * 1024)
+
+    def peak(fn):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        out = fn()
+        elapsed = time.perf_counter() - t0
+        _, top = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert out == data
+        return top, elapsed
+
+    full, full_s = peak(lambda: bytes.fromhex(json.loads(b"".join(chunks))["result"][2:]))
+    streamed, streamed_s = peak(lambda: read_result(chunks, view=False)["result"])
+    print(
+        f"\n4 MB result: json {full / 1e6:.1f} MB peak {full_s * 1e3:.1f} ms, "
+        f"streamed {streamed / 1e6:.1f} MB peak {streamed_s * 1e3:.1f} ms"
+    )
+    assert streamed * 2 < full
+
+
+def test_provider_and_middleware_stream_eth_call_results():
+    data = "0x" + os.urandom(64 * 1024).hex()
+    tx = {"to": ECHO_ADDRESS, "data": data}
+    with RPCServer() as srv:
+        provider = CompressingHTTPProvider(srv.url, min_size=10**9, stream_results=True)
+        res = provider.make_request("eth_call", [tx, "latest"])
+        assert res["result"] == bytes.fromhex(data[2:])
+        assert Web3(provider).eth.call(tx).hex() == data[2:]
+        # Errors keep their shape
+        reverting = {ECHO_ADDRESS: {"code": "0xfe"}}
+        assert "error" in provider.make_request("eth_call", [tx, "latest", reverting])
+
+        w3 = Web3(HTTPProvider(srv.url))
+        w3.middleware_onion.add(CompressionMiddleware(min_size=0, stream_results=True))
+        small = "0x" + "ab" * 2000
+        assert w3.eth.call({"to": ECHO_ADDRESS, "data": small}).hex() == small[2:]
+        assert srv.provider.calls[-1].override
+
+
+def test_async_middleware_streams_eth_call_results(monkeypatch):
+    data = "0x" + os.urandom(64 * 1024).hex()
+    small = "0x" + "ab" * 2000
+
+    async def run(url):
+        w3 = AsyncWeb3(AsyncHTTPProvider(url))
+        w3.middleware_onion.add(AsyncCompressionMiddleware(min_size=0, stream_results=True))
+        try:
+            big = await w3.eth.call({"to": ECHO_ADDRESS, "data": data})
+            return big, await w3.eth.call({"to": ECHO_ADDRESS, "data": small})
+        finally:
+            await w3.provider.disconnect()
+
+    streamed = []
+    finish = ResultReader.finish
+
+    def counting(reader, view=True):
+        streamed.append(view)
+        return finish(reader, view)
+
+    monkeypatch.setattr(ResultReader, "finish", counting)
+    with RPCServer() as srv:
+        big, out = asyncio.run(run(srv.url))
+        assert big.hex() == data[2:] and out.hex() == small[2:]
+        assert srv.provider.calls[-1].override
+    assert streamed == [False, False]
+
+
+def test_stream_wrappers_pass_through_without_the_session_manager(monkeypatch):
+    def make_request(method, params):
+        return {"result": "0x"}
+
+    sync_provider, async_provider = HTTPProvider("http://127.0.0.1:1"), AsyncHTTPProvider()
+    assert stream_eth_call(make_request, sync_provider) is not make_request
+    # web3 6 providers have no _request_session_manager
+    for provider in (sync_provider, async_provider):
+        monkeypatch.delattr(provider, "_request_session_manager")
+    assert stream_eth_call(make_request, sync_provider) is make_request
+    assert async_stream_eth_call(make_request, async_provider) is make_request
+
+    monkeypatch.setattr(stream, "_SESSION_MANAGER", False)
+    assert stream_eth_call(make_request, HTTPProvider("http://127.0.0.1:1")) is make_request
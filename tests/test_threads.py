@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+import importlib
+import pkgutil
+import threading
+import time
+
+import compressions
+import ethcompress
+from ethcompress import HistogramSink, compress_call_data
+from ethcompress.instrument import Event
+from ethcompress.metrics import PrometheusMetrics
+from ethcompress.testing import corpus
+
+# Read-only lookup tables; anything else mutable at module level is shared state
+READ_ONLY_TABLES = {
+    "DECODERS",
+    "DEFAULT_CONTRACTS",
+    "GAS_MODEL",
+    "GENERATORS",
+    "PROFILES",
+    "_ENCODERS",
+}
+
+
+def test_no_mutable_module_state():
+    found = []
+    for pkg in (compressions, ethcompress):
+        for info in pkgutil.walk_packages(pkg.__path__, pkg.__name__ + "."):
+            if info.name.endswith("__main__"):
+                continue
+            module = importlib.import_module(info.name)
+            for name, value in vars(module).items():
+                if name.startswith("__") or name in READ_ONLY_TABLES:
+                    continue
+                if isinstance(value, (dict, list, set, bytearray)):
+                    found.append(f"{info.name}.{name}")
+    assert found == []
+
+
+def test_compress_call_data_from_many_threads_matches_serial():
+    items = [(s.to, s.data) for s in corpus(24, seed=9, min_size=300, max_size=5000)]
+    expected = [compress_call_data(d, t) for t, d in items]
+    barrier = threading.Barrier(4)
+
+    def work(offset: int) -> list:
+        barrier.wait()
+        order = items[offset:] + items[:offset]
+        return [compress_call_data(d, t) for t, d in order]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        outs = list(pool.map(work, range(0, 24, 6)))
+    for offset, out in zip(range(0, 24, 6), outs, strict=True):
+        assert out == expected[offset:] + expected[:offset]
+
+
+def test_sinks_count_exactly_across_threads():
+    hist, metrics = HistogramSink(), PrometheusMetrics()
+    event = Event("middleware", {"compress": 1500, "rpc": 90000}, "cd", None, None, "0xab")
+
+    def work(_: int) -> None:
+        for _ in range(500):
+            hist(event)
+            metrics(event)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(work, range(8)))
+    assert hist.events == 4000
+    assert hist.histogram("middleware", "rpc").count == 4000
+    assert 'ethcompress_requests_total{algo="cd",target="0xab"} 4000' in metrics.render()
+
+
+def test_sink_folds_shards_of_exited_threads():
+    hist = HistogramSink()
+    event = Event("middleware", {"rpc": 90000}, "cd")
+    for _ in range(50):
+        threads = [threading.Thread(target=hist, args=(event,)) for _ in range(40)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert len(hist._tally._shards) <= 128
+    t0 = time.perf_counter()
+    assert hist.events == 2000 and hist.snapshot()["algos"] == {"middleware/cd": 2000}
+    print(f"\n2000 threads: read in {(time.perf_counter() - t0) * 1e3:.1f} ms")
+    assert not hist._tally._shards
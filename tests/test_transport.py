@@ -0,0 +1,70 @@
+import pytest
+from web3 import Web3
+
+from ethcompress import HistogramSink
+from ethcompress.provider import CompressingHTTPProvider
+from ethcompress.testing import ECHO_ADDRESS, RPCServer, generate
+from ethcompress.transport import available_encodings, decode_body, encode_body
+
+
+def test_encodings_roundtrip():
+    body = b'{"jsonrpc":"2.0","method":"eth_call","params":[]}' * 50
+    for encoding in available_encodings():
+        encoded = encode_body(body, encoding)
+        assert len(encoded) < len(body)
+        assert decode_body(encoded, encoding) == body
+    with pytest.raises(ValueError):
+        encode_body(body, "br")
+
+
+def test_provider_probes_the_endpoint_for_accepted_encodings():
+    with RPCServer(accept_encodings=("gzip",)) as srv:
+        provider = CompressingHTTPProvider(srv.url, transport="auto")
+        assert provider.accepted_encodings() == ("gzip",)
+        assert provider.content_encoding() == "gzip"
+    with RPCServer() as srv:
+        provider = CompressingHTTPProvider(srv.url, transport="auto")
+        assert provider.accepted_encodings() == ()
+        assert provider.content_encoding() is None
+        assert Web3(provider).eth.chain_id == 1
+    with pytest.raises(ValueError):
+        CompressingHTTPProvider("http://127.0.0.1:1", transport="br")
+
+
+def test_transport_encoding_as_algorithm():
+    data = generate("aggregate", 16384)
+    tx = {"to": ECHO_ADDRESS, "data": data}
+    sink = HistogramSink()
+    with RPCServer(accept_encodings=("gzip", "deflate")) as srv:
+        w3 = Web3(CompressingHTTPProvider(srv.url, alg="deflate", sink=sink))
+        assert "0x" + w3.eth.call(tx).hex() == data
+        assert not srv.provider.calls[-1].override
+        deflate_bytes = srv.bytes_in
+    with RPCServer() as srv:
+        w3 = Web3(CompressingHTTPProvider(srv.url, alg="gzip", transport="auto", sink=sink))
+        assert "0x" + w3.eth.call(tx).hex() == data
+        plain_bytes = srv.bytes_in
+    print(f"\n16 KB aggregate: {deflate_bytes} B deflated vs {plain_bytes} B plain")
+    assert deflate_bytes * 5 < plain_bytes
+    assert sink.snapshot()["fallbacks"] == {"provider/no_transport": 1}
+
+
+def test_auto_weighs_transport_against_codecs_by_cost():
+    data = generate("aggregate", 8192, seed=3)
+    tx = {"to": ECHO_ADDRESS, "data": data}
+    chosen = {}
+    with RPCServer(accept_encodings=("gzip",)) as srv:
+        for kbps in (1_000_000, 8):
+            sink = HistogramSink()
+            w3 = Web3(
+                CompressingHTTPProvider(
+                    srv.url, transport="auto", bandwidth_kbps=kbps, min_size=0, sink=sink
+                )
+            )
+            assert "0x" + w3.eth.call(tx).hex() == data
+            algos = sink.snapshot()["algos"]
+            chosen[kbps] = next(k for k in algos if k.startswith("provider/"))
+            # The codec only ran where wire bytes were expensive enough to justify it
+            assert any(k.startswith("compress/") for k in algos) == (kbps == 8)
+    print(f"\nchosen per link speed: {chosen}")
+    assert chosen[1_000_000] == "provider/gzip"
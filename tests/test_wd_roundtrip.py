@@ -0,0 +1,52 @@
+import os
+import time
+
+from ethcompress import wd_compress, wd_decompress
+
+
+def _hex(b: bytes) -> str:
+    return "0x" + b.hex()
+
+
+def _word(v: bytes, *, left: bool = False) -> bytes:
+    return v.ljust(32, b"\x00") if left else v.rjust(32, b"\x00")
+
+
+def test_wd_roundtrip_repeated_words():
+    addr = _word(os.urandom(20))
+    sel = _word(bytes.fromhex("95d89b41"), left=True)
+    data = bytes.fromhex("252dba42") + (addr + sel + b"\x00" * 64) * 40 + addr * 5 + b"\xff" * 7
+    h = _hex(data)
+    t0 = time.perf_counter()
+    comp = wd_compress(h)
+    t1 = time.perf_counter()
+    decomp = wd_decompress(comp)
+    t2 = time.perf_counter()
+    assert decomp == h
+    # Two dictionary words plus one token per non-zero word and run
+    assert (len(comp) - 2) // 2 < len(data) // 10
+    print(
+        f"WD repeated: in={len(data)}B comp={(len(comp) - 2) // 2}B comp_ms={(t1 - t0) * 1000:.3f} decomp_ms={(t2 - t1) * 1000:.3f}"
+    )
+
+
+def test_wd_roundtrip_random_small_medium():
+    for n in (1, 64, 1024, 5000):
+        data = os.urandom(n)
+        h = _hex(data)
+        t0 = time.perf_counter()
+        comp = wd_compress(h)
+        t1 = time.perf_counter()
+        decomp = wd_decompress(comp)
+        t2 = time.perf_counter()
+        assert decomp == h
+        print(
+            f"WD random: n={n} comp={(len(comp) - 2) // 2}B comp_ms={(t1 - t0) * 1000:.3f} decomp_ms={(t2 - t1) * 1000:.3f}"
+        )
+
+
+def test_wd_roundtrip_trailing_zero_words():
+    data = _word(b"\x01") + b"\x00" * 100
+    h = _hex(data)
+    comp = wd_compress(h)
+    assert wd_decompress(comp) == h